@@ -20,38 +20,71 @@
 import os
 import sys
 import argparse
+import logging
+import functools
 from distutils.spawn import find_executable
 
 import autoptsclient_common as autoptsclient
 import ptsprojects.zephyr as autoprojects
 import ptsprojects.stack as stack
 from pybtp import btp
+from config import CLIENT_PORT
 from ptsprojects.zephyr.iutctl import get_iut
 
 def check_args(args):
     """Sanity check command line arguments"""
 
     qemu_bin = autoprojects.iutctl.QEMU_BIN
-    tty_file = args.tty_file
+    tty_files = args.tty_file
     kernel_image = args.kernel_image
     ip_addr = args.ip_addr
+    workers = args.workers
 
     if not ip_addr:
         sys.exit("Server IP address not specified!")
 
-    if tty_file:
-        if (not tty_file.startswith("/dev/tty") and
-            not tty_file.startswith("/dev/pts")):
-            sys.exit("%s is not a TTY file!" % repr(tty_file))
-        if not os.path.exists(tty_file):
-            sys.exit("%s TTY file does not exist!" % repr(tty_file))
+    if workers < 1:
+        sys.exit("Number of workers must be at least 1!")
+
+    if len(ip_addr) % workers:
+        sys.exit("Number of server IP addresses must be multiple of the "
+                 "number of workers!")
+
+    if args.bd_addr and len(args.bd_addr) != workers:
+        sys.exit("One IUT address per worker must be specified!")
+
+    if tty_files:
+        if args.qemu_pool is not None:
+            sys.exit("QEMU pool can be used only without TTY file!")
+
+        if len(tty_files) != workers:
+            sys.exit("One TTY file per worker must be specified!")
+
+        for tty_file in tty_files:
+            if (not tty_file.startswith("/dev/tty") and
+                not tty_file.startswith("/dev/pts")):
+                sys.exit("%s is not a TTY file!" % repr(tty_file))
+            if not os.path.exists(tty_file):
+                sys.exit("%s TTY file does not exist!" % repr(tty_file))
     else: # no TTY - will run DUT in QEMU
         if not find_executable(qemu_bin):
             sys.exit("%s is needed but not found!" % (qemu_bin,))
 
+        # All QEMU instances would share one Bluetooth controller proxy
+        if workers > 1:
+            sys.exit("Running in parallel requires hardware IUTs!")
+
     if not os.path.isfile(kernel_image):
         sys.exit("kernel_image %s is not a file!" % repr(kernel_image))
 
+    args.log_levels = {}
+    for log_level in args.log_level or []:
+        name, _, level = log_level.partition("=")
+        if not isinstance(logging.getLevelName(level.upper()), int):
+            sys.exit("%s is not a valid logger level!" % repr(log_level))
+
+        args.log_levels[name] = logging.getLevelName(level.upper())
+
 def parse_args():
     """Parses command line arguments and options"""
 
@@ -81,14 +114,15 @@ def parse_args():
                             help="Zephyr OS kernel image to be used for "
                             "testing. Normally a zephyr.elf file.")
 
-    arg_parser.add_argument("-t", "--tty-file",
+    arg_parser.add_argument("-t", "--tty-file", nargs="+",
                             help="If TTY is specified, BTP communication "
                             "with Zephyr OS running on hardware will "
                             "be done over this TTY. Hence, QEMU will "
-                            "not be used.")
+                            "not be used. One TTY per worker.")
 
-    arg_parser.add_argument("-a", "--bd-addr",
-                            help="Bluetooth device address of the IUT")
+    arg_parser.add_argument("-a", "--bd-addr", nargs="+",
+                            help="Bluetooth device address of the IUT. "
+                            "One address per worker.")
 
     arg_parser.add_argument("-d", "--debug-logs", dest="enable_max_logs",
                             action='store_true', default=False,
@@ -118,6 +152,46 @@ def parse_args():
                             help="Repeat test if failed. Parameter specifies "
                                  "maximum repeat count per test")
 
+    arg_parser.add_argument("-w", "--workers", type=int, default=1,
+                            help="Number of (PTS, IUT) pairs to run test "
+                            "cases on in parallel. Server IP addresses are "
+                            "split evenly between the workers.")
+
+    arg_parser.add_argument("-o", "--order", default=autoptsclient.ORDER_DEFAULT,
+                            choices=autoptsclient.ORDER_STRATEGIES,
+                            help="Order of running test cases, based on "
+                            "durations and results stored in TestCase.db: "
+                            "longest first or not passed last time first.")
+
+    arg_parser.add_argument("--warm-iut", action="store_true", default=False,
+                            help="Keep IUT running between test cases and "
+                            "reset it over BTP instead of restarting it. IUT "
+                            "is restarted if the reset fails.")
+
+    arg_parser.add_argument("--qemu-pool", type=int, metavar="SIZE",
+                            nargs="?", const=0,
+                            help="Restore QEMU from a snapshot taken after "
+                            "IUT boot instead of booting it for every test "
+                            "case. By default instances are restored on "
+                            "demand. If SIZE is given, SIZE instances are "
+                            "kept restored in advance, which requires a "
+                            "Bluetooth controller proxy accepting more than "
+                            "one connection.")
+
+    arg_parser.add_argument("--log-profile",
+                            default=autoptsclient.LOG_PROFILE_DEBUG,
+                            choices=sorted(autoptsclient.LOG_PROFILES),
+                            help="Logs to write: everything (debug) or only "
+                            "test case summaries and errors (production).")
+
+    arg_parser.add_argument("--log-level", nargs="+", metavar="LOGGER=LEVEL",
+                            help="Override level of logger selected by the "
+                            "log profile, e.g. pybtp=INFO")
+
+    arg_parser.add_argument("--log-compress", action="store_true",
+                            default=False,
+                            help="Write log files compressed with gzip.")
+
     # Hidden option to save test cases data in TestCase.db
     arg_parser.add_argument("-s", "--store", action="store_true",
                             default=False, help=argparse.SUPPRESS)
@@ -128,29 +202,44 @@ def parse_args():
 
     return args
 
-def main():
-    """Main."""
-    if os.geteuid() == 0: # root privileges are not needed
-        sys.exit("Please do not run this program as root.")
+def init_worker(args, index):
+    """Initialize PTS instances and IUT of a worker
 
-    args = parse_args()
+    index -- Worker index, selects server IP addresses, TTY file and IUT
+             address of the worker.
+
+    Returns tuple of (ptses, test_cases, additional_test_cases).
 
+    """
     if args.store:
         tc_db_table_name = "zephyr_" + str(args.board)
     else:
         tc_db_table_name = None
 
-    callback_thread = autoptsclient.init_core()
+    if args.workers > 1:
+        suffix = "-%d" % index
+    else:
+        suffix = ""
+
+    callback_thread = autoptsclient.init_core(CLIENT_PORT + index)
+
+    ips_per_worker = len(args.ip_addr) / args.workers
+    ips = args.ip_addr[index * ips_per_worker:(index + 1) * ips_per_worker]
+    bd_addr = args.bd_addr[index] if args.bd_addr else None
+    tty_file = args.tty_file[index] if args.tty_file else None
 
     ptses = []
-    for ip in args.ip_addr:
-        ptses.append(autoptsclient.init_pts(ip, args.workspace, args.bd_addr,
+    for ip in ips:
+        ptses.append(autoptsclient.init_pts(ip, args.workspace, bd_addr,
                                             args.enable_max_logs,
                                             callback_thread, tc_db_table_name,
                                             args.local_addr))
 
     btp.init(get_iut)
-    autoprojects.iutctl.init(args.kernel_image, args.tty_file, args.board)
+    autoprojects.iutctl.init(
+        args.kernel_image, tty_file, args.board,
+        autoprojects.iutctl.BTP_ADDRESS + suffix,
+        "iut-zephyr%s.log" % suffix, args.warm_iut, args.qemu_pool)
 
     stack.init_stack()
     stack_inst = stack.get_stack()
@@ -173,17 +262,61 @@ def main():
         test_cases = autoptsclient.get_test_cases_subset(
             test_cases, args.test_cases, args.excluded)
 
-    autoptsclient.run_test_cases(ptses, test_cases, additional_test_cases,
-                                 args.retry)
+    return ptses, test_cases, additional_test_cases
+
 
+def cleanup_worker(index):
+    """Cleanup of a worker"""
     autoprojects.iutctl.cleanup()
 
+
+def main():
+    """Main."""
+    if os.geteuid() == 0: # root privileges are not needed
+        sys.exit("Please do not run this program as root.")
+
+    args = parse_args()
+
+    # parallel workers are forked before LogWriter thread is started
+    autoptsclient.init_logging(args.log_profile, args.log_levels,
+                               args.log_compress,
+                               start_writer=args.workers == 1)
+
+    if args.workers > 1:
+
+        worker_inits = [functools.partial(init_worker, args, index)
+                        for index in range(args.workers)]
+
+        if args.store:
+            tc_db_table_name = "zephyr_" + str(args.board)
+        else:
+            tc_db_table_name = None
+
+        autoptsclient.run_test_cases_parallel(worker_inits, args.retry,
+                                              cleanup_worker, args.order,
+                                              tc_db_table_name)
+
+        print "\nBye!"
+        sys.stdout.flush()
+        autoptsclient.cleanup_logging()
+
+        os._exit(0)
+
+    ptses, test_cases, additional_test_cases = init_worker(args, 0)
+
+    autoptsclient.run_test_cases(ptses, test_cases, additional_test_cases,
+                                 args.retry, args.order)
+
+    cleanup_worker(0)
+
     print "\nBye!"
     sys.stdout.flush()
 
     for pts in ptses:
         pts.unregister_xmlrpc_ptscallback()
 
+    autoptsclient.cleanup_logging()
+
     # not the cleanest but the easiest way to exit the server thread
     os._exit(0)
 
@@ -194,6 +327,7 @@ if __name__ == "__main__":
         main()
 
     except KeyboardInterrupt: # Ctrl-C
+        autoptsclient.cleanup_logging()
         os._exit(14)
 
     # SystemExit is thrown in arg_parser.parse_args and in sys.exit
@@ -203,4 +337,5 @@ if __name__ == "__main__":
     except:
         import traceback
         traceback.print_exc()
+        autoptsclient.cleanup_logging()
         os._exit(16)
@@ -27,18 +27,26 @@ import xmlrpclib
 import Queue
 import threading
 from traceback import format_exception
-from SimpleXMLRPCServer import SimpleXMLRPCServer
 from collections import OrderedDict
-import xml.etree.ElementTree as ET
+import cPickle
 import time
 import datetime
+import heapq
+import gzip
+import atexit
+import zipfile
+import zlib
+import struct
 
 from ptsprojects.testcase import get_max_test_case_desc
-from ptsprojects.testcase import PTSCallback
+from ptsprojects.testcase import PTSCallback, set_pts_maximum_logging
 from ptsprojects.testcase_db import TestCaseTable
+from ptsprojects.wid import get_wid_report
 from pybtp.types import BTPError, SynchError
+from pybtp import iutctl_common
 import ptsprojects.ptstypes as ptstypes
-from config import SERVER_PORT, CLIENT_PORT
+from config import SERVER_PORT, CLIENT_PORT, SERVER_CALL_TIMEOUT
+from xmlrpcutils import KeepAliveTransport, KeepAliveXMLRPCServer
 
 log = logging.debug
 
@@ -46,6 +54,45 @@ RUNNING_TEST_CASE = {}
 TEST_CASE_DB = None
 LOG_DIR_NAME = None
 
+# Logging profiles, see init_logging. Each profile maps logger names to
+# levels, "" is the root logger.
+LOG_PROFILE_DEBUG = "debug"  # everything
+LOG_PROFILE_PRODUCTION = "production"  # test case summaries and errors only
+
+SUMMARY_LOGGER = logging.getLogger("summary")
+
+LOG_FORMAT = ("%(asctime)s %(name)s %(levelname)s %(filename)-25s "
+              "%(lineno)-5s %(funcName)-25s : %(message)s")
+
+# Log files are written by LogWriter thread, see init_logging
+LOG_WRITER = None
+# (main log file name, compress, archive) LogWriter is started with
+LOG_WRITER_ARGS = None
+# Log files of the running test cases: test case name -> file, see log2file
+TEST_LOG_FILES = {}
+# Test case the current thread works on, see set_log_test_case
+LOG_CONTEXT = threading.local()
+
+LOG_PROFILES = {
+    LOG_PROFILE_DEBUG: {"": logging.DEBUG},
+    LOG_PROFILE_PRODUCTION: {"": logging.WARNING,
+                             SUMMARY_LOGGER.name: logging.INFO},
+}
+
+# Test case instances synchronization, see synchronize_instances
+SYNCH_COND = threading.Condition()
+SYNCH_INSTANCES_NUM = 1
+SYNCH_ARRIVED = {}  # state -> number of instances that reached it
+
+# Workspace test cases cached between runs, see cache_workspace
+WORKSPACE_CACHE_FILE = "workspace.cache"
+
+# Per test case timeouts in seconds, see get_test_case_timeout
+TIMEOUT_SAFETY_FACTOR = 3
+TIMEOUT_MIN = 30
+TIMEOUT_MAX = 120
+TIMEOUT_MIN_RUNS = 3
+
 # To test autopts client locally:
 # Envrinment variable AUTO_PTS_LOCAL must be set for FakeProxy to
 # be used. When FakeProxy is used autoptsserver on Windows will
@@ -79,10 +126,60 @@ class _Method:
     __str__ = __repr__
 xmlrpclib._Method = _Method
 
+class PTSProxy(xmlrpclib.ServerProxy):
+    """XML-RPC proxy of auto-pts server batching PTS configuration
+
+    PIXIT and PICS updates are queued and sent in one update_config call
+    before a test case is run, only the last value of each is sent.
+
+    """
+    def __init__(self, *args, **kwargs):
+        xmlrpclib.ServerProxy.__init__(self, *args, **kwargs)
+
+        # (project name, param name) -> value
+        self._pixit_params = OrderedDict()
+        # (project name, entry name) -> bool value
+        self._pics = OrderedDict()
+
+    def update_pixit_param(self, project_name, param_name, new_param_value):
+        """Queue PIXIT update, see flush_config"""
+        key = (project_name, param_name)
+        self._pixit_params.pop(key, None)
+        self._pixit_params[key] = new_param_value
+
+    def update_pics(self, project_name, entry_name, bool_value):
+        """Queue PICS update, see flush_config"""
+        key = (project_name, entry_name)
+        self._pics.pop(key, None)
+        self._pics[key] = bool_value
+
+    def flush_config(self):
+        """Send queued PIXIT and PICS updates to the server"""
+        if not self._pixit_params and not self._pics:
+            return
+
+        pixit_params = [list(key) + [value]
+                        for key, value in self._pixit_params.iteritems()]
+        pics = [list(key) + [value] for key, value in self._pics.iteritems()]
+
+        self._pixit_params.clear()
+        self._pics.clear()
+
+        self.update_config(pixit_params, pics)
+
+    def run_test_case(self, project_name, test_case_name):
+        self.flush_config()
+        return self.__getattr__("run_test_case")(project_name, test_case_name)
+
+    def get_workspace_info(self, fingerprint=None):
+        self.flush_config()
+        return self.__getattr__("get_workspace_info")(fingerprint)
+
 class ClientCallback(PTSCallback):
     def __init__(self):
         self.exception = Queue.Queue()
         self._pending_responses = {}
+        self._pending_responses_cond = threading.Condition()
 
     def error_code(self):
         """Return error code or None if there are no errors
@@ -121,13 +218,14 @@ class ClientCallback(PTSCallback):
                          usage.
         """
 
+        set_log_test_case(test_case_name)
+
         logger = logging.getLogger("{}.{}".format(self.__class__.__name__,
                                                   self.log.__name__))
         log = logger.info
 
-        log("%s %s %s %s %s" % (ptstypes.PTS_LOGTYPE_STRING[log_type],
-                             logtype_string, log_time, test_case_name,
-                             log_message))
+        log("%s %s %s %s %s", ptstypes.PTS_LOGTYPE_STRING[log_type],
+            logtype_string, log_time, test_case_name, log_message)
 
         try:
             if test_case_name in RUNNING_TEST_CASE:
@@ -158,23 +256,22 @@ class ClientCallback(PTSCallback):
         };
         """
 
+        # XXX: 361 WID MESH sends tc name with leading white spaces
+        set_log_test_case(test_case_name.lstrip())
+
         logger = logging.getLogger("{}.{}".format(
             self.__class__.__name__, self.on_implicit_send.__name__))
 
         log = logger.info
 
-        log("*" * 20)
-        log("BEGIN OnImplicitSend:")
-        log("project_name: %s" % project_name)
-        log("wid: %s" % wid)
-        log("test_case_name: %s" % test_case_name)
-        log("description: %s" % description)
-        log("style: %s 0x%x", ptstypes.MMI_STYLE_STRING[style], style)
-        log("response: %s %s %s" % (repr(response), type(response),
-                                    id(response)))
-        log("response_size: %s" % response_size)
-        log("response_is_present: %s %s" % (response_is_present,
-                                            type(response_is_present)))
+        # arguments are formatted only if the log is enabled
+        log("%s\nBEGIN OnImplicitSend:\nproject_name: %s\nwid: %s\n"
+            "test_case_name: %s\ndescription: %s\nstyle: %s 0x%x\n"
+            "response: %r %s %s\nresponse_size: %s\n"
+            "response_is_present: %s %s", "*" * 20, project_name, wid,
+            test_case_name, description, ptstypes.MMI_STYLE_STRING[style],
+            style, response, type(response), id(response), response_size,
+            response_is_present, type(response_is_present))
 
         try:
             # XXX: 361 WID MESH sends tc name with leading white spaces
@@ -208,30 +305,46 @@ class ClientCallback(PTSCallback):
 
         return testcase_response
 
-    def get_pending_response(self, test_case_name):
-        log("%s.%s, %s", self.__class__.__name__,
-            self.get_pending_response.__name__, test_case_name)
-        if not self._pending_responses:
-            return None
+    def get_pending_response(self, test_case_name, timeout=0):
+        """Returns response set for test case which MMI handler returned
+        "WAIT" or None if it is not set within timeout
 
-        if test_case_name in self._pending_responses:
-            response = self._pending_responses[test_case_name]
-            log("return pending response = %s", response)
+        timeout -- time in seconds to wait for the response, it is returned
+                   as soon as set_pending_response is called
 
-            del self._pending_responses[test_case_name]
+        """
+        set_log_test_case(test_case_name)
 
-            return response
+        log("%s.%s, %s %s", self.__class__.__name__,
+            self.get_pending_response.__name__, test_case_name, timeout)
 
-        return None
+        deadline = time.time() + timeout
+
+        with self._pending_responses_cond:
+            while test_case_name not in self._pending_responses:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+
+                self._pending_responses_cond.wait(remaining)
+
+            response = self._pending_responses.pop(test_case_name)
+
+        log("return pending response = %s", response)
+
+        return response
 
     def set_pending_response(self, pending_response):
         tc_name = pending_response[0]
         response = pending_response[1]
 
-        self._pending_responses[tc_name] = response
+        with self._pending_responses_cond:
+            self._pending_responses[tc_name] = response
+            self._pending_responses_cond.notify_all()
 
     def clear_pending_responses(self):
-        self._pending_responses = {}
+        with self._pending_responses_cond:
+            self._pending_responses = {}
 
     def cleanup(self):
         self.clear_pending_responses()
@@ -247,19 +360,22 @@ class CallbackThread(threading.Thread):
     To prevent SimpleXMLRPCServer blocking whole app it is started in a thread
 
     """
-    def __init__(self):
+    def __init__(self, port=CLIENT_PORT):
         log("%s.%s", self.__class__.__name__, self.__init__.__name__)
         threading.Thread.__init__(self)
+        self.port = port
         self.callback = ClientCallback()
 
     def run(self):
         """Starts the xmlrpc callback server"""
         log("%s.%s", self.__class__.__name__, self.run.__name__)
 
-        log("Serving on port %s ...", CLIENT_PORT)
+        log("Serving on port %s ...", self.port)
 
-        server = SimpleXMLRPCServer(("", CLIENT_PORT),
-                                    allow_none = True, logRequests = False)
+        # server waits for pending responses while other calls set them
+        server = KeepAliveXMLRPCServer(
+            ("", self.port), allow_none = True, logRequests = False,
+            concurrent_methods = ["get_pending_response"])
         server.register_instance(self.callback)
         server.register_introspection_functions()
         server.serve_forever()
@@ -297,9 +413,340 @@ def get_my_ip_address():
 
 get_my_ip_address.cached_address = None
 
-def init_logging():
-    """Initialize logging"""
-    global LOG_DIR_NAME
+class LogArchive(object):
+    """Zip archive of log files, filled while test cases run
+
+    Manifest file next to the archive has a line per archived file:
+    member name, offset of its local header, compressed size and test case
+    name. It is written as files are added, so single logs can be read
+    without unpacking the archive, also if it was not closed.
+
+    """
+    manifest_name = "manifest.txt"
+
+    def __init__(self, dir_path):
+        """Constructor
+
+        dir_path -- directory of the archived log files, archive is created
+                    next to it
+
+        """
+        self.dir_path = dir_path
+        self.filename = dir_path + ".zip"
+        self.manifest_filename = dir_path + ".manifest"
+
+        self._root = os.path.dirname(dir_path)
+        self._archived = set()
+        self._manifest = []
+
+        self._zip = zipfile.ZipFile(self.filename, "w", zipfile.ZIP_DEFLATED,
+                                    allowZip64=True)
+        self._manifest_file = open(self.manifest_filename, "w")
+
+    def add(self, filename, test_case_name=None):
+        """Compress file and append it to the archive"""
+        if filename in self._archived or not os.path.exists(filename):
+            return
+
+        # gzip log files are already compressed
+        if filename.endswith(".gz"):
+            compress_type = zipfile.ZIP_STORED
+        else:
+            compress_type = zipfile.ZIP_DEFLATED
+
+        arcname = os.path.relpath(filename, self._root)
+        self._zip.write(filename, arcname, compress_type)
+        self._zip.fp.flush()
+        self._archived.add(filename)
+
+        zinfo = self._zip.getinfo(arcname)
+        line = "%s %d %d %s\n" % (arcname, zinfo.header_offset,
+                                  zinfo.compress_size, test_case_name or "")
+        self._manifest.append(line)
+        self._manifest_file.write(line)
+        self._manifest_file.flush()
+
+    def close(self):
+        """Archive files not archived yet and write the manifest to archive
+
+        Returns archive file name
+
+        """
+        for root, dirs, files in os.walk(self.dir_path):
+            for name in sorted(files):
+                self.add(os.path.join(root, name))
+
+        self._zip.writestr(os.path.join(os.path.basename(self.dir_path),
+                                        self.manifest_name),
+                           "".join(self._manifest))
+        self._zip.close()
+        self._manifest_file.close()
+
+        return self.filename
+
+
+def read_archived_log(archive_filename, test_case_name):
+    """Returns list of (member name, content) of log files of test case
+
+    Files are read at offsets from the manifest, so the archive may still
+    be written.
+
+    archive_filename -- log archive created by LogArchive
+
+    """
+    logs = []
+    manifest_filename = os.path.splitext(archive_filename)[0] + ".manifest"
+
+    with open(manifest_filename) as manifest:
+        entries = [line.rstrip("\n").split(" ", 3) for line in manifest]
+
+    with open(archive_filename, "rb") as archive:
+        for member, offset, size, name in entries:
+            if name != test_case_name:
+                continue
+
+            archive.seek(int(offset))
+            header = struct.unpack(zipfile.structFileHeader,
+                                   archive.read(zipfile.sizeFileHeader))
+            archive.seek(header[zipfile._FH_FILENAME_LENGTH] +
+                         header[zipfile._FH_EXTRA_FIELD_LENGTH], os.SEEK_CUR)
+            data = archive.read(int(size))
+
+            if header[zipfile._FH_COMPRESSION_METHOD] == zipfile.ZIP_DEFLATED:
+                data = zlib.decompressobj(-zlib.MAX_WBITS).decompress(data)
+
+            logs.append((member, data))
+
+    return logs
+
+
+class LogWriter(threading.Thread):
+    """Thread writing log records to files
+
+    Records are written in batches to buffered files, so logging threads
+    never wait for disk. Each record goes to the main log file and, if set,
+    to the test case log file it was logged for.
+
+    """
+    # maximum number of records written before files are flushed
+    batch_size = 1000
+    # size of file buffers in bytes
+    buffer_size = 64 * 1024
+
+    def __init__(self, filename, compress=False, archive=None):
+        """Constructor
+
+        filename -- main log file name
+        compress -- write files compressed with gzip, .gz is appended to
+                    file names
+        archive -- LogArchive test case log files are added to once closed
+
+        """
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        self.compress = compress
+        self.archive = archive
+        # names of all test case log files, they may not be created yet
+        self.test_log_files = set()
+        self.queue = Queue.Queue()
+        self.formatter = logging.Formatter(LOG_FORMAT)
+
+        self._files = {}
+        self.filename = self.path(filename)
+        self._files[self.filename] = self._open(self.filename, "w")
+
+    def path(self, filename):
+        """Returns name of file written for filename"""
+        if self.compress:
+            return filename + ".gz"
+
+        return filename
+
+    def _open(self, filename, mode="a"):
+        if self.compress:
+            return gzip.open(filename, mode + "b")
+
+        return open(filename, mode, self.buffer_size)
+
+    def _write(self, filename, line):
+        if filename not in self._files:
+            self._files[filename] = self._open(filename)
+
+        self._files[filename].write(line)
+
+    def _close(self, filename):
+        if filename in self._files:
+            self._files.pop(filename).close()
+
+    def run(self):
+        while True:
+            items = [self.queue.get()]
+
+            try:
+                while len(items) < self.batch_size:
+                    items.append(self.queue.get_nowait())
+            except Queue.Empty:
+                pass
+
+            for item in items:
+                if item is None:
+                    for filename in self._files.keys():
+                        self._close(filename)
+                    return
+
+                # request to close test case log file
+                if isinstance(item, tuple):
+                    filename, test_case_name = item
+                    self._close(filename)
+                    if self.archive:
+                        try:
+                            self.archive.add(filename, test_case_name)
+                        except (IOError, OSError, zipfile.error):
+                            pass
+                    continue
+
+                try:
+                    line = self.formatter.format(item) + "\n"
+                    if isinstance(line, unicode):
+                        line = line.encode("utf-8")
+                except Exception:
+                    continue
+
+                self._write(self.filename, line)
+
+                for test_log_file in item.test_log_files:
+                    self._write(test_log_file, line)
+
+            for log_file in self._files.itervalues():
+                log_file.flush()
+
+    def close_file(self, filename, test_case_name=None):
+        """Close file after records queued so far are written to it
+
+        test_case_name -- name of test case the file is logged for, used in
+                          archive manifest
+
+        """
+        self.queue.put((filename, test_case_name))
+
+    def stop(self):
+        """Write queued records, close files and stop the thread"""
+        self.queue.put(None)
+        self.join()
+
+
+class LogQueueHandler(logging.Handler):
+    """Logging handler passing records to LogWriter
+
+    Message is merged with its arguments here, so that later changes of
+    logged objects do not change the record. Record is routed to the log file
+    of the test case the logging thread works on, see get_test_log_files.
+
+    """
+    def emit(self, record):
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(
+                    record.exc_info)
+                record.exc_info = None
+
+            record.test_log_files = get_test_log_files()
+
+            if LOG_WRITER:
+                LOG_WRITER.queue.put(record)
+        except Exception:
+            self.handleError(record)
+
+
+def set_log_test_case(test_case_name):
+    """Route records logged by the current thread to the log file of the test
+    case, None to stop"""
+    LOG_CONTEXT.test_case_name = test_case_name
+
+
+def get_test_log_files():
+    """Returns tuple of test case log files records of the current thread are
+    written to
+
+    Records of threads that do not work on a test case, e.g. BTP receiver,
+    are written to the log files of all running test cases.
+
+    """
+    test_case_name = getattr(LOG_CONTEXT, "test_case_name", None)
+    if test_case_name is None:
+        return tuple(TEST_LOG_FILES.values())
+
+    log_file = TEST_LOG_FILES.get(test_case_name)
+    if log_file is None:
+        return ()
+
+    return (log_file,)
+
+
+def start_log_writer(filename, compress=False, archive=None):
+    """Start writing logs of root logger to filename using LogWriter"""
+    global LOG_WRITER
+
+    LOG_WRITER = LogWriter(filename, compress, archive)
+    LOG_WRITER.start()
+
+    root = logging.getLogger()
+    if not any(isinstance(h, LogQueueHandler) for h in root.handlers):
+        root.addHandler(LogQueueHandler())
+
+
+def cleanup_logging():
+    """Write all queued logs, shall be called before exit"""
+    global LOG_WRITER
+
+    if LOG_WRITER:
+        LOG_WRITER.stop()
+        if LOG_WRITER.archive:
+            LOG_WRITER.archive.close()
+        LOG_WRITER = None
+
+
+def archive_logs():
+    """Stop logging and finish archive of the logs directory
+
+    Returns archive file name or None if logs are not archived, see
+    init_logging
+
+    """
+    global LOG_WRITER
+
+    archive = LOG_WRITER.archive if LOG_WRITER else None
+    if not archive:
+        return None
+
+    # test case log files still queued are added to the archive by the
+    # writer, so it is stopped before the archive is detached and closed
+    LOG_WRITER.stop()
+    LOG_WRITER.archive = None
+    LOG_WRITER = None
+
+    return archive.close()
+
+
+def init_logging(profile=LOG_PROFILE_DEBUG, levels=None, compress=False,
+                 archive=False, start_writer=True):
+    """Initialize logging
+
+    profile -- one of LOG_PROFILES
+    levels -- dict of logger name to level, overrides levels of the profile,
+              e.g. {"pybtp": logging.INFO}
+    compress -- write log files compressed with gzip
+    archive -- add test case log files to zip archive of the logs directory
+               as test cases finish, see archive_logs
+    start_writer -- start LogWriter thread, False if it is started later by
+                    run_test_cases_parallel, after workers are forked
+
+    """
+    global LOG_DIR_NAME, LOG_WRITER_ARGS
     now = datetime.datetime.now().strftime("%Y-%m-%dT%H-%M-%S-%f")
     LOG_DIR_NAME = os.path.join("logs", now)
 
@@ -312,13 +759,26 @@ def init_logging():
     script_name_no_ext = os.path.splitext(script_name)[0]
 
     log_filename = "%s.log" % (script_name_no_ext,)
-    format = ("%(asctime)s %(name)s %(levelname)s %(filename)-25s "
-              "%(lineno)-5s %(funcName)-25s : %(message)s")
 
-    logging.basicConfig(format = format,
-                        filename = log_filename,
-                        filemode = 'w',
-                        level = logging.DEBUG)
+    profile_levels = dict(LOG_PROFILES[profile])
+    if levels:
+        profile_levels.update(levels)
+
+    logging.getLogger().setLevel(profile_levels.pop("", logging.DEBUG))
+
+    for name, level in profile_levels.iteritems():
+        logging.getLogger(name).setLevel(level)
+
+    if archive:
+        archive = LogArchive(LOG_DIR_NAME)
+    else:
+        archive = None
+
+    LOG_WRITER_ARGS = (log_filename, compress, archive)
+    atexit.register(cleanup_logging)
+
+    if start_writer:
+        start_log_writer(*LOG_WRITER_ARGS)
 
     log("Created logs directory %r", LOG_DIR_NAME)
 
@@ -372,11 +832,22 @@ class FakeProxy(object):
         """Returns project name"""
         return "Project%d" % project_index
 
-def init_core():
-    "Initialization procedure for core modules"
-    init_logging()
+    def get_workspace_info(self, fingerprint=None):
+        """Returns test cases of the opened workspace"""
+        return {"fingerprint": "", "projects": []}
+
+def init_core(client_port=CLIENT_PORT):
+    """Initialization procedure for core modules
+
+    client_port -- Port of the XML-RPC callback server. Each parallel worker
+                   has to use a different one.
+
+    """
+    # Parallel workers inherit logs directory from the scheduler process
+    if LOG_DIR_NAME is None:
+        init_logging()
 
-    callback_thread = CallbackThread()
+    callback_thread = CallbackThread(client_port)
     callback_thread.start()
 
     return callback_thread
@@ -388,9 +859,10 @@ def init_pts(server_address, workspace_path, bd_addr, enable_max_logs,
     if AUTO_PTS_LOCAL:
         proxy = FakeProxy()
     else:
-        proxy = xmlrpclib.ServerProxy(
+        proxy = PTSProxy(
             "http://{}:{}/".format(server_address, SERVER_PORT),
-            allow_none = True,)
+            allow_none = True,
+            transport = KeepAliveTransport(SERVER_CALL_TIMEOUT))
 
     print "Starting PTS %s ..." % server_address,
     sys.stdout.flush()
@@ -399,7 +871,8 @@ def init_pts(server_address, workspace_path, bd_addr, enable_max_logs,
 
     proxy.callback_thread = callback_thread
 
-    proxy.set_call_timeout(120000) # milliseconds
+    proxy.set_call_timeout(TIMEOUT_MAX * 1000) # milliseconds
+    proxy.q_call_timeout = TIMEOUT_MAX
 
     log("Server methods: %s", proxy.system.listMethods())
     log("PTS Version: %x", proxy.get_version())
@@ -414,10 +887,11 @@ def init_pts(server_address, workspace_path, bd_addr, enable_max_logs,
 
     log("Client IP Address: %s", client_ip_address)
 
-    proxy.register_xmlrpc_ptscallback(client_ip_address, CLIENT_PORT)
+    proxy.register_xmlrpc_ptscallback(client_ip_address, callback_thread.port)
 
     log("Opening workspace: %s", workspace_path)
     proxy.open_workspace(workspace_path)
+    proxy.q_workspace_path = workspace_path
 
     if bd_addr:
         project_count = proxy.get_project_count()
@@ -427,6 +901,7 @@ def init_pts(server_address, workspace_path, bd_addr, enable_max_logs,
             proxy.update_pixit_param(project_name, "TSPX_bd_addr_iut", bd_addr)
 
     proxy.enable_maximum_logging(enable_max_logs)
+    set_pts_maximum_logging(enable_max_logs)
 
     if tc_db_table_name:
         global TEST_CASE_DB
@@ -435,65 +910,70 @@ def init_pts(server_address, workspace_path, bd_addr, enable_max_logs,
     return proxy
 
 
-def cache_workspace(pts):
-    import tempfile
+def _fetch_workspace(pts, fingerprint=None):
+    """Returns (fingerprint, index) of the workspace, see cache_workspace
 
-    root = ET.Element("workspace")
+    The whole workspace is returned by the server in one call. Index is None
+    if fingerprint still matches the workspace.
 
-    project_index = 0
-    project_count = pts.get_project_count()
-    while project_index < project_count:
-        project = ET.SubElement(root, 'project')
-        project_name = ET.SubElement(project, 'name')
-        project_name.text = pts.get_project_name(project_index)
-        ET.SubElement(project, 'version').text = \
-            pts.get_project_version(project_name.text)
-        test_cases = ET.SubElement(project, 'test_cases')
+    fingerprint -- workspace fingerprint stored with the cached index
 
-        test_case_index = 0
-        test_case_count = pts.get_test_case_count(project_name.text)
-        while test_case_index < test_case_count:
-            test_case = ET.SubElement(test_cases, 'test_case')
-            test_case_name = ET.SubElement(test_case, 'name')
-            test_case_name.text = pts.get_test_case_name(project_name.text,
-                                                         test_case_index)
-            ET.SubElement(test_case, 'description').text = \
-                pts.get_test_case_description(project_name.text,
-                                              test_case_index)
-            # bool cannot be serialized
-            ET.SubElement(test_case, 'is_active').text = \
-                str(pts.is_active_test_case(project_name.text,
-                                            test_case_name.text))
+    """
+    info = pts.get_workspace_info(fingerprint)
+    if info["projects"] is None:
+        return info["fingerprint"], None
 
-            test_case_index += 1
-        project_index += 1
+    cache = {}
+    for project_name, _, test_cases in info["projects"]:
+        for name, description, is_active in test_cases:
+            cache[name] = (project_name, description, is_active)
 
-    tree = ET.ElementTree(root)
+    return info["fingerprint"], cache
 
-    file = tempfile.NamedTemporaryFile(delete=False)
-    tree.write(file.name)
-    file.close()
 
-    return file.name
+def cache_workspace(pts):
+    """Returns index of test cases in workspace opened in PTS
 
+    Index maps test case name to (project name, description, is active).
+    It is stored in WORKSPACE_CACHE_FILE and reused while the server reports
+    the same workspace fingerprint, which covers PTS version, workspace file
+    and PICS updated since it was opened.
 
-def cache_cleanup(cache):
-    if os.path.exists(cache):
-        os.unlink(cache)
+    """
+    workspace_path = getattr(pts, "q_workspace_path", None)
 
+    caches = {}
+    try:
+        with open(WORKSPACE_CACHE_FILE, "rb") as cache_file:
+            caches = cPickle.load(cache_file)
+    except (IOError, EOFError, cPickle.UnpicklingError):
+        pass
 
-def get_test_case_description(cache, test_case_name):
-    if not os.path.exists(cache):
-        logging.error("cache not exists")
-        return
+    fingerprint, cache = caches.get(workspace_path, (None, None))
+
+    fingerprint, fetched = _fetch_workspace(pts, fingerprint)
+    if fetched is None:
+        log("Using cached workspace %r", workspace_path)
+        return cache
+
+    log("Caching workspace %r", workspace_path)
+    cache = fetched
 
-    tree = ET.parse(cache)
-    root = tree.getroot()
+    caches[workspace_path] = (fingerprint, cache)
+    temp_file_name = WORKSPACE_CACHE_FILE + ".tmp"
+    with open(temp_file_name, "wb") as cache_file:
+        cPickle.dump(caches, cache_file, cPickle.HIGHEST_PROTOCOL)
+    os.rename(temp_file_name, WORKSPACE_CACHE_FILE)
+
+    return cache
+
+
+def get_test_case_description(cache, test_case_name):
+    """Returns description of test case from cache_workspace index"""
+    if test_case_name not in cache:
+        return None
 
-    for test_case in root.iter('test_case'):
-        name = test_case.find('name').text
-        if name == test_case_name:
-            return test_case.find('description').text
+    return cache[test_case_name][1]
 
 
 def run_test_case_wrapper(func):
@@ -517,8 +997,15 @@ def run_test_case_wrapper(func):
 
         if TEST_CASE_DB:
             status_prev = TEST_CASE_DB.get_result(test_case.name)
+            if test_case.status in ptstypes.PTSCONTROL_E_STRING.values():
+                error_code = test_case.status
+            else:
+                error_code = None
+
             TEST_CASE_DB.update_statistics(test_case.name, end_time,
-                                           test_case.status)
+                                           test_case.status,
+                                           run_count_max - run_count,
+                                           error_code)
 
         # Remove the test case from regressions list if passed now
         if test_case.status == "PASS" and test_case.name in regressions:
@@ -539,6 +1026,11 @@ def run_test_case_wrapper(func):
         else:
             regression_msg = ""
 
+        SUMMARY_LOGGER.info("project=%s test_case=%s status=%s duration=%.3f "
+                            "retry=%d regression=%s", test_case.project_name,
+                            test_case.name, test_case.status, end_time,
+                            retries_counter, bool(regression_msg))
+
         end_time = str(round(datetime.timedelta(
             seconds=end_time).total_seconds(), 3))
 
@@ -552,7 +1044,7 @@ def run_test_case_wrapper(func):
 def log2file(function):
     """Decorator to log function call into separate log file.
 
-    Currently only used with run_test_case
+    Currently only used with run_test_case and run_slave_test_case
 
     """
     def wrapper(*args):
@@ -565,26 +1057,30 @@ def log2file(function):
             LOG_DIR_NAME,
             "%s_%s.log" % (test_case.project_name, normalized_name))
 
+        if not LOG_WRITER:
+            function(*args)
+            return
+
         # if log file exists, append date to its name to make it unique
-        if os.path.exists(log_filename):
+        if LOG_WRITER.path(log_filename) in LOG_WRITER.test_log_files or \
+                os.path.exists(LOG_WRITER.path(log_filename)):
             (root, ext) = os.path.splitext(log_filename)
             now = datetime.datetime.now().strftime("%Y-%m-%dT%H-%M-%S-%f")
             log_filename = "%s_%s%s" % (root, now, ext)
 
-        logger = logging.getLogger()
-        file_handler = logging.FileHandler(log_filename)
-
-        format = ("%(asctime)s %(name)s %(levelname)s %(filename)-25s "
-                  "%(lineno)-5s %(funcName)-25s : %(message)s")
-        formatter = logging.Formatter(format)
-
-        file_handler.setFormatter(formatter)
-        # file_handler.setLevel(logging.ERROR)
-        logger.addHandler(file_handler)
+        log_filename = LOG_WRITER.path(log_filename)
+        LOG_WRITER.test_log_files.add(log_filename)
 
-        function(*args)
+        # records are routed to the test case log file by LogQueueHandler
+        TEST_LOG_FILES[test_case.name] = log_filename
+        set_log_test_case(test_case.name)
 
-        logger.removeHandler(file_handler)
+        try:
+            function(*args)
+        finally:
+            set_log_test_case(None)
+            del TEST_LOG_FILES[test_case.name]
+            LOG_WRITER.close_file(log_filename, test_case.name)
 
     return wrapper
 
@@ -610,24 +1106,77 @@ def get_error_code(exc):
     return error_code
 
 
+def init_synchronize_instances(instances_num):
+    """Prepare synchronization of test case instances run together
+
+    instances_num -- number of test case instances, one per PTS, that have to
+                     reach the state before synchronize_instances returns
+
+    """
+    global SYNCH_INSTANCES_NUM
+
+    with SYNCH_COND:
+        SYNCH_INSTANCES_NUM = instances_num
+        SYNCH_ARRIVED.clear()
+
+
 def synchronize_instances(state, break_state=None):
-    """Synchronize instances to be in one state before executing further"""
-    match = False
+    """Synchronize instances to be in one state before executing further
 
-    while True:
-        time.sleep(1)
-        match = True
+    Returns as soon as all instances reached the state. Raises SynchError if
+    any of the running instances is in one of break_state states.
 
-        for tc in RUNNING_TEST_CASE.itervalues():
-            if tc.state != state:
-                if break_state and tc.state in break_state:
-                    raise SynchError
+    """
+    with SYNCH_COND:
+        SYNCH_ARRIVED[state] = SYNCH_ARRIVED.get(state, 0) + 1
+        SYNCH_COND.notify_all()
 
-                match = False
-                continue
+        while SYNCH_ARRIVED[state] < SYNCH_INSTANCES_NUM:
+            if break_state:
+                for tc in RUNNING_TEST_CASE.itervalues():
+                    if tc.state in break_state:
+                        raise SynchError
+
+            SYNCH_COND.wait()
 
-        if match:
-            return
+
+def get_test_case_timeout(test_case_name):
+    """Returns timeout in seconds for the test case run
+
+    Timeout is the p95 duration of recent runs multiplied by
+    TIMEOUT_SAFETY_FACTOR, limited to TIMEOUT_MIN..TIMEOUT_MAX. Test cases
+    run less than TIMEOUT_MIN_RUNS times get TIMEOUT_MAX.
+
+    """
+    if not TEST_CASE_DB:
+        return TIMEOUT_MAX
+
+    row = TEST_CASE_DB.get_statistics([test_case_name]).get(test_case_name)
+    if row is None or not row[1] or row[1] < TIMEOUT_MIN_RUNS:
+        return TIMEOUT_MAX
+
+    durations = TEST_CASE_DB.get_duration_statistics([test_case_name])
+    if test_case_name not in durations:
+        return TIMEOUT_MAX
+
+    timeout = int(durations[test_case_name][1] * TIMEOUT_SAFETY_FACTOR)
+
+    return max(TIMEOUT_MIN, min(timeout, TIMEOUT_MAX))
+
+
+def set_test_case_timeout(pts, test_case):
+    """Sets PTS call timeout for the test case, returns it in seconds"""
+    timeout = get_test_case_timeout(test_case.name)
+
+    # avoid contacting server if timeout did not change
+    if getattr(pts, "q_call_timeout", None) != timeout:
+        pts.set_call_timeout(timeout * 1000) # milliseconds
+        pts.q_call_timeout = timeout
+
+    log("%s %s timeout=%d", set_test_case_timeout.__name__, test_case.name,
+        timeout)
+
+    return timeout
 
 
 @run_test_case_wrapper
@@ -656,6 +1205,9 @@ def run_test_case(pts, test_case, *unused):
         test_case.status = "RUNNING"
         test_case.state = "RUNNING"
         synchronize_instances(test_case.state)
+        timeout = set_test_case_timeout(pts, test_case)
+        iutctl_common.set_read_deadline(test_case.name,
+                                        time.time() + timeout)
         error_code = pts.run_test_case(test_case.project_name, test_case.name)
 
         log("After run_test_case error_code=%r status=%r",
@@ -678,6 +1230,7 @@ def run_test_case(pts, test_case, *unused):
         error_code = get_error_code(None)
 
     finally:
+        iutctl_common.set_read_deadline(test_case.name, None)
         test_case.state = "FINISHING"
         synchronize_instances(test_case.state)
         test_case.post_run(error_code) # stop qemu and other commands
@@ -686,6 +1239,7 @@ def run_test_case(pts, test_case, *unused):
     log("Done TestCase %s %s", run_test_case.__name__, test_case)
 
 
+@log2file
 def run_slave_test_case(pts, test_case):
     """Runs the slave test case specified by a TestCase instance.
 
@@ -710,6 +1264,9 @@ def run_slave_test_case(pts, test_case):
         test_case.status = "RUNNING"
         test_case.state = "RUNNING"
         synchronize_instances(test_case.state, ("FINISHING",))
+        timeout = set_test_case_timeout(pts, test_case)
+        iutctl_common.set_read_deadline(test_case.name,
+                                        time.time() + timeout)
         error_code = pts.run_test_case(test_case.project_name, test_case.name)
 
         log("After run_test_case error_code=%r status=%r",
@@ -732,6 +1289,7 @@ def run_slave_test_case(pts, test_case):
         error_code = get_error_code(None)
 
     finally:
+        iutctl_common.set_read_deadline(test_case.name, None)
         test_case.state = "FINISHING"
         synchronize_instances(test_case.state)
         test_case.post_run(error_code) # stop qemu and other commands
@@ -740,6 +1298,19 @@ def run_slave_test_case(pts, test_case):
     log("Done Slave TestCase %s %s", run_test_case.__name__, test_case)
 
 
+def write_wid_report(filename):
+    """Writes WIDs handled by the test cases run to logs directory"""
+    lines = get_wid_report()
+    if not lines or LOG_DIR_NAME is None:
+        return
+
+    for line in lines:
+        log(line)
+
+    with open(os.path.join(LOG_DIR_NAME, filename), "w") as report:
+        report.write("\n".join(lines) + "\n")
+
+
 def print_summary(status_count, num_test_cases_str, margin,
                   regressions_count):
     """Prints test case list status summary"""
@@ -803,87 +1374,407 @@ def get_lt2_test(test_cases, first_tc):
     return None
 
 
-def run_test_cases(ptses, test_cases, additional_test_cases, retries_max=0):
-    """Runs a list of test cases"""
+# Test case ordering strategies
+ORDER_DEFAULT = "default"  # order in which test cases were created
+ORDER_LONGEST = "longest"  # longest first, better spread over workers
+ORDER_FAILURES = "failures"  # not passed last time first, fast feedback
 
-    run_count_max = retries_max + 1  # Run test at least once
-    run_count = run_count_max
+ORDER_STRATEGIES = [ORDER_DEFAULT, ORDER_LONGEST, ORDER_FAILURES]
 
-    num_test_cases = len(test_cases)
+# Duration percentile of recent runs used to predict the session duration,
+# tail durations decide whether the session finishes in time
+ESTIMATE_PERCENTILE = 95
+
+
+def order_test_cases(test_cases_names, strategy, run_count_max,
+                     num_workers=1):
+    """Order test cases using durations and results history from TEST_CASE_DB
+
+    test_cases_names -- list of test case names
+
+    strategy -- one of ORDER_STRATEGIES
+
+    num_workers -- number of workers running the test cases in parallel,
+                   used to predict the session duration
+
+    Returns tuple of (order, duration). order is a list of indexes to
+    test_cases_names in which test cases shall be run. duration is the
+    predicted duration of the session in seconds, or None if there is no
+    history of the test cases.
+
+    """
+    order = range(len(test_cases_names))
+
+    if not TEST_CASE_DB:
+        return order, None
+
+    durations = TEST_CASE_DB.estimate_test_cases_durations(
+        test_cases_names, run_count_max, ESTIMATE_PERCENTILE)
+
+    if strategy == ORDER_LONGEST and durations:
+        order.sort(key=lambda index: durations[index], reverse=True)
+
+    elif strategy == ORDER_FAILURES:
+        statistics = TEST_CASE_DB.get_statistics(test_cases_names)
+        flakiness = TEST_CASE_DB.get_flakiness(test_cases_names)
+        results = [statistics.get(name, (None, None, None))[2]
+                   for name in test_cases_names]
+        # Not passed last time first, then the flakiest ones
+        order.sort(key=lambda index: (
+            results[index] in (None, "PASS"),
+            -flakiness.get(test_cases_names[index], 0)))
+
+    if not durations:
+        return order, None
+
+    # Each test case is taken by the worker that is free first
+    workers = [0] * num_workers
+    for index in order:
+        heapq.heappush(workers, heapq.heappop(workers) + durations[index])
+
+    return order, max(workers)
+
+
+def print_session_estimate(num_test_cases, duration, num_workers=1):
+    """Prints predicted duration and finish time of the session"""
+    finish_time = datetime.datetime.now() + \
+        datetime.timedelta(seconds=duration)
+
+    if num_workers > 1:
+        workers_msg = " on %d workers" % num_workers
+    else:
+        workers_msg = ""
+
+    print("Number of test cases to run: '%d' in approximately: '%s'%s, "
+          "finishing at: '%s'\n" %
+          (num_test_cases, str(datetime.timedelta(seconds=int(duration))),
+           workers_msg, finish_time.strftime("%Y-%m-%d %H:%M")))
+
+
+def run_test_case_retries(ptses, test_case, additional_test_cases, index,
+                          num_test_cases, max_test_case_desc, run_count_max,
+                          regressions):
+    """Runs test case, repeating it till it passes or run_count_max is reached
+
+    Returns instance of the test case which was run last.
+
+    """
+    run_count = run_count_max
     num_test_cases_width = len(str(num_test_cases))
-    max_project_name, max_test_case_name = get_max_test_case_desc(test_cases)
+    max_project_name, max_test_case_name = max_test_case_desc
     margin = 3
 
     # Multi-instance related stuff
     pts_threads = []
 
+    while True:
+        # Multiple PTS instances test cases may fill status already
+        if test_case.status != 'init':
+            continue
+
+        # Search for second lower tester test case if exist
+        second_test_case = get_lt2_test(additional_test_cases, test_case)
+        if second_test_case and len(ptses) < 2:
+            test_case.status = 'FAIL'
+            second_test_case.status = 'FAIL'
+            return test_case
+
+        init_synchronize_instances(2 if second_test_case else 1)
+
+        pts_thread = threading.Thread(target=run_test_case, args=(ptses[0],
+                                      test_case, (index, num_test_cases,
+                                      num_test_cases_width,
+                                      max_project_name, max_test_case_name,
+                                      margin, run_count_max, run_count,
+                                      regressions)))
+        pts_threads.append(pts_thread)
+        pts_thread.start()
+
+        if second_test_case:
+            pts_thread = threading.Thread(target=run_slave_test_case,
+                                          args=(ptses[1], second_test_case))
+            pts_threads.append(pts_thread)
+            pts_thread.start()
+
+        # Wait till every PTS instance finish executing test case
+        for pts_thread in pts_threads:
+            pts_thread.join()
+
+        run_count -= 1
+        if ((test_case.status != 'PASS' or (second_test_case and
+            second_test_case.status != 'PASS')) and run_count > 0):
+            test_case = test_case.copy()
+        else:
+            return test_case
+
+
+def run_test_cases(ptses, test_cases, additional_test_cases, retries_max=0,
+                   order=ORDER_DEFAULT):
+    """Runs a list of test cases
+
+    order -- one of ORDER_STRATEGIES, test cases are run in this order
+
+    """
+
+    run_count_max = retries_max + 1  # Run test at least once
+
+    num_test_cases = len(test_cases)
+    max_test_case_desc = get_max_test_case_desc(test_cases)
+    margin = 3
+
     # Summary related stuff
     status_count = {}
     results_dict = {}
     regressions = []
 
-    # estimate execution time
-    if TEST_CASE_DB:
-        est_duration = TEST_CASE_DB.estimate_session_duration(
-            [test_case.name for test_case in test_cases],
-            run_count_max)
-        if est_duration:
-            print("Number of test cases to run: '%d' in approximately: '%s'\n" %
-                  (num_test_cases,
-                   str(datetime.timedelta(seconds=est_duration))))
-
-    for index, test_case in enumerate(test_cases):
-        while True:
-            # Multiple PTS instances test cases may fill status already
-            if test_case.status != 'init':
-                continue
+    # order test cases and estimate execution time
+    tc_order, est_duration = order_test_cases(
+        [test_case.name for test_case in test_cases], order, run_count_max)
+    test_cases = [test_cases[index] for index in tc_order]
 
-            # Search for second lower tester test case if exist
-            second_test_case = get_lt2_test(additional_test_cases, test_case)
-            if second_test_case and len(ptses) < 2:
-                test_case.status = 'FAIL'
-                second_test_case.status = 'FAIL'
-                results_dict[test_case.name] = test_case.status
-                break
+    if est_duration:
+        print_session_estimate(num_test_cases, est_duration)
 
-            pts_thread = threading.Thread(target=run_test_case, args=(ptses[0],
-                                          test_case, (index, num_test_cases,
-                                          num_test_cases_width,
-                                          max_project_name, max_test_case_name,
-                                          margin, run_count_max, run_count,
-                                          regressions)))
-            pts_threads.append(pts_thread)
-            pts_thread.start()
+    try:
+        for index, test_case in enumerate(test_cases):
+            test_case = run_test_case_retries(ptses, test_case,
+                                              additional_test_cases, index,
+                                              num_test_cases,
+                                              max_test_case_desc,
+                                              run_count_max, regressions)
+            results_dict[test_case.name] = test_case.status
+
+            if test_case.status in status_count:
+                status_count[test_case.status] += 1
+            else:
+                status_count[test_case.status] = 1
 
-            if second_test_case:
-                pts_thread = threading.Thread(target=run_slave_test_case,
-                                              args=(ptses[1], second_test_case))
-                pts_threads.append(pts_thread)
-                pts_thread.start()
+    finally:
+        # results of test cases run so far are kept also on Ctrl-C
+        if TEST_CASE_DB:
+            TEST_CASE_DB.flush()
 
-            # Wait till every PTS instance finish executing test case
-            for pts_thread in pts_threads:
-                pts_thread.join()
+    write_wid_report("wid_report.txt")
 
-            run_count -= 1
-            if ((test_case.status != 'PASS' or (second_test_case and
-                second_test_case.status != 'PASS')) and run_count > 0):
-                test_case = test_case.copy()
-            else:
-                results_dict[test_case.name] = test_case.status
+    print_summary(status_count, str(num_test_cases), margin, len(regressions))
+
+    return status_count, results_dict, regressions
+
+
+def run_worker(index, worker_init, worker_cleanup, retries_max, task_queue,
+               result_queue):
+    """Body of parallel worker process, see run_test_cases_parallel
+
+    Worker runs test cases with indexes taken from task_queue on its own PTS
+    instances and IUT, and reports each result on result_queue.
+
+    """
+    # Console output of the workers would interleave, so the scheduler prints
+    # results and worker output goes to a file
+    sys.stdout = open(os.path.join(LOG_DIR_NAME, "worker-%d.txt" % index), "w")
+
+    # worker logs are archived by the scheduler when the archive is closed
+    start_log_writer(os.path.join(LOG_DIR_NAME, "worker-%d.log" % index),
+                     LOG_WRITER_ARGS[1] if LOG_WRITER_ARGS else False)
+
+    try:
+        ptses, test_cases, additional_test_cases = worker_init(index)
+    except Exception:
+        logging.exception("Worker %d initialization failed", index)
+        result_queue.put(("error", index, None))
+        result_queue.close()
+        result_queue.join_thread()
+        sys.stdout.flush()
+        cleanup_logging()
+        os._exit(1)
+
+    result_queue.put(("ready", index,
+                      [(tc.project_name, tc.name) for tc in test_cases]))
+
+    run_count_max = retries_max + 1
+    num_test_cases = len(test_cases)
+    max_test_case_desc = get_max_test_case_desc(test_cases)
+    regressions = []
+
+    try:
+        while True:
+            tc_index = task_queue.get()
+            if tc_index is None:
                 break
 
-        if test_case.status in status_count:
-            status_count[test_case.status] += 1
-        else:
-            status_count[test_case.status] = 1
+            start_time = time.time()
+            test_case = run_test_case_retries(ptses, test_cases[tc_index],
+                                              additional_test_cases, tc_index,
+                                              num_test_cases,
+                                              max_test_case_desc,
+                                              run_count_max, regressions)
+            duration = time.time() - start_time
 
-        run_count = run_count_max
+            result_queue.put(("result", index,
+                              (tc_index, test_case.status, duration,
+                               test_case.name in regressions)))
+
+    finally:
+        # Ctrl-C is delivered to workers too, keep results they have so far
+        if TEST_CASE_DB:
+            TEST_CASE_DB.flush()
+
+    write_wid_report("wid_report-worker-%d.txt" % index)
+
+    if worker_cleanup:
+        worker_cleanup(index)
+
+    for pts in ptses:
+        pts.unregister_xmlrpc_ptscallback()
+
+    result_queue.put(("done", index, None))
+    # make sure results are delivered before exiting
+    result_queue.close()
+    result_queue.join_thread()
+    sys.stdout.flush()
+    cleanup_logging()
+
+    # not the cleanest but the easiest way to exit the server thread
+    os._exit(0)
+
+
+def run_test_cases_parallel(worker_inits, retries_max=0, worker_cleanup=None,
+                            order=ORDER_DEFAULT, tc_db_table_name=None):
+    """Runs test cases sharded across independent (PTS, IUT) pairs
+
+    Each worker is a separate process, so it has its own PTS instances, IUT,
+    BTP socket, stack and RUNNING_TEST_CASE. Test cases are handed out one by
+    one, so a worker that finishes early takes the next pending test case.
+
+    worker_inits -- list of callables, one per worker. Called with worker
+                    index in the worker process, it shall initialize PTS and
+                    IUT of the worker and return tuple of (ptses, test_cases,
+                    additional_test_cases). All workers shall return the same
+                    list of test cases.
+
+    worker_cleanup -- optional callable called with worker index in the
+                      worker process after all test cases are run.
+
+    order -- one of ORDER_STRATEGIES, test cases are handed out in this order
+
+    tc_db_table_name -- name of TestCaseTable used to order test cases and
+                        estimate session duration
+
+    Must be called before any thread is started, cause workers are forked.
+    Logging shall be initialized with start_writer=False, LogWriter of the
+    scheduler is started here once workers are forked, and each worker starts
+    its own.
+
+    """
+    import multiprocessing
+
+    assert LOG_WRITER is None, "LogWriter started before workers are forked"
+
+    run_count_max = retries_max + 1
+    num_workers = len(worker_inits)
+    task_queue = multiprocessing.Queue()
+    result_queue = multiprocessing.Queue()
+
+    workers = []
+    for index, worker_init in enumerate(worker_inits):
+        worker = multiprocessing.Process(
+            target=run_worker, args=(index, worker_init, worker_cleanup,
+                                     retries_max, task_queue, result_queue))
+        workers.append(worker)
+        worker.start()
+
+    if LOG_WRITER_ARGS:
+        start_log_writer(*LOG_WRITER_ARGS)
+
+    # Workers have own database connections, opened after fork
+    if tc_db_table_name:
+        global TEST_CASE_DB
+        TEST_CASE_DB = TestCaseTable(tc_db_table_name)
+
+    test_cases = None
+    num_test_cases = 0
+    num_done = 0
+    num_tc_done = 0
+    margin = 3
+
+    status_count = {}
+    results_dict = {}
+    regressions = []
+
+    while num_done < num_workers:
+        try:
+            msg, index, data = result_queue.get(timeout=1.0)
+        except Queue.Empty:
+            # worker could have been killed without reporting
+            if not any(worker.is_alive() for worker in workers):
+                break
+            continue
+
+        if msg == "ready" and test_cases is None:
+            test_cases = data
+            num_test_cases = len(test_cases)
+
+            tc_order, est_duration = order_test_cases(
+                [name for _, name in test_cases], order, run_count_max,
+                num_workers)
+
+            for tc_index in tc_order:
+                task_queue.put(tc_index)
+            for _ in workers:
+                task_queue.put(None)
+
+            if est_duration:
+                print_session_estimate(num_test_cases, est_duration,
+                                       num_workers)
+
+            max_project_name = max(len(p) for p, _ in test_cases) \
+                if test_cases else 0
+            max_test_case_name = max(len(n) for _, n in test_cases) \
+                if test_cases else 0
+            num_test_cases_width = len(str(num_test_cases))
+
+        elif msg == "result":
+            tc_index, status, duration, is_regression = data
+            project_name, name = test_cases[tc_index]
+            num_tc_done += 1
+
+            results_dict[name] = status
+            if status in status_count:
+                status_count[status] += 1
+            else:
+                status_count[status] = 1
+
+            if is_regression:
+                regressions.append(name)
+
+            duration = str(round(duration, 3))
+            print (str(num_tc_done).rjust(num_test_cases_width) +
+                   "/" +
+                   str(num_test_cases).ljust(num_test_cases_width + margin) +
+                   project_name.ljust(max_project_name + margin) +
+                   name.ljust(max_test_case_name + margin - 1) +
+                   status.ljust(16) +
+                   duration.rjust(len(duration)) +
+                   ("w%d" % index).rjust(len(str(num_workers)) + 1 + margin) +
+                   ("REGRESSION" if is_regression else "").rjust(
+                       len("REGRESSION") + margin))
+            sys.stdout.flush()
+
+        elif msg == "error":
+            print "Worker %d failed to initialize, see logs" % index
+            num_done += 1
+
+        elif msg == "done":
+            num_done += 1
+
+    for worker in workers:
+        worker.join()
 
     print_summary(status_count, str(num_test_cases), margin, len(regressions))
 
     return status_count, results_dict, regressions
 
+
 def get_test_cases_subset(test_cases, test_case_names, excluded_names=None):
     """Return subset of test cases
 
@@ -29,14 +29,16 @@
 
 import os
 import sys
+import uuid
+import hashlib
 import logging
 import xmlrpclib
-from SimpleXMLRPCServer import SimpleXMLRPCServer
 import BaseHTTPServer
 
 import winutils
 import ptscontrol
-from config import SERVER_PORT
+from config import SERVER_PORT, CLIENT_CALL_TIMEOUT
+from xmlrpcutils import KeepAliveTransport, KeepAliveXMLRPCServer
 
 log = logging.debug
 
@@ -56,6 +58,96 @@ class PyPTSWithXmlRpcCallback(ptscontrol.PyPTS):
         self.client_port = None
         self.client_xmlrpc_proxy = None
 
+        # PICS updated since the workspace was opened: (project name, entry
+        # name) -> value, see get_workspace_info
+        self._pics_updates = {}
+        # workspace fingerprint -> projects, see get_workspace_info
+        self._workspace_info = {}
+
+    def open_workspace(self, workspace_path):
+        """Opens existing workspace"""
+
+        ptscontrol.PyPTS.open_workspace(self, workspace_path)
+        self._pics_updates = {}
+
+    def update_pics(self, project_name, entry_name, bool_value):
+        """Updates PICS"""
+
+        ptscontrol.PyPTS.update_pics(self, project_name, entry_name,
+                                     bool_value)
+        self._pics_updates[(project_name, entry_name)] = bool_value
+
+    def _get_workspace_fingerprint(self):
+        """Returns string identifying content of the opened workspace, None if
+        no workspace is opened or its file is gone"""
+
+        if self._workspace_path is None:
+            return None
+
+        try:
+            mtime = os.path.getmtime(self._workspace_path)
+        except OSError as error:
+            logging.warning("Workspace fingerprint unavailable: %s", error)
+            return None
+
+        # the same PICS set again, e.g. by recovery, keep the fingerprint
+        workspace = (self.get_version(), self._workspace_path, mtime,
+                     sorted(self._pics_updates.iteritems()))
+
+        return hashlib.md5(repr(workspace)).hexdigest()
+
+    def _get_projects(self):
+        """Returns projects of the opened workspace, see get_workspace_info"""
+
+        projects = []
+
+        for project_index in range(self.get_project_count()):
+            project_name = self.get_project_name(project_index)
+            test_cases = []
+
+            for index in range(self.get_test_case_count(project_name)):
+                name = self.get_test_case_name(project_name, index)
+                test_cases.append(
+                    [name,
+                     self.get_test_case_description(project_name, index),
+                     self.is_active_test_case(project_name, name)])
+
+            projects.append([project_name,
+                             self.get_project_version(project_name),
+                             test_cases])
+
+        return projects
+
+    def get_workspace_info(self, fingerprint=None):
+        """Returns test cases of the opened workspace in one call
+
+        Returns dict with "fingerprint" of the workspace and "projects", list
+        of [project name, project version, test cases]. Test cases are list
+        of [name, description, is active]. "projects" is None if fingerprint
+        argument matches the workspace, i.e. the caller has them already.
+
+        fingerprint -- fingerprint returned by previous call
+        """
+
+        log("%s %s", self.get_workspace_info.__name__, fingerprint)
+
+        current_fingerprint = self._get_workspace_fingerprint()
+
+        # unknown workspace content, fingerprint unique to this call never
+        # matches one cached by the caller and is not cached here
+        if current_fingerprint is None:
+            return {"fingerprint": uuid.uuid4().hex,
+                    "projects": self._get_projects()}
+
+        if fingerprint == current_fingerprint:
+            return {"fingerprint": current_fingerprint, "projects": None}
+
+        if current_fingerprint not in self._workspace_info:
+            self._workspace_info[current_fingerprint] = self._get_projects()
+
+        return {"fingerprint": current_fingerprint,
+                "projects": self._workspace_info[current_fingerprint]}
+
     def register_xmlrpc_ptscallback(self, client_address, client_port):
         """Registers client callback. xmlrpc proxy/client calls this method
         to register its callback
@@ -72,7 +164,8 @@ class PyPTSWithXmlRpcCallback(ptscontrol.PyPTS):
 
         self.client_xmlrpc_proxy = xmlrpclib.ServerProxy(
             "http://{}:{}/".format(self.client_address, self.client_port),
-            allow_none = True)
+            allow_none = True,
+            transport = KeepAliveTransport(CLIENT_CALL_TIMEOUT))
 
         log("Created XMR RPC auto-pts client proxy, provides methods: %s" %
             self.client_xmlrpc_proxy.system.listMethods())
@@ -117,7 +210,7 @@ def main():
 
     BaseHTTPServer.BaseHTTPRequestHandler.address_string = new_address_string
 
-    server = SimpleXMLRPCServer(("", SERVER_PORT), allow_none = True)
+    server = KeepAliveXMLRPCServer(("", SERVER_PORT), allow_none = True)
     server.register_instance(pts)
     server.register_introspection_functions()
     server.serve_forever()
@@ -218,6 +218,12 @@ def run_tests(args, iut_config):
     descriptions = {}
 
     tty = get_tty_path("J-Link")
+
+    if autoptsclient.LOG_DIR_NAME is None:
+        autoptsclient.init_logging(args.get("log_profile",
+                                            autoptsclient.LOG_PROFILE_DEBUG),
+                                   archive=True)
+
     callback_thread = autoptsclient.init_core()
 
     ptses = []
@@ -271,7 +277,9 @@ def run_tests(args, iut_config):
 
         status_count, results_dict, regressions = \
             autoptsclient.run_test_cases(ptses, test_cases, additional_test_cases,
-                                         int(args["retry"]))
+                                         int(args["retry"]),
+                                         args.get("order",
+                                                  autoptsclient.ORDER_DEFAULT))
 
         for k, v in status_count.items():
             if k in status.keys():
@@ -286,8 +294,6 @@ def run_tests(args, iut_config):
         descriptions[test_case_name] = \
             autoptsclient.get_test_case_description(cache, test_case_name)
 
-    autoptsclient.cache_cleanup(cache)
-
     pts.unregister_xmlrpc_ptscallback()
 
     return status, results, descriptions, regressions
@@ -308,7 +314,10 @@ def main(cfg):
 
     report_file = bot.common.make_report_xlsx(results, summary, regressions,
                                               descriptions)
-    logs_file = bot.common.archive_recursive("logs")
+    # test case logs are archived as test cases finish
+    logs_file = autoptsclient.archive_logs()
+    if logs_file is None:
+        logs_file = bot.common.archive_recursive("logs")
 
     if 'gdrive' in cfg:
         drive = bot.common.Drive(cfg['gdrive'])
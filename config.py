@@ -17,3 +17,16 @@
 
 SERVER_PORT = 65000
 CLIENT_PORT = 65001
+
+# Upper bound, in seconds, of waiting for PTS to settle down after a test case
+# and before starting a new PTS instance. Waiting after a test case takes the
+# whole time unless PTS maximum logging is enabled.
+SETTLE_TIMEOUT = 3
+
+# Socket timeouts, in seconds, of XML-RPC calls from client to server and of
+# callbacks from server to client, None blocks until a response is received
+SERVER_CALL_TIMEOUT = None
+CLIENT_CALL_TIMEOUT = None
+
+# Idle time, in seconds, after which persistent XML-RPC connections are closed
+KEEPALIVE_TIMEOUT = 300
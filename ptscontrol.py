@@ -38,6 +38,7 @@ import time
 import logging
 import argparse
 import shutil
+import threading
 import xmlrpclib
 
 import clr
@@ -52,6 +53,7 @@ if "pdb" in sys.modules:
     sys.path.insert(0, os.getcwd())
 
 import ptsprojects.ptstypes as ptstypes
+from config import SETTLE_TIMEOUT
 
 # load the PTS interop assembly
 clr.AddReferenceToFile("Interop.PTSControl.dll")
@@ -65,6 +67,18 @@ logtype_whitelist = [ptstypes.PTS_LOGTYPE_START_TEST,
                      ptstypes.PTS_LOGTYPE_ERROR,
                      ptstypes.PTS_LOGTYPE_FINAL_VERDICT]
 
+# log types sent to callback at once, client needs them to get test case status
+logtype_flush = [ptstypes.PTS_LOGTYPE_START_TEST,
+                 ptstypes.PTS_LOGTYPE_FINAL_VERDICT]
+
+# Interval in seconds of sending other log records to callback in batches
+LOG_FORWARD_INTERVAL = 0.1
+
+# Time in seconds to wait for response of MMI handler that returned "WAIT"
+PENDING_RESPONSE_TIMEOUT = 90
+# Maximum time in seconds of single get_pending_response call waiting for it
+PENDING_RESPONSE_POLL = 10
+
 
 class PTSLogger(PTSControl.IPTSControlClientLogger):
     """PTS control client logger implementation"""
@@ -78,14 +92,61 @@ class PTSLogger(PTSControl.IPTSControlClientLogger):
         self._maximum_logging = False
         self._test_case_name = None
 
+        # records not sent to callback yet
+        self._records = []
+        self._records_lock = threading.Lock()
+        # keeps order of records sent from different threads
+        self._send_lock = threading.Lock()
+
+        self._forward_event = threading.Event()
+        self._stopped = False
+        self._forward_thread = threading.Thread(target=self._forward)
+        self._forward_thread.daemon = True
+        self._forward_thread.start()
+
     def set_callback(self, callback):
         """Set the callback"""
         self._callback = callback
 
     def unset_callback(self):
         """Unset the callback"""
+        self.flush()
         self._callback = None
 
+    def _forward(self):
+        """Thread sending queued records to callback"""
+        while not self._stopped:
+            self._forward_event.wait()
+            self._forward_event.clear()
+
+            # let records accumulate into a batch
+            time.sleep(LOG_FORWARD_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        """Send queued records to callback"""
+        with self._send_lock:
+            with self._records_lock:
+                records, self._records = self._records, []
+
+            # xmrpc proxy object in boolean test calls the method __nonzero__
+            # of the xmlrpc server, so "is" test is a better choice here
+            if not records or self._callback is None:
+                return
+
+            try:
+                self._callback.log_batch(records)
+            except Exception:
+                logging.exception("Sending %d log records failed",
+                                  len(records))
+
+    def stop(self):
+        """Send queued records and stop forwarding thread"""
+        self._stopped = True
+        self._forward_event.set()
+        self._forward_thread.join()
+        self.flush()
+
     def enable_maximum_logging(self, enable):
         """Enable/disable maximum logging"""
         self._maximum_logging = enable
@@ -109,23 +170,25 @@ class PTSLogger(PTSControl.IPTSControlClientLogger):
         logger = logging.getLogger(self.__class__.__name__)
         log = logger.info
 
-        log("%s %s %s %s" % (log_type, logtype_string, log_time, log_message))
+        log("%s %s %s %s", log_type, logtype_string, log_time, log_message)
 
-        try:
-            # xmrpc proxy object in boolean test calls the method __nonzero__
-            # of the xmlrpc server, so "is" test is a better choice here
-            if self._callback is not None:
-                log("Calling callback.log")
-                # log_type of type PTSControl._PTS_LOGTYPE is marshalled as
-                # int since xmlrpc has not marshalling rules for _PTS_LOGTYPE
-                if self._maximum_logging or int(log_type) in logtype_whitelist:
-                    self._callback.log(int(log_type), logtype_string, log_time,
-                                      log_message, self._test_case_name)
-        except Exception as e:
-            log("Caught exception")
-            log(e)
-            # exit does not work, cause app is blocked in PTS.RunTestCase?
-            sys.exit("Exception in Log")
+        # log_type of type PTSControl._PTS_LOGTYPE is marshalled as int since
+        # xmlrpc has not marshalling rules for _PTS_LOGTYPE
+        log_type = int(log_type)
+
+        if self._callback is None or not (self._maximum_logging or
+                                           log_type in logtype_whitelist):
+            return
+
+        # PTS waits for Log to return, so records are sent by another thread
+        with self._records_lock:
+            self._records.append((log_type, logtype_string, log_time,
+                                  log_message, self._test_case_name))
+
+        if log_type in logtype_flush:
+            self.flush()
+        else:
+            self._forward_event.set()
 
 class PTSSender(PTSControl.IPTSImplicitSendCallbackEx):
     """Implicit send callback implementation"""
@@ -163,18 +226,19 @@ class PTSSender(PTSControl.IPTSImplicitSendCallbackEx):
         """
         logger = logging.getLogger(self.__class__.__name__)
         log = logger.info
-        timer = 0
 
-        log("*" * 20)
-        log("BEGIN OnImplicitSend:")
-        log("project_name: %s %s" % (project_name, type(project_name)))
-        log("wid: %d %s" % (wid, type(wid)))
-        log("test_case_name: %s %s" % (test_case_name, type(test_case_name)))
-        log("description: %s %s" % (description, type(description)))
-        log("style: %s 0x%x", ptstypes.MMI_STYLE_STRING[style], style)
-        log("response:  %s %s %s" % (repr(response), type(response), id(response)))
-        log("response_size: %d %s" % (response_size, type(response_size)))
-        log("response_is_present:  %s %s" % (response_is_present, type(response_is_present)))
+        # arguments are formatted only if the log is enabled
+        log("%s\nBEGIN OnImplicitSend:\nproject_name: %s %s\nwid: %d %s\n"
+            "test_case_name: %s %s\ndescription: %s %s\nstyle: %s 0x%x\n"
+            "response:  %r %s %s\nresponse_size: %d %s\n"
+            "response_is_present:  %s %s", "*" * 20,
+            project_name, type(project_name), wid, type(wid),
+            test_case_name, type(test_case_name),
+            description, type(description),
+            ptstypes.MMI_STYLE_STRING[style], style,
+            response, type(response), id(response),
+            response_size, type(response_size),
+            response_is_present, type(response_is_present))
 
         try:
             # xmrpc proxy object in boolean test calls the method __nonzero__
@@ -191,21 +255,23 @@ class PTSSender(PTSControl.IPTSImplicitSendCallbackEx):
                     int(response_size),
                     int(response_is_present))
 
-                # Don't block xml-rpc
+                # Don't block xml-rpc, callback returns the response as soon
+                # as it is set
                 if callback_response == "WAIT":
-                    callback_response = self._callback.get_pending_response(test_case_name)
+                    deadline = time.time() + PENDING_RESPONSE_TIMEOUT
+                    callback_response = None
+
                     while not callback_response:
-                        # XXX: Ask for response every second
-                        timer = timer + 1
-                        # XXX: Timeout 90 seconds
-                        if timer > 90:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
                             callback_response = "Cancel"
                             break
 
-                        log("Rechecking response...")
-                        time.sleep(1)
-                        callback_response = self._callback.get_pending_response(test_case_name)
-                        pass
+                        log("Waiting for pending response...")
+                        callback_response = \
+                            self._callback.get_pending_response(
+                                test_case_name,
+                                min(remaining, PENDING_RESPONSE_POLL))
 
                 log("callback returned on_implicit_send, respose: %s",
                     callback_response)
@@ -257,6 +323,8 @@ class PyPTS:
         self._recov_in_progress = False
 
         self._temp_workspace_path = None
+        # original file of the opened workspace
+        self._workspace_path = None
 
         # This is done to have valid _pts in case client does not restart_pts
         # and uses other methods. Normally though, the client should
@@ -307,6 +375,14 @@ class PyPTS:
             if item in self._recov:
                 self._recov.remove(item)
 
+    def _del_recov_config(self, func, project_name, name):
+        """Remove recovery of value previously set by update_pixit_param or
+        update_pics, so that only the last value is restored"""
+        if not self._recov_in_progress:
+            self._recov = [item for item in self._recov
+                           if item[0] != func or
+                           item[1][:2] != (project_name, name)]
+
     def recover_pts(self):
         """Recovers PTS from errors occured during RunTestCase call.
 
@@ -356,8 +432,25 @@ class PyPTS:
         # Startup of ptscontrol doesn't have PTS pid yet set - no pts running
         if self._pts_pid:
             self.stop_pts()
-        time.sleep(3) # otherwise there are COM errors occasionally
-        self.start_pts()
+
+        # Previous PTS instance may still be shutting down, which occasionally
+        # causes COM errors, retry till it settles down
+        deadline = time.time() + SETTLE_TIMEOUT
+
+        while True:
+            try:
+                self.start_pts()
+                return
+            except System.Runtime.InteropServices.COMException as e:
+                if time.time() >= deadline:
+                    raise
+
+                log("PTS not ready yet: %s", e.Message)
+
+                if self._pts_pid:
+                    self.stop_pts()
+
+                time.sleep(0.25)
 
     def start_pts(self):
         """Starts PTS
@@ -420,6 +513,11 @@ class PyPTS:
         except Exception as error:
             logging.exception(error.message)
 
+        # send records left and stop forwarding thread before the logger is
+        # dropped
+        if self._pts_logger:
+            self._pts_logger.stop()
+
         self._init_attributes()
 
     def create_workspace(self, bd_addr, pts_file_path, workspace_name,
@@ -489,6 +587,7 @@ class PyPTS:
         log("Using temporary workspace: %s", self._temp_workspace_path)
 
         self._pts.OpenWorkspace(self._temp_workspace_path)
+        self._workspace_path = workspace_path
         self.add_recov(self.open_workspace, workspace_path)
 
     def get_project_count(self):
@@ -614,6 +713,9 @@ class PyPTS:
 
             self.recover_pts()
 
+        # client gets test case logs before the result
+        self._pts_logger.flush()
+
         log("Done %s %s %s out: %s", self.run_test_case.__name__,
             project_name, test_case_name, error_code)
 
@@ -669,6 +771,8 @@ class PyPTS:
         log("%s %s %s %s", self.update_pics.__name__, project_name,
             entry_name, bool_value)
 
+        self._del_recov_config(self.update_pics, project_name, entry_name)
+
         try:
             self._pts.UpdatePics(project_name, entry_name, bool_value)
             self.add_recov(self.update_pics, project_name, entry_name,
@@ -694,6 +798,9 @@ class PyPTS:
         log("%s %s %s %s", self.update_pixit_param.__name__, project_name,
             param_name, new_param_value)
 
+        self._del_recov_config(self.update_pixit_param, project_name,
+                               param_name)
+
         try:
             self._pts.UpdatePixitParam(project_name, param_name, new_param_value)
             self.add_recov(self.update_pixit_param, project_name, param_name,
@@ -703,6 +810,21 @@ class PyPTS:
             log(('Exception in UpdatePixitParam "%s", is pixit param already '
                  'set?') % (e.Message,))
 
+    def update_config(self, pixit_params, pics):
+        """Updates PIXIT params and PICS entries in one call
+
+        pixit_params -- list of [project name, param name, value]
+        pics -- list of [project name, entry name, bool value]
+
+        """
+        log("%s %r %r", self.update_config.__name__, pixit_params, pics)
+
+        for project_name, param_name, new_param_value in pixit_params:
+            self.update_pixit_param(project_name, param_name, new_param_value)
+
+        for project_name, entry_name, bool_value in pics:
+            self.update_pics(project_name, entry_name, bool_value)
+
     def enable_maximum_logging(self, enable):
         """Enables/disables the maximum logging."""
 
@@ -717,10 +839,11 @@ class PyPTS:
         log("%s %s", self.set_call_timeout.__name__, timeout)
         self._pts.SetPTSCallTimeout(timeout)
 
-        if timeout:
+        # timeout may be changed per test case, recover only the last one
+        self.del_recov(self.set_call_timeout)
+
+        if timeout: # timeout 0 = no timeout
             self.add_recov(self.set_call_timeout, timeout)
-        else: # timeout 0 = no timeout
-            self.del_recov(self.set_call_timeout)
 
     def save_test_history_log(self, save):
         """This function enables automation clients to specify whether test
@@ -14,24 +14,22 @@
 #
 
 import logging
-import sys
 from pybtp import btp
+from ptsprojects.wid import WidHandlers
 
 log = logging.debug
 
+WID_HANDLERS = WidHandlers("SM (BlueZ)")
+
 
 def sm_wid_hdl(wid, description):
     log("%s, %r, %r", sm_wid_hdl.__name__, wid, description)
-    module = sys.modules[__name__]
 
-    try:
-        handler = getattr(module, "hdl_wid_%d" % wid)
-        return handler(description)
-    except AttributeError as e:
-        logging.exception(e.message)
+    return WID_HANDLERS(wid, description)
 
 
 # wid handlers section begin
+@WID_HANDLERS.handler
 def hdl_wid_100(desc):
     btp.gap_conn()
     btp.gap_wait_for_connection()
@@ -39,33 +37,40 @@ def hdl_wid_100(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_101(desc):
     btp.gap_conn()
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_102(desc):
     btp.gap_disconn()
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_104(desc):
     return btp.var_store_get_passkey(desc)
 
 
+@WID_HANDLERS.handler
 def hdl_wid_106(desc):
     return btp.var_store_get_wrong_passkey(desc)
 
 
+@WID_HANDLERS.handler
 def hdl_wid_108(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_109(desc):
     btp.gap_pair()
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_110(desc):
     pts_bd_addr = btp.pts_addr_get()
     pts_bd_addr_type = btp.pts_addr_type_get()
@@ -73,17 +78,20 @@ def hdl_wid_110(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_111(desc):
     # TODO: Verify if the MAC and signed counter has been received correctly
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_115(desc):
     btp.gap_set_conn()
     btp.gap_adv_ind_on()
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_116(desc):
     # TODO: Click Yes if the failure of pairing process due to timeout has been notified on the IUT.
     return True
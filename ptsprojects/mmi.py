@@ -0,0 +1,148 @@
+#
+# auto-pts - The Bluetooth PTS Automation Framework
+#
+# Copyright (c) 2018, Intel Corporation.
+#
+# This program is free software; you can redistribute it and/or modify it
+# under the terms and conditions of the GNU General Public License,
+# version 2, as published by the Free Software Foundation.
+#
+# This program is distributed in the hope it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+
+"""Parsing of PTS MMI descriptions
+
+Patterns are compiled once on import, so that MMI handlers do not compile
+them on each call.
+
+"""
+
+import re
+import logging
+
+log = logging.debug
+
+# MmiParser arguments, enclosed in single quotes or following "= ", e.g.
+# handle = '00D3'O and size = '45'
+ARG_PATTERN = re.compile(r"(?:'|=\s+)([0-9-xA-Fa-f]+)")
+
+# 16 bit handle, e.g. 0x00D3 or 00D3
+HANDLE_PATTERN = re.compile(r"(?:0[xX])?([0-9a-fA-F]{4})")
+
+# primary service UUID, e.g. Service = '1800'O
+SERVICE_UUID_PATTERN = re.compile(r"Service\s=\s'([0-9a-fA-F]+)'")
+
+# IUT handle and characteristic value, e.g. Handle='cd'O value='1122'O
+HANDLE_VALUE_PATTERN = re.compile(r"(Handle|value)='([0-9a-fA-F]+)'")
+
+# hexadecimal words, e.g. of merged multiple read values
+HEX_VALUE_PATTERN = re.compile(r"\b[0-9A-Fa-f]+\b")
+
+# Bluetooth device address, e.g. 001BDC08E4F3
+BD_ADDR_PATTERN = re.compile(r"[a-fA-F0-9]{12}")
+
+# Mesh network packet header and payload, e.g. TTL: [0x03]
+MESH_NET_HEADER_PATTERN = re.compile(
+    r"(TTL|CTL|SRC|DST|TransportPDU)\:\s+\[(0[xX][0-9a-fA-F]+)\]")
+
+# Mesh source and destination addresses, e.g. source address 0x0001
+MESH_ADDRESS_PATTERN = re.compile(
+    r"(source\saddress|destination\saddress)\s+(0[xX][0-9a-fA-F]+)")
+
+# Mesh destination address, e.g. destination address : 0x0001
+MESH_DST_ADDRESS_PATTERN = re.compile(r"(address)\s+\:\s+(0[xX][0-9a-fA-F]+)")
+
+# Mesh source and virtual destination address, e.g. (address 0x8000)
+MESH_LABEL_ADDRESS_PATTERN = re.compile(
+    r"(source\saddress|\(address)\s+(0[xX][0-9a-fA-F]+)")
+
+# Mesh Health fault array, e.g. fault array = 0102
+MESH_FAULT_ARRAY_PATTERN = re.compile(r"array\s=\s([0-9a-fA-F]+)")
+
+# Mesh Health test ID and registered fault array
+MESH_HEALTH_PATTERN = re.compile(r"(array|ID)\s+([0-9a-fA-F]+)",
+                                 re.IGNORECASE)
+
+# (description, upper-cased description) of the last MMI, see normalize
+_last_normalized = (None, None)
+
+
+def normalize(description):
+    """Returns upper-cased description
+
+    The result is kept for the last description, so that each verification
+    of an MMI does not upper-case it again.
+
+    """
+    global _last_normalized
+
+    last = _last_normalized
+    if last[0] == description:
+        return last[1]
+
+    normalized = description.upper()
+    _last_normalized = (description, normalized)
+
+    return normalized
+
+
+def contains(description, text):
+    """Returns True if description contains text, ignoring case"""
+    return text.upper() in normalize(description)
+
+
+def parse_args(description):
+    """Returns list of MmiParser argument values in description"""
+    return ARG_PATTERN.findall(description)
+
+
+def parse_params(pattern, description):
+    """Returns dict of name -> value strings found in description
+
+    pattern -- compiled pattern with two groups: name and value
+
+    """
+    return dict(pattern.findall(description))
+
+
+def parse_hex_params(pattern, description):
+    """Returns dict of name -> hexadecimal values, converted to int, found in
+    description
+
+    pattern -- compiled pattern with two groups: name and value
+
+    """
+    return dict((name, int(value, 16))
+                for name, value in pattern.findall(description))
+
+
+def parse_handles(description):
+    """Returns list of 16 bit handles, as int, found in description"""
+    return [int(handle, 16) for handle in HANDLE_PATTERN.findall(description)]
+
+
+def parse_service_uuids(description):
+    """Returns list of primary service UUIDs found in description
+
+    UUIDs are normalized to hex() format, as returned by btp.btp2uuid
+
+    """
+    return [hex(int(uuid, 16))
+            for uuid in SERVICE_UUID_PATTERN.findall(description)]
+
+
+def parse_bd_addr(description):
+    """Returns first Bluetooth device address in description or None"""
+    match = BD_ADDR_PATTERN.search(description)
+    if not match:
+        return None
+
+    return match.group(0)
+
+
+def parse_hex_values(description):
+    """Returns list of hexadecimal words found in description"""
+    return HEX_VALUE_PATTERN.findall(description)
@@ -14,7 +14,9 @@
 #
 
 import logging
-from threading import Lock, Timer, Event
+import time
+from threading import Lock, Condition
+from collections import OrderedDict
 
 STACK = None
 
@@ -22,7 +24,42 @@ STACK = None
 class Property(object):
     def __init__(self, data):
         self._lock = Lock()
-        self.data = data
+        self._cond = Condition(self._lock)
+        self._data = data
+
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        with self._cond:
+            self._data = value
+            self._cond.notify_all()
+
+    def wait_for(self, predicate, timeout):
+        """Wait until value satisfies predicate
+
+        Waiters are woken up on every value change, e.g. when BTP event
+        handler sets the value.
+
+        predicate -- callable taking value, returning True if wait is over
+        timeout -- timeout in seconds
+
+        Returns True if predicate was satisfied, False on timeout.
+
+        """
+        deadline = time.time() + timeout
+
+        with self._cond:
+            while not predicate(self._data):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+
+                self._cond.wait(remaining)
+
+        return True
 
     def __get__(self, instance, owner):
         with self._lock:
@@ -33,10 +70,6 @@ class Property(object):
             setattr(instance, self.data, value)
 
 
-def timeout_cb(flag):
-    flag.clear()
-
-
 class Gap:
     def __init__(self, name, manufacturer_data):
         self.name = name
@@ -73,38 +106,10 @@ class Gap:
         self.passkey = Property(None)
 
     def wait_for_connection(self, timeout):
-        if self.is_connected():
-            return True
-
-        flag = Event()
-        flag.set()
-
-        t = Timer(timeout, timeout_cb, [flag])
-        t.start()
-
-        while flag.is_set():
-            if self.is_connected():
-                t.cancel()
-                return True
-
-        return False
+        return self.connected.wait_for(lambda addr: addr is not None, timeout)
 
     def wait_for_disconnection(self, timeout):
-        if not self.is_connected():
-            return True
-
-        flag = Event()
-        flag.set()
-
-        t = Timer(timeout, timeout_cb, [flag])
-        t.start()
-
-        while flag.is_set():
-            if not self.is_connected():
-                t.cancel()
-                return True
-
-        return False
+        return self.connected.wait_for(lambda addr: addr is None, timeout)
 
     def is_connected(self):
         return False if (self.connected.data is None) else True
@@ -150,17 +155,7 @@ class Gap:
         self.found_devices.data = []
 
     def get_passkey(self, timeout=5):
-        if self.passkey.data is None:
-            flag = Event()
-            flag.set()
-
-            t = Timer(timeout, timeout_cb, [flag])
-            t.start()
-
-            while flag.is_set():
-                if self.passkey.data:
-                    t.cancel()
-                    break
+        self.passkey.wait_for(lambda passkey: passkey is not None, timeout)
 
         return self.passkey.data
 
@@ -224,82 +219,83 @@ class Mesh:
         self.proxy_identity = True
 
     def wait_for_incomp_timer_exp(self, timeout):
-        if self.incomp_timer_exp.data:
-            return True
+        return self.incomp_timer_exp.wait_for(bool, timeout)
+
+
+class SynchElem:
+    """WIDs of test case instances that are performed together"""
 
-        flag = Event()
-        flag.set()
+    def __init__(self, elem):
+        """Constructor
 
-        t = Timer(timeout, timeout_cb, [flag])
-        t.start()
+        elem -- sequence of (test case name, wid) of the instances
 
-        while flag.is_set():
-            if self.incomp_timer_exp.data:
-                t.cancel()
-                return True
+        """
+        self.wids = OrderedDict(elem)
+        # test case name -> description of WID of instance waiting for others
+        self.descriptions = {}
 
-        return False
+    def arrived(self, tc_name, description):
+        """Marks WID of the instance received, returns True if all instances
+        have received their WIDs"""
+        self.descriptions[tc_name] = description
+
+        return len(self.descriptions) == len(self.wids)
 
 
 class Synch:
     def __init__(self, set_pending_response_func, clear_pending_responses_func):
-        self._synch_table = []
+        # (test case name, wid) -> list of SynchElem in order of adding
+        self._synch_table = {}
         self._pending_responses = {}
         self._set_pending_response_func = set_pending_response_func
         self._clear_pending_responses_func = clear_pending_responses_func
 
     def add_synch_element(self, elem):
-        wid_dict = {}
+        """Add WIDs to perform together
 
-        """Initialize element with empty description array, tester don't know
-        which wid happens earlier"""
-        for e in elem:
-            tc_name = e[0]
-            wid = e[1]
+        elem -- sequence of (test case name, wid) of any number of instances,
+                tester doesn't know which wid happens earlier
 
-            wid_dict[tc_name] = [wid, None]
+        """
+        synch_elem = SynchElem(elem)
 
-        self._synch_table.append(wid_dict)
+        for key in synch_elem.wids.iteritems():
+            self._synch_table.setdefault(key, []).append(synch_elem)
 
     def perform_synch(self, wid, tc_name, description):
-        action_wids = []
-
-        for elem in self._synch_table:
-            # i[value][description]
-            descs = [i[1][1] for i in elem.iteritems()]
-
-            e_wid = elem[tc_name][0]
-            if tc_name in elem and e_wid == wid:
-                # Not all pending wids are already waiting = schedule also me
-                if descs.count(None) > (len(descs) - 1):
-                    elem[tc_name][1] = description
-                    continue
-
-                # Pack all pending actions to be performed right out of synch
-                for inst in elem:
-                    if inst == tc_name:
-                        continue
-
-                    i_wid = elem[inst][0]
-                    i_desc = elem[inst][1]
-                    action_wids.append((i_wid, i_desc, inst,
-                                       self._set_pending_response_func))
+        """Returns list of actions to perform for other instances if WID was
+        the last one awaited, or None if instance has to wait for others"""
+        elems = self._synch_table.get((tc_name, wid))
+        if not elems:
+            return None
+
+        # WID repeated before the group completed belongs to the next group
+        # this instance has not arrived to yet
+        for elem in elems:
+            if tc_name not in elem.descriptions:
+                break
+        else:
+            logging.error("%s: WID %d arrived more times than synchronised",
+                          tc_name, wid)
+            return None
 
-                self._synch_table.remove(elem)
+        # Not all pending wids are already waiting = schedule also me
+        if not elem.arrived(tc_name, description):
+            return None
 
-                return action_wids
+        for key in elem.wids.iteritems():
+            self._synch_table[key].remove(elem)
+            if not self._synch_table[key]:
+                del self._synch_table[key]
 
-        return None
+        # Pack all pending actions to be performed right out of synch
+        return [(i_wid, elem.descriptions[inst], inst,
+                 self._set_pending_response_func)
+                for inst, i_wid in elem.wids.iteritems() if inst != tc_name]
 
     def is_required_synch(self, tc_name, wid):
-        for elem in self._synch_table:
-            if tc_name in elem:
-                e_wid = elem[tc_name][0]
-
-                if e_wid == wid:
-                    return True
-
-        return False
+        return (tc_name, wid) in self._synch_table
 
     def prepare_pending_response(self, test_case_name, response):
         self._pending_responses[test_case_name] = response
@@ -311,7 +307,7 @@ class Synch:
         self._pending_responses = {}
 
     def cancel_synch(self):
-        self._synch_table = []
+        self._synch_table = {}
         self._pending_responses = {}
         self._clear_pending_responses_func()
 
@@ -18,7 +18,6 @@
 import shlex
 import os
 import subprocess
-import re
 import sys
 import time
 import logging
@@ -27,9 +26,30 @@ import Queue
 
 from utils import exec_iut_cmd
 import ptstypes
+import mmi
+from config import SETTLE_TIMEOUT
 
 log = logging.debug
 
+# PTS is considered settled down after test case if it did not log anything
+# for that many seconds
+SETTLE_QUIET_PERIOD = 0.5
+
+# True if PTS sends all its log records, not only these needed to get test
+# case status, see set_pts_maximum_logging
+PTS_MAXIMUM_LOGGING = False
+
+def set_pts_maximum_logging(enable):
+    """Set if PTS maximum logging is enabled
+
+    Only then PTS logs its activity after test case, which wait_settled
+    relies on.
+
+    """
+    global PTS_MAXIMUM_LOGGING
+
+    PTS_MAXIMUM_LOGGING = enable
+
 class MmiParser(object):
     """"Interface to parsing arguments from description of MMI
 
@@ -49,7 +69,7 @@ class MmiParser(object):
         """Constructor of the parser"""
 
         # pattern used to search for args in MMI description
-        self.pattern = re.compile(r"(?:'|=\s+)([0-9-xA-Fa-f]+)")
+        self.pattern = mmi.ARG_PATTERN
 
         # list of the parsed argument values from MMI description
         self.args = []
@@ -285,6 +305,11 @@ class PTSCallback(object):
         """
         raise AbstractMethodException()
 
+    def log_batch(self, records):
+        """Handles list of records, each being a tuple of log arguments"""
+        for record in records:
+            self.log(*record)
+
     def on_implicit_send(self, project_name, wid, test_case_name, description,
                          style, response, response_size, response_is_present):
         """Implements:
@@ -356,6 +381,8 @@ class TestCase(PTSCallback):
         # a.k.a. final verdict
         self.status = "init"
         self.state = None
+        # time of the last log received from PTS
+        self.last_log_time = 0
 
         if isinstance(cmds, list):
             self.cmds = list(cmds)
@@ -396,6 +423,7 @@ class TestCase(PTSCallback):
         """Overrides PTSCallback method. Handles
         PTSControl.IPTSControlClientLogger.Log"""
 
+        self.last_log_time = time.time()
         new_status = None
 
         # mark test case as started
@@ -434,6 +462,9 @@ class TestCase(PTSCallback):
         my_response = ""
         bool2rsp = {True: yes_response, False: no_response}
 
+        # upper-cased once for all verifications below
+        description_upper = mmi.normalize(description)
+
         # answer No
         if self.no_wid and wid == self.no_wid:
             my_response = no_response
@@ -454,7 +485,7 @@ class TestCase(PTSCallback):
                     log("Verifying: %r", verify)
                     if isinstance(verify, list):
                         for x in verify:
-                            if x.upper() not in description.upper():
+                            if x.upper() not in description_upper:
                                 my_response = no_response
                                 log("%r not found, skipping...", x)
                                 break # for x in verify:
@@ -466,7 +497,7 @@ class TestCase(PTSCallback):
                         if my_response is yes_response:
                             break # for verify in self.verify_wids[wid]:
                     else:
-                        if verify.upper() not in description.upper():
+                        if verify.upper() not in description_upper:
                             my_response = no_response
                             break
                         else:
@@ -707,6 +738,35 @@ class TestCase(PTSCallback):
                not is_cleanup_func(cmd):
                 cmd.start()
 
+    def wait_settled(self, timeout=SETTLE_TIMEOUT):
+        """Wait for PTS to settle down after test case
+
+        PTS is settled when it did not log anything for SETTLE_QUIET_PERIOD.
+        Without maximum logging PTS does not send records of its activity
+        after test case, so the full timeout is waited.
+
+        timeout -- maximum time to wait in seconds
+        """
+        if not PTS_MAXIMUM_LOGGING:
+            log("%s waiting %d s, maximum logging disabled",
+                self.wait_settled.__name__, timeout)
+            time.sleep(timeout)
+            return
+
+        deadline = time.time() + timeout
+
+        while True:
+            now = time.time()
+            quiet_end = self.last_log_time + SETTLE_QUIET_PERIOD
+
+            if now >= quiet_end or now >= deadline:
+                break
+
+            time.sleep(min(quiet_end, deadline) - now)
+
+        log("%s waited %.3f s", self.wait_settled.__name__,
+            timeout - (deadline - time.time()))
+
     def post_run(self, error_code):
         """Method called after test case is run in PTS
 
@@ -730,7 +790,7 @@ class TestCase(PTSCallback):
         # // Allow device to settle down
         # Sleep(3000);
         # otherwise 4th test case just blocks eternally
-        time.sleep(3)
+        self.wait_settled()
 
         for cmd in self.cmds:
             cmd.stop()
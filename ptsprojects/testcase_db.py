@@ -1,109 +1,329 @@
 import sqlite3
+import threading
+import time
+import math
+from collections import OrderedDict
 
 DATABASE_FILE = 'TestCase.db'
 
+# Number of test case statistics updates kept in memory before writing them
+# to the database in a single transaction
+COMMIT_INTERVAL = 10
+
+# SQLite limits number of host parameters in a single statement
+MAX_QUERY_PARAMS = 500
+
+# Number of most recent runs of a test case used for run history statistics
+HISTORY_WINDOW = 50
+
+
+def percentile(values, percent):
+    """Returns percentile of sorted values, using the nearest-rank method"""
+    if not values:
+        return None
+
+    rank = int(math.ceil(percent / 100.0 * len(values)))
+
+    return values[max(rank, 1) - 1]
+
 
 class TestCaseTable(object):
-    def __init__(self, name):
-        self.conn = sqlite3.connect(DATABASE_FILE)
+    def __init__(self, name, commit_interval=COMMIT_INTERVAL):
+        # Statistics are updated from test case threads
+        self.conn = sqlite3.connect(DATABASE_FILE, check_same_thread=False)
         self.cursor = self.conn.cursor()
         self.name = name
+        self.commit_interval = commit_interval
+
+        self.runs_name = "{}_runs".format(name)
+
+        self._lock = threading.Lock()
+        # Not yet written statistics, name -> (duration, count, result)
+        self._pending = OrderedDict()
+        # Not yet written runs history
+        self._pending_runs = []
+
+        # Let parallel workers read while another one writes
+        self.cursor.execute("PRAGMA journal_mode=WAL;")
 
         self.cursor.execute(
             "CREATE TABLE IF NOT EXISTS {} (name TEXT, duration REAL, "
             "count INTEGER, result TEXT);".format(self.name))
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS {0}_name_idx "
+            "ON {0} (name);".format(self.name))
+
+        # Append-only history of every test case run
+        self.cursor.execute(
+            "CREATE TABLE IF NOT EXISTS {} (name TEXT, timestamp REAL, "
+            "duration REAL, result TEXT, retry INTEGER, "
+            "error_code TEXT);".format(self.runs_name))
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS {0}_name_idx "
+            "ON {0} (name, timestamp);".format(self.runs_name))
         self.conn.commit()
 
-    def _open(self):
-        self.conn = sqlite3.connect(DATABASE_FILE)
-        self.cursor = self.conn.cursor()
+    def _select_in(self, query, names):
+        """Runs query for names in chunks, returns all rows
 
-    def _close(self):
-        self.cursor.close()
-        self.conn.close()
+        query shall contain {} in place of the IN list of names.
 
-    def update_statistics(self, test_case_name, duration, result):
-        self._open()
+        """
+        rows = []
 
-        self.cursor.execute(
-            "SELECT duration, count FROM {} "
-            "WHERE name=:name;".format(self.name), {"name": test_case_name})
-        row = self.cursor.fetchall()
-        if len(row) == 0:
-            self.cursor.execute(
-                "INSERT INTO {} VALUES(?, ?, ?, ?);".format(self.name),
-                (test_case_name, duration, 1, result))
-            self.conn.commit()
+        for i in range(0, len(names), MAX_QUERY_PARAMS):
+            chunk = names[i:i + MAX_QUERY_PARAMS]
+            self.cursor.execute(query.format(", ".join("?" * len(chunk))),
+                                chunk)
+            rows += self.cursor.fetchall()
+
+        return rows
+
+    def _get_statistics(self, test_cases_names):
+        """Returns dict of name -> (duration, count, result)
+
+        Must be called with _lock held.
+
+        """
+        statistics = {}
+        names = [name for name in set(test_cases_names)
+                 if name not in self._pending]
+
+        rows = self._select_in(
+            "SELECT name, duration, count, result FROM " + self.name +
+            " WHERE name IN ({});", names)
+
+        for name, duration, count, result in rows:
+            statistics[name] = (duration, count, result)
+
+        for name in test_cases_names:
+            if name in self._pending:
+                statistics[name] = self._pending[name]
+
+        return statistics
+
+    def _flush(self):
+        """Writes pending statistics in a single transaction
+
+        Must be called with _lock held.
+
+        """
+        if not self._pending and not self._pending_runs:
             return
 
-        (mean, count) = row[0]
-        if not count:
-            count = 0
-            mean = 0
+        self.cursor.executemany(
+            "INSERT INTO {} VALUES(?, ?, ?, ?, ?, ?);".format(self.runs_name),
+            self._pending_runs)
 
-        count += 1
-        mean += (duration - mean) / count
+        for name, (duration, count, result) in self._pending.iteritems():
+            self.cursor.execute(
+                "UPDATE {} SET duration=:duration, count=:count, "
+                "result=:result WHERE name=:name".format(self.name),
+                {"duration": duration, "count": count, "name": name,
+                 "result": result})
+
+            if self.cursor.rowcount == 0:
+                self.cursor.execute(
+                    "INSERT INTO {} VALUES(?, ?, ?, ?);".format(self.name),
+                    (name, duration, count, result))
 
-        self.cursor.execute(
-            "UPDATE {} SET duration=:duration, count=:count, result=:result "
-            "WHERE name=:name".format(self.name), {"duration": mean,
-                                                   "count": count,
-                                                   "name": test_case_name,
-                                                   "result": result})
         self.conn.commit()
-        self._close()
+        self._pending.clear()
+        del self._pending_runs[:]
 
-    def get_mean_duration(self, test_case_name):
-        self._open()
+    def flush(self):
+        """Writes statistics not yet stored in the database"""
+        with self._lock:
+            self._flush()
 
-        self.cursor.execute(
-            "SELECT duration FROM {} "
-            "WHERE name=:name;".format(self.name), {"name": test_case_name})
-        row = self.cursor.fetchone()
-        if row is not None:
-            return row[0]
+    def get_statistics(self, test_cases_names):
+        """Returns dict of name -> (mean duration, run count, last result)
 
-        self._close()
+        Test cases that were never run are not in the dict.
 
-    def get_result(self, test_case_name):
-        self._open()
+        """
+        with self._lock:
+            return self._get_statistics(test_cases_names)
 
-        self.cursor.execute(
-            "SELECT result FROM {} "
-            "WHERE name=:name".format(self.name), {"name": test_case_name})
-        row = self.cursor.fetchone()
+    def _get_runs(self, test_cases_names):
+        """Returns dict of name -> list of (duration, result) of recent runs
+
+        Runs are in chronological order. Must be called with _lock held.
+
+        """
+        runs = {}
+        # Only the last HISTORY_WINDOW runs of each name are read, the table
+        # keeps whole history. Timestamp of the oldest run in the window is
+        # looked up through the (name, timestamp) index.
+        rows = self._select_in(
+            "SELECT name, duration, result FROM {0} AS runs "
+            "WHERE name IN ({{}}) AND timestamp >= IFNULL(("
+            "SELECT timestamp FROM {0} WHERE name = runs.name "
+            "ORDER BY timestamp DESC LIMIT 1 OFFSET {1}), 0) "
+            "ORDER BY timestamp;".format(self.runs_name, HISTORY_WINDOW - 1),
+            list(set(test_cases_names)))
+
+        rows += [(run[0], run[2], run[3]) for run in self._pending_runs]
+
+        for name, duration, result in rows:
+            runs.setdefault(name, []).append((duration, result))
+
+        for name in runs:
+            runs[name] = runs[name][-HISTORY_WINDOW:]
+
+        return runs
+
+    def get_duration_statistics(self, test_cases_names):
+        """Returns dict of name -> (p50, p95, max) durations of recent runs
+
+        Test cases without run history are not in the dict.
+
+        """
+        with self._lock:
+            runs = self._get_runs(test_cases_names)
+
+        statistics = {}
+        for name in test_cases_names:
+            if name not in runs:
+                continue
+
+            durations = sorted(run[0] for run in runs[name])
+            statistics[name] = (percentile(durations, 50),
+                                percentile(durations, 95),
+                                durations[-1])
+
+        return statistics
+
+    def get_flakiness(self, test_cases_names):
+        """Returns dict of name -> flakiness rate of recent runs
+
+        Flakiness rate is the fraction of consecutive runs with different
+        results, 0.0 for stable and 1.0 for always changing test case. Test
+        cases run less than twice are not in the dict.
+
+        """
+        with self._lock:
+            runs = self._get_runs(test_cases_names)
+
+        flakiness = {}
+        for name in test_cases_names:
+            results = [run[1] for run in runs.get(name, [])]
+            if len(results) < 2:
+                continue
+
+            changes = sum(1 for prev, cur in zip(results, results[1:])
+                          if prev != cur)
+            flakiness[name] = float(changes) / (len(results) - 1)
+
+        return flakiness
+
+    def update_statistics(self, test_case_name, duration, result, retry=0,
+                          error_code=None):
+        """Stores result of test case run
+
+        retry -- 0 for the first run of test case, retry number otherwise
+        error_code -- error code if the run was stopped by an error
+
+        """
+        with self._lock:
+            self._pending_runs.append((test_case_name, time.time(), duration,
+                                       result, retry, error_code))
+
+            row = self._get_statistics([test_case_name]).get(test_case_name)
+
+            if row is None:
+                mean, count = 0, 0
+            else:
+                mean, count, _ = row
+                if not count:
+                    count = 0
+                    mean = 0
+
+            count += 1
+            mean += (duration - mean) / count
+
+            self._pending[test_case_name] = (mean, count, result)
+
+            if len(self._pending) >= self.commit_interval:
+                self._flush()
+
+    def get_mean_duration(self, test_case_name):
+        row = self.get_statistics([test_case_name]).get(test_case_name)
         if row is not None:
             return row[0]
 
-        self._close()
+    def get_result(self, test_case_name):
+        row = self.get_statistics([test_case_name]).get(test_case_name)
+        if row is not None:
+            return row[2]
+
+    def estimate_test_cases_durations(self, test_cases_names, run_count_max,
+                                      percent=None):
+        """Returns list of expected durations of test cases
+
+        Worst case is assumed for test cases that did not pass last time, so
+        they are expected to be run run_count_max times. Test cases that were
+        never run are expected to take the mean of the known durations.
+        Returns None if none of the test cases was run before.
+
+        percent -- if set, duration percentile of recent runs is used instead
+                   of the mean duration, e.g. 95 to account for slow runs
 
-    def estimate_session_duration(self, test_cases_names, run_count_max):
-        self._open()
+        """
+        statistics = self.get_statistics(test_cases_names)
+        if percent is None:
+            runs = {}
+        else:
+            with self._lock:
+                runs = self._get_runs(test_cases_names)
 
-        duration = 0
-        count_unknown = 0
-        num_test_cases = len(test_cases_names)
+        durations = []
 
         for test_case_name in test_cases_names:
+            row = statistics.get(test_case_name)
+            if row is None or row[0] is None:
+                durations.append(None)
+                continue
+
+            mean_time, _, last_result = row
             expected_run_count = 1
 
+            if test_case_name in runs:
+                mean_time = percentile(
+                    sorted(run[0] for run in runs[test_case_name]), percent)
+
             # Assume worst case scenario
-            last_result = self.get_result(test_case_name)
             if last_result and last_result != 'PASS':
                 expected_run_count = run_count_max
 
-            mean_time = self.get_mean_duration(test_case_name)
-            if mean_time is None:
-                count_unknown += 1
-            else:
-                duration += mean_time * expected_run_count
+            durations.append(mean_time * expected_run_count)
 
-        duration += count_unknown * duration / (num_test_cases - count_unknown)
+        known = [duration for duration in durations if duration is not None]
+        if not known:
+            return None
 
-        self._close()
+        mean_known = sum(known) / len(known)
 
-        return duration
+        return [mean_known if duration is None else duration
+                for duration in durations]
 
-    def __del__(self):
+    def estimate_session_duration(self, test_cases_names, run_count_max,
+                                  percent=None):
+        durations = self.estimate_test_cases_durations(test_cases_names,
+                                                       run_count_max, percent)
+        if not durations:
+            return 0
+
+        return sum(durations)
+
+    def close(self):
+        if self.conn is None:
+            return
+
+        self.flush()
         self.cursor.close()
         self.conn.close()
+        self.conn = None
+
+    def __del__(self):
+        self.close()
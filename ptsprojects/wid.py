@@ -0,0 +1,98 @@
+#
+# auto-pts - The Bluetooth PTS Automation Framework
+#
+# Copyright (c) 2018, Intel Corporation.
+#
+# This program is free software; you can redistribute it and/or modify it
+# under the terms and conditions of the GNU General Public License,
+# version 2, as published by the Free Software Foundation.
+#
+# This program is distributed in the hope it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+
+"""Registry of PTS MMI (WID) handlers"""
+
+import logging
+from collections import Counter
+
+log = logging.debug
+
+HANDLER_PREFIX = "hdl_wid_"
+
+# all WidHandlers instances, see get_wid_report
+REGISTRIES = []
+
+
+class WidHandlers(object):
+    """WID handlers of a profile
+
+    Handlers are functions named hdl_wid_<wid> taking MMI description,
+    registered by handler decorator:
+
+    WID_HANDLERS = WidHandlers("GAP")
+
+    @WID_HANDLERS.handler
+    def hdl_wid_161(desc):
+        ...
+
+    """
+    def __init__(self, name):
+        """Constructor
+
+        name -- name of the profile
+
+        """
+        self.name = name
+        self.handlers = {}
+
+        # wid -> number of calls
+        self.exercised = Counter()
+        self.unhandled = Counter()
+
+        REGISTRIES.append(self)
+
+    def handler(self, func):
+        """Decorator registering WID handler"""
+        wid = int(func.__name__[len(HANDLER_PREFIX):])
+        self.handlers[wid] = func
+
+        return func
+
+    def __call__(self, wid, description):
+        """Call handler of the wid, returns its response or None if there is
+        no handler"""
+        handler = self.handlers.get(wid)
+
+        if handler is None:
+            self.unhandled[wid] += 1
+            logging.error("%s: no handler of wid %d", self.name, wid)
+            return None
+
+        self.exercised[wid] += 1
+
+        return handler(description)
+
+
+def get_wid_report():
+    """Returns lines describing WIDs handled and not handled since start"""
+    lines = []
+
+    for registry in REGISTRIES:
+        if not registry.exercised and not registry.unhandled:
+            continue
+
+        lines.append("%s: %d of %d handlers exercised" %
+                     (registry.name, len(registry.exercised),
+                      len(registry.handlers)))
+
+        for title, counter in (("exercised", registry.exercised),
+                               ("unhandled", registry.unhandled)):
+            if counter:
+                lines.append("  %s: %s" % (title, ", ".join(
+                    "%d (%d)" % (wid, count)
+                    for wid, count in sorted(counter.iteritems()))))
+
+    return lines
@@ -14,10 +14,10 @@
 #
 
 import logging
-import sys
 from pybtp import btp
+from ptsprojects.wid import WidHandlers
 from pybtp.types import Prop, Perm, UUID, AdType
-import re
+from ptsprojects import mmi
 import struct
 from ptsprojects.stack import get_stack
 from binascii import hexlify
@@ -25,26 +25,25 @@ from time import sleep
 
 log = logging.debug
 
+WID_HANDLERS = WidHandlers("GAP")
+
 
 def gap_wid_hdl(wid, description, test_case_name):
     log("%s, %r, %r, %s", gap_wid_hdl.__name__, wid, description,
         test_case_name)
-    module = sys.modules[__name__]
 
-    try:
-        handler = getattr(module, "hdl_wid_%d" % wid)
-        return handler(description)
-    except AttributeError as e:
-        logging.exception(e.message)
+    return WID_HANDLERS(wid, description)
 
 
 # wid handlers section begin
+@WID_HANDLERS.handler
 def hdl_wid_4(desc):
     sleep(10)  # Give some time to discover devices
     btp.gap_stop_discov()
     return btp.check_discov_results()
 
 
+@WID_HANDLERS.handler
 def hdl_wid_5(desc):
     stack = get_stack()
 
@@ -64,41 +63,49 @@ def hdl_wid_5(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_10(desc):
     btp.gap_stop_discov()
     return btp.check_discov_results(discovered=True)
 
 
+@WID_HANDLERS.handler
 def hdl_wid_11(desc):
     btp.gap_stop_discov()
     return btp.check_discov_results(discovered=False)
 
 
+@WID_HANDLERS.handler
 def hdl_wid_12(desc):
     btp.gap_start_discov(type='passive', mode='observe')
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_13(desc):
     btp.gap_start_discov(mode='limited')
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_14(desc):
     btp.gap_stop_discov()
     return btp.check_discov_results(discovered=True)
 
 
+@WID_HANDLERS.handler
 def hdl_wid_23(desc):
     btp.gap_start_discov()
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_40(desc):
     btp.gap_conn()
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_47(desc):
     stack = get_stack()
 
@@ -115,16 +122,19 @@ def hdl_wid_47(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_77(desc):
     btp.gap_disconn()
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_78(desc):
     btp.gap_conn()
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_80(desc):
     stack = get_stack()
 
@@ -144,6 +154,7 @@ def hdl_wid_80(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_91(desc):
     stack = get_stack()
 
@@ -162,32 +173,39 @@ def hdl_wid_91(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_108(desc):
     btp.gap_pair()
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_118(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_130(desc):
     return btp.gatts_verify_write_fail(desc)
 
 
+@WID_HANDLERS.handler
 def hdl_wid_137(desc):
     return btp.gatts_verify_write_fail(desc)
 
 
+@WID_HANDLERS.handler
 def hdl_wid_141(desc):
     return btp.gatts_verify_write_success(desc)
 
 
+@WID_HANDLERS.handler
 def hdl_wid_135(desc):
     btp.gap_unpair()
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_136(desc):
     btp.core_reg_svc_gatt()
     btp.gatts_add_svc(0, UUID.VND16_1)
@@ -198,6 +216,7 @@ def hdl_wid_136(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_138(desc):
     btp.gap_start_discov(transport='le', type='active', mode='observe')
     sleep(10)  # Give some time to discover devices
@@ -205,10 +224,12 @@ def hdl_wid_138(desc):
     return btp.check_discov_results()
 
 
+@WID_HANDLERS.handler
 def hdl_wid_141(desc):
     return btp.gatts_verify_write_success(desc)
 
 
+@WID_HANDLERS.handler
 def hdl_wid_157(desc):
     btp.gap_start_discov(transport='le', type='active', mode='observe')
     sleep(10)  # Give some time to discover devices
@@ -216,9 +237,9 @@ def hdl_wid_157(desc):
     return btp.check_discov_results()
 
 
+@WID_HANDLERS.handler
 def hdl_wid_161(desc):
-    match = re.findall(r'(0[xX])?([0-9a-fA-F]{4})', desc)
-    handle = int(match[0][1], 16)
+    handle = mmi.parse_handles(desc)[0]
 
     attr = btp.gatts_get_attrs(handle, handle)
     if not attr:
@@ -253,23 +274,28 @@ def hdl_wid_161(desc):
     return val_len
 
 
+@WID_HANDLERS.handler
 def hdl_wid_169(desc):
     btp.gap_start_discov(type='active', mode='observe')
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_176(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_177(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_178(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_1002(desc):
     stack = get_stack()
     passkey = stack.gap.passkey.data
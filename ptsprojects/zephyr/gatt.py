@@ -33,6 +33,7 @@ from pybtp.types import UUID, Addr, IOCap, Prop, Perm
 from time import sleep
 import logging
 from ptsprojects.stack import get_stack
+from ptsprojects import mmi
 from ptsprojects.zephyr.gatt_wid import gatt_wid_hdl
 
 
@@ -99,7 +100,7 @@ def verify_gatt_sr_gpa_bv_04_c(description):
 
         for text in verify_tuple:
             logging.debug("Verifying: %r", text)
-            if text.upper() not in description.upper():
+            if not mmi.contains(description, text):
                 logging.debug("Verifying fail: %s", text)
                 break # for text in verify_tuple
         else:
@@ -14,28 +14,26 @@
 #
 
 import logging
-import sys
 from pybtp import btp
-import re
+from ptsprojects.wid import WidHandlers
+from ptsprojects import mmi
 from binascii import hexlify
 from ptsprojects.stack import get_stack
 
 log = logging.debug
 
+WID_HANDLERS = WidHandlers("GATT")
+
 
 def gatt_wid_hdl(wid, description, test_case_name):
     log("%s, %r, %r, %s", gatt_wid_hdl.__name__, wid, description,
         test_case_name)
-    module = sys.modules[__name__]
 
-    try:
-        handler = getattr(module, "hdl_wid_%d" % wid)
-        return handler(description)
-    except AttributeError as e:
-        logging.exception(e.message)
+    return WID_HANDLERS(wid, description)
 
 
 # wid handlers section begin
+@WID_HANDLERS.handler
 def hdl_wid_1(desc):
     btp.gap_set_conn()
     btp.gap_set_gendiscov()
@@ -43,17 +41,14 @@ def hdl_wid_1(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_17(desc):
-    # This pattern is matching Primary Service
-    pattern = re.compile("Service\s=\s'([0-9a-fA-F]+)'")
-    pts_services = pattern.findall(desc)
+    # Primary Service UUIDs, normalized
+    pts_services = mmi.parse_service_uuids(desc)
     if not pts_services:
         logging.error("%s parsing error", hdl_wid_17.__name__)
         return False
 
-    # Normalize UUIDs
-    pts_services = [hex(int(service, 16)) for service in pts_services]
-
     iut_services = []
 
     # Get all primary services
@@ -76,18 +71,16 @@ def hdl_wid_17(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_52(desc):
-    # This pattern is matching IUT handle and characteristic value
-    pattern = re.compile("(Handle|value)='([0-9a-fA-F]+)'")
-    params = pattern.findall(desc)
+    # IUT handle and characteristic value
+    params = mmi.parse_hex_params(mmi.HANDLE_VALUE_PATTERN, desc)
     if not params:
         logging.error("%s parsing error", hdl_wid_52.__name__)
         return False
 
-    params = dict(params)
-
-    handle = int(params.get('Handle'), 16)
-    value = int(params.get('value'), 16)
+    handle = params.get('Handle')
+    value = params.get('value')
 
     (att_rsp, value_len, value_read) = btp.gatts_get_attr_val(handle)
     value_read = int(hexlify(value_read), 16)
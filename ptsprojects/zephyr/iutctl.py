@@ -17,8 +17,11 @@ import subprocess
 import os
 import logging
 import shlex
+import socket
+import threading
+import Queue
 
-from pybtp import defs
+from pybtp import defs, btp
 from pybtp.types import BTPError
 from pybtp.iutctl_common import BTPWorker
 
@@ -34,18 +37,25 @@ BTP_ADDRESS = "/tmp/bt-stack-tester"
 # qemu log file object
 IUT_LOG_FO = None
 
+# Pool of QEMU instances restored from snapshot, see QemuPool
+QEMU_POOL = None
 
-def get_qemu_cmd(kernel_image):
+# QEMU monitor prompt, printed when monitor is ready for the next command
+QEMU_MONITOR_PROMPT = "(qemu) "
+
+
+def get_qemu_cmd(kernel_image, btp_address=BTP_ADDRESS):
     """Returns qemu command to start Zephyr
 
-    kernel_image -- Path to Zephyr kernel image"""
+    kernel_image -- Path to Zephyr kernel image
+    btp_address -- BTP unix domain socket file name"""
 
     qemu_cmd = ("%s -cpu cortex-m3 -machine lm3s6965evb -nographic "
                 "-serial mon:stdio "
                 "-serial unix:%s "
                 "-serial unix:/tmp/bt-server-bredr "
                 "-kernel %s" %
-                (QEMU_BIN, BTP_ADDRESS, kernel_image))
+                (QEMU_BIN, btp_address, kernel_image))
 
     return qemu_cmd
 
@@ -53,14 +63,18 @@ def get_qemu_cmd(kernel_image):
 class ZephyrCtl:
     '''Zephyr OS Control Class'''
 
-    def __init__(self, kernel_image, tty_file, board_name=None):
+    def __init__(self, kernel_image, tty_file, board_name=None,
+                 btp_address=BTP_ADDRESS, warm=False):
         """Constructor."""
-        log("%s.%s kernel_image=%s tty_file=%s board_name=%s",
-            self.__class__, self.__init__.__name__, kernel_image, tty_file,
-            board_name)
+        log("%s.%s kernel_image=%s tty_file=%s board_name=%s btp_address=%s "
+            "warm=%s", self.__class__, self.__init__.__name__, kernel_image,
+            tty_file, board_name, btp_address, warm)
 
         self.kernel_image = kernel_image
         self.tty_file = tty_file
+        self.btp_address = btp_address
+        # keep IUT running between test cases, see warm_start
+        self.warm = warm
 
         if self.tty_file and board_name: # DUT is a hardware board, not QEMU
             self.board = Board(board_name, kernel_image, tty_file)
@@ -70,18 +84,33 @@ class ZephyrCtl:
         self.qemu_process = None
         self.socat_process = None
         self.btp_socket = None
+        # True if QEMU was taken from QEMU_POOL, already past IUT ready event
+        self.restored = False
 
     def start(self):
         """Starts the Zephyr OS"""
 
         log("%s.%s", self.__class__, self.start.__name__)
 
-        self.btp_socket = BTPWorker()
+        if QEMU_POOL and not self.tty_file:
+            instance = QEMU_POOL.acquire()
+            if instance:
+                # IUT boots with no services registered
+                btp.REGISTERED_SVCS.clear()
+
+                self.qemu_process, self.btp_socket = instance
+                self.restored = True
+                return
+
+        # IUT boots with no services registered
+        btp.REGISTERED_SVCS.clear()
+
+        self.btp_socket = BTPWorker(self.btp_address)
         self.btp_socket.open()
 
         if self.tty_file:
             socat_cmd = ("socat -x -v %s,rawer,b115200 UNIX-CONNECT:%s" %
-                         (self.tty_file, BTP_ADDRESS))
+                         (self.tty_file, self.btp_address))
 
             log("Starting socat process: %s", socat_cmd)
 
@@ -91,7 +120,7 @@ class ZephyrCtl:
                                                   stdout=IUT_LOG_FO,
                                                   stderr=IUT_LOG_FO)
         else:
-            qemu_cmd = get_qemu_cmd(self.kernel_image)
+            qemu_cmd = get_qemu_cmd(self.kernel_image, self.btp_address)
 
             log("Starting QEMU zephyr process: %s", qemu_cmd)
 
@@ -105,6 +134,10 @@ class ZephyrCtl:
 
     def wait_iut_ready_event(self):
         """Wait until IUT sends ready event after power up"""
+        if self.restored:
+            log("IUT restored from snapshot, ready event already received")
+            return
+
         if self.board:
             self.board.reset()
 
@@ -120,10 +153,41 @@ class ZephyrCtl:
         else:
             log("IUT ready event received OK")
 
+    def warm_start(self, cold=False):
+        """Starts the Zephyr OS or reuses the running one
+
+        Running IUT is reset over BTP instead of being restarted. IUT is
+        restarted if it is not running, the reset fails or cold is True.
+
+        cold -- restart IUT even if it is running
+        """
+        log("%s.%s cold=%s", self.__class__, self.warm_start.__name__, cold)
+
+        if self.btp_socket and not cold:
+            # late frames of the previous test case are not the reset reply
+            self.btp_socket._reset_rx_queue()
+
+            try:
+                btp.core_reset_iut()
+                return
+            except (BTPError, socket.error) as err:
+                log("Warm IUT reset failed (%r), restarting IUT", err)
+
+        self.stop()
+        self.start()
+        self.wait_iut_ready_event()
+
     def stop(self):
         """Powers off the Zephyr OS"""
         log("%s.%s", self.__class__, self.stop.__name__)
 
+        if self.restored:
+            QEMU_POOL.release(self.qemu_process, self.btp_socket)
+            self.qemu_process = None
+            self.btp_socket = None
+            self.restored = False
+            return
+
         if self.btp_socket:
             self.btp_socket.close()
             self.btp_socket = None
@@ -134,6 +198,202 @@ class ZephyrCtl:
             self.qemu_process = None
 
 
+def qemu_monitor_cmd(monitor, cmd):
+    """Runs QEMU human monitor command, returns its output
+
+    monitor -- socket connected to QEMU monitor, with the prompt already read
+    cmd -- monitor command
+    """
+    log("QEMU monitor command: %s", cmd)
+
+    monitor.sendall(cmd + "\n")
+
+    return qemu_monitor_read(monitor)
+
+
+def qemu_monitor_read(monitor):
+    """Reads QEMU monitor output till the prompt"""
+    output = ""
+
+    while not output.endswith(QEMU_MONITOR_PROMPT):
+        data = monitor.recv(4096)
+        if not data:
+            raise socket.error("QEMU monitor connection closed")
+
+        output += data
+
+    return output[:-len(QEMU_MONITOR_PROMPT)]
+
+
+class QemuPool:
+    """Pool of QEMU instances restored from snapshot
+
+    Kernel image is booted once, up to the IUT ready event, and QEMU state is
+    saved to a snapshot file. Instances handed out to test cases are
+    restored from the snapshot instead of being booted. Each instance uses
+    its own BTP socket.
+
+    All instances connect to the same Bluetooth controller proxy as soon as
+    they are restored, hence instances are restored in advance only if size
+    is set. With the default size of 0 only the acquired instance is
+    attached to the proxy.
+    """
+
+    def __init__(self, kernel_image, btp_address=BTP_ADDRESS, size=0):
+        """Constructor
+
+        kernel_image -- Path to Zephyr kernel image
+        btp_address -- BTP unix domain socket file name, instances use it
+                       with index suffix
+        size -- number of instances kept restored in advance, if 0 instances
+                are restored on demand
+        """
+        log("%s.%s kernel_image=%s btp_address=%s size=%d", self.__class__,
+            self.__init__.__name__, kernel_image, btp_address, size)
+
+        self.kernel_image = kernel_image
+        self.btp_address = btp_address
+        self.size = size
+        self.snapshot_file = btp_address + ".snapshot"
+
+        if size:
+            logging.warning("QEMU pool restores %d instances in advance, the "
+                            "Bluetooth controller proxy must accept more "
+                            "than one connection", size)
+
+        self._index = 0
+        self._lock = threading.Lock()
+        # restored instances: (qemu process, BTP socket) or None on failure
+        self._instances = Queue.Queue()
+
+    def start(self):
+        """Saves snapshot and restores the pool instances"""
+        self._save_snapshot()
+
+        for _ in range(self.size):
+            self._restore_async()
+
+    def _save_snapshot(self):
+        """Boots kernel image till IUT ready event and saves QEMU state"""
+        monitor_address = self.btp_address + "-monitor"
+        btp_socket = BTPWorker(self.btp_address + "-snapshot")
+        btp_socket.open()
+
+        qemu_cmd = (get_qemu_cmd(self.kernel_image, btp_socket.address) +
+                    " -monitor unix:%s,server,nowait" % monitor_address)
+
+        log("Starting QEMU to save snapshot: %s", qemu_cmd)
+
+        qemu_process = subprocess.Popen(shlex.split(qemu_cmd), shell=False,
+                                        stdout=IUT_LOG_FO, stderr=IUT_LOG_FO)
+        monitor = None
+
+        try:
+            btp_socket.accept()
+
+            tuple_hdr, _ = btp_socket.read()
+            if (tuple_hdr.svc_id != defs.BTP_SERVICE_ID_CORE or
+                    tuple_hdr.op != defs.CORE_EV_IUT_READY):
+                raise BTPError("Failed to get ready event")
+
+            monitor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            monitor.connect(monitor_address)
+            qemu_monitor_read(monitor)
+
+            # migrate is synchronous, returns when state is saved. It stops
+            # the VM itself, do not stop it before, as the stopped run state
+            # would be saved as well and restored instances would not run.
+            qemu_monitor_cmd(monitor, 'migrate "exec:cat > %s"' %
+                             self.snapshot_file)
+        finally:
+            if monitor:
+                monitor.close()
+
+            btp_socket.close()
+            qemu_process.terminate()
+            qemu_process.wait()
+
+        log("QEMU snapshot saved to %s", self.snapshot_file)
+
+    def _restore(self):
+        """Restores QEMU instance from snapshot
+
+        Returns tuple of (qemu process, BTP socket) or None on failure.
+
+        """
+        with self._lock:
+            self._index += 1
+            btp_address = "%s-pool-%d" % (self.btp_address, self._index)
+
+        btp_socket = BTPWorker(btp_address)
+        btp_socket.open()
+
+        qemu_cmd = (get_qemu_cmd(self.kernel_image, btp_address) +
+                    ' -incoming "exec:cat %s"' % self.snapshot_file)
+
+        log("Restoring QEMU zephyr process: %s", qemu_cmd)
+
+        qemu_process = subprocess.Popen(shlex.split(qemu_cmd), shell=False,
+                                        stdout=IUT_LOG_FO, stderr=IUT_LOG_FO)
+
+        try:
+            btp_socket.accept()
+        except socket.timeout:
+            logging.error("Restored QEMU did not connect to %s", btp_address)
+            btp_socket.close()
+            qemu_process.terminate()
+            qemu_process.wait()
+            return None
+
+        return qemu_process, btp_socket
+
+    def _restore_async(self):
+        """Restores QEMU instance in the background"""
+        thread = threading.Thread(
+            target=lambda: self._instances.put(self._restore()))
+        thread.daemon = True
+        thread.start()
+
+    def acquire(self, timeout=10.0):
+        """Returns tuple of (qemu process, BTP socket) or None on failure"""
+        if not self.size:
+            return self._restore()
+
+        try:
+            instance = self._instances.get(timeout=timeout)
+        except Queue.Empty:
+            instance = None
+
+        self._restore_async()
+
+        return instance
+
+    def release(self, qemu_process, btp_socket):
+        """Stops instance returned by acquire"""
+        btp_socket.close()
+
+        if qemu_process.poll() is None:
+            qemu_process.terminate()
+            qemu_process.wait()
+
+    def stop(self):
+        """Stops all instances of the pool"""
+        log("%s.%s", self.__class__, self.stop.__name__)
+
+        # let instances being restored finish
+        for _ in range(self.size):
+            try:
+                instance = self._instances.get(timeout=10.0)
+            except Queue.Empty:
+                break
+
+            if instance:
+                self.release(*instance)
+
+        if os.path.exists(self.snapshot_file):
+            os.remove(self.snapshot_file)
+
+
 class ZephyrCtlStub:
     '''Zephyr OS Control Class with stubs for testing'''
 
@@ -268,7 +528,8 @@ def init_stub():
     global ZEPHYR
     ZEPHYR = ZephyrCtlStub()
 
-def init(kernel_image, tty_file, board=None):
+def init(kernel_image, tty_file, board=None, btp_address=BTP_ADDRESS,
+         log_file="iut-zephyr.log", warm=False, qemu_pool_size=None):
     """IUT init routine
 
     kernel_image -- Path to Zephyr kernel image
@@ -276,21 +537,45 @@ def init(kernel_image, tty_file, board=None):
                 BTP communication with HW DUT will be done over this TTY.
     board -- HW DUT board to use for testing. This parameter is used only
              if tty_file is specified
+    btp_address -- BTP unix domain socket file name, has to be unique for
+                   each IUT used in parallel
+    log_file -- IUT log file name
+    warm -- keep IUT running between test cases and reset it over BTP
+    qemu_pool_size -- if set, QEMU is restored from snapshot instead of being
+                      booted, see QemuPool. Used only if tty_file is not set.
     """
     global IUT_LOG_FO
     global ZEPHYR
+    global QEMU_POOL
+
+    IUT_LOG_FO = open(log_file, "w")
 
-    IUT_LOG_FO = open("iut-zephyr.log", "w")
+    if qemu_pool_size is not None and not tty_file:
+        QEMU_POOL = QemuPool(kernel_image, btp_address, qemu_pool_size)
 
-    ZEPHYR = ZephyrCtl(kernel_image, tty_file, board)
+        try:
+            QEMU_POOL.start()
+        except (BTPError, socket.error, EnvironmentError) as err:
+            logging.error("Saving QEMU snapshot failed (%r), IUT will be "
+                          "booted for every test case", err)
+            if os.path.exists(QEMU_POOL.snapshot_file):
+                os.remove(QEMU_POOL.snapshot_file)
+            QEMU_POOL = None
+
+    ZEPHYR = ZephyrCtl(kernel_image, tty_file, board, btp_address, warm)
 
 
 def cleanup():
     """IUT cleanup routine"""
-    global IUT_LOG_FO, ZEPHYR
-    IUT_LOG_FO.close()
-    IUT_LOG_FO = None
+    global IUT_LOG_FO, ZEPHYR, QEMU_POOL
 
     if ZEPHYR:
         ZEPHYR.stop()
         ZEPHYR = None
+
+    if QEMU_POOL:
+        QEMU_POOL.stop()
+        QEMU_POOL = None
+
+    IUT_LOG_FO.close()
+    IUT_LOG_FO = None
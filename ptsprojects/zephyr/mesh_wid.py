@@ -14,10 +14,10 @@
 #
 
 import logging
-import sys
 from pybtp import btp
+from ptsprojects.wid import WidHandlers
+from ptsprojects import mmi
 from pybtp.types import Perm, MeshVals
-import re
 import time
 from ptsprojects.stack import get_stack
 
@@ -25,23 +25,23 @@ from ptsprojects.stack import get_stack
 
 log = logging.debug
 
+WID_HANDLERS = WidHandlers("MESH")
+
 
 def hdl_pending_mesh_wids(wid, test_case_name, description):
     stack = get_stack()
-    module = sys.modules[__name__]
 
     if stack.synch.is_required_synch(test_case_name, wid):
         actions = stack.synch.perform_synch(wid, test_case_name, description)
 
-        if actions:
+        if actions is not None:
             for action in actions:
                 action_wid = action[0]
                 action_description = action[1]
                 action_test_case_name = action[2]
                 action_response_cb = action[3]
 
-                handler = getattr(module, "hdl_wid_%d" % action_wid)
-                result = handler(action_description)
+                result = WID_HANDLERS(action_wid, action_description)
 
                 # Register pending response handler
                 stack.synch.prepare_pending_response(action_test_case_name,
@@ -58,30 +58,23 @@ def hdl_pending_mesh_wids(wid, test_case_name, description):
 def mesh_wid_hdl(wid, description, test_case_name):
     log("%s, %r, %r, %s", mesh_wid_hdl.__name__, wid, description,
         test_case_name)
-    module = sys.modules[__name__]
-    pending_responses = None
-
-    try:
-        handler = getattr(module, "hdl_wid_%d" % wid)
-        current_response = handler(description)
+    current_response = WID_HANDLERS(wid, description)
 
-        stack = get_stack()
-        if stack.synch:
-            response = hdl_pending_mesh_wids(wid, test_case_name, description)
-
-            if response == "WAIT":
-                return response
+    stack = get_stack()
+    if stack.synch:
+        response = hdl_pending_mesh_wids(wid, test_case_name, description)
 
-        if stack.synch:
-            stack.synch.set_pending_responses_if_any()
+        if response == "WAIT":
+            return response
 
-        return current_response
+    if stack.synch:
+        stack.synch.set_pending_responses_if_any()
 
-    except AttributeError as e:
-        logging.exception(e.message)
+    return current_response
 
 
 # wid handlers section begin
+@WID_HANDLERS.handler
 def hdl_wid_6(desc):
     """
     Implements: SEND_ADV_BEACON
@@ -93,6 +86,7 @@ def hdl_wid_6(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_7(desc):
     """
     Implements: ENTER_NUMBER
@@ -109,6 +103,7 @@ def hdl_wid_7(desc):
     return ret
 
 
+@WID_HANDLERS.handler
 def hdl_wid_8(desc):
     """
     Implements: ENTER_STRING
@@ -125,6 +120,7 @@ def hdl_wid_8(desc):
     return ret
 
 
+@WID_HANDLERS.handler
 def hdl_wid_12(desc):
     """
     Implements: RE_PROVISIONING_NODE
@@ -147,6 +143,7 @@ def hdl_wid_12(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_13(desc):
     """
     Implements: RE_PROVISIONING_PROVISIONER
@@ -169,10 +166,12 @@ def hdl_wid_13(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_15(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_17(desc):
     """
     Implements: RECEIVED_NETWORK_DATA
@@ -184,6 +183,7 @@ def hdl_wid_17(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_18(desc):
     """
     Implements: CONFIRM_NETWORK_DATA
@@ -201,14 +201,11 @@ def hdl_wid_18(desc):
     # This pattern is matching Time to Live (TTL) value, Control (CTL),
     # Source (SRC) Destination (DST) and Payload of the network packet
     # to be received
-    pattern = re.compile('(TTL|CTL|SRC|DST|TransportPDU)\\:'
-                         '\s+\\[([0][xX][0-9a-fA-F]+)\\]')
-    params = pattern.findall(desc)
+    params = mmi.parse_params(mmi.MESH_NET_HEADER_PATTERN, desc)
     if not params:
         logging.error("%s parsing error", hdl_wid_18.__name__)
         return False
 
-    params = dict(params)
     pdu = hex(int(params['TransportPDU'], 16))
     ttl = int(params.get('TTL'), 16)
     ctl = int(params.get('CTL'), 16)
@@ -225,6 +222,7 @@ def hdl_wid_18(desc):
     return False
 
 
+@WID_HANDLERS.handler
 def hdl_wid_19(desc):
     """
     Implements: SEND_NETWORK_DATA
@@ -236,20 +234,17 @@ def hdl_wid_19(desc):
 
     # This pattern is matching Time to Live (TTL) value, Source (SRC) and
     # Destination (DST) of the network packet to be sent
-    pattern = re.compile('(TTL|SRC|DST)\\:'
-                         '\s+\\[([0][xX][0-9a-fA-F]+)\\]')
-    params = pattern.findall(desc)
+    params = mmi.parse_params(mmi.MESH_NET_HEADER_PATTERN, desc)
     if not params:
         logging.error("%s parsing error", hdl_wid_19.__name__)
         return False
 
-    params = dict(params)
-
     btp.mesh_net_send(params.get('TTL', None), params.get('SRC'),
                       params.get('DST'), '01020304')
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_20(desc):
     """
     Implements: ENTER_GROUP_ADDRESS
@@ -260,6 +255,7 @@ def hdl_wid_20(desc):
     return 'C000'
 
 
+@WID_HANDLERS.handler
 def hdl_wid_21(desc):
     """
     Implements: ENTER_VIRTUAL_ADDRESS
@@ -270,6 +266,7 @@ def hdl_wid_21(desc):
     return '8000'
 
 
+@WID_HANDLERS.handler
 def hdl_wid_23(desc):
     """
     Implements: SEND_SEGMENTED_DATA
@@ -280,20 +277,18 @@ def hdl_wid_23(desc):
     stack = get_stack()
 
     # This pattern is matching source and destination addresses
-    pattern = re.compile('(source\saddress|destination\saddress)\s+([0][xX][0-9a-fA-F]+)')
-    params = pattern.findall(desc)
+    params = mmi.parse_params(mmi.MESH_ADDRESS_PATTERN, desc)
     if not params:
         logging.error("%s parsing error", hdl_wid_23.__name__)
         return
 
-    params = dict(params)
-
     btp.mesh_model_send(int(params.get('source address'), 16),
                         int(params.get('destination address'), 16),
                         'ff' * 16)
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_24(desc):
     """
     Implements: CONFIRM_CLOSE_LINK
@@ -313,6 +308,7 @@ def hdl_wid_24(desc):
     return False
 
 
+@WID_HANDLERS.handler
 def hdl_wid_26(desc):
     """
     Implements: CONFIRM_RFU_BEARER_OPCODE
@@ -331,6 +327,7 @@ def hdl_wid_26(desc):
     return rsp
 
 
+@WID_HANDLERS.handler
 def hdl_wid_30(desc):
     """
     Implements: CONFIRM_NOT_NETWORK_DATA
@@ -348,15 +345,11 @@ def hdl_wid_30(desc):
     # This pattern is matching Time to Live (TTL) value, Control (CTL),
     # Source (SRC) Destination (DST) and Payload of the network packet
     # to be received
-    pattern = re.compile('(TTL|CTL|SRC|DST|TransportPDU)\\:'
-                         '\s+\\[([0][xX][0-9a-fA-F]+)\\]')
-    params = pattern.findall(desc)
+    params = mmi.parse_params(mmi.MESH_NET_HEADER_PATTERN, desc)
     if not params:
         logging.error("%s parsing error", hdl_wid_30.__name__)
         return False
 
-    params = dict(params)
-
     # Normalize parameters for comparison
     pdu = hex(int(params['TransportPDU'], 16))
     ttl = int(params.get('TTL'), 16)
@@ -375,6 +368,7 @@ def hdl_wid_30(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_31(desc):
     """
     Implements: CONFIRM_TIMER_EXPIRED
@@ -389,6 +383,7 @@ def hdl_wid_31(desc):
     return False
 
 
+@WID_HANDLERS.handler
 def hdl_wid_35(desc):
     """
     Implements: CONFIRM_TRANSPORT_DATA
@@ -404,14 +399,11 @@ def hdl_wid_35(desc):
 
     # This pattern is matching Time to Live (TTL) value, Control (CTL),
     # Source (SRC) and Destination (DST)
-    pattern = re.compile('(TTL|CTL|SRC|DST)\\:\s+\\[([0][xX][0-9a-fA-F]+)\\]')
-    params = pattern.findall(desc)
+    params = mmi.parse_params(mmi.MESH_NET_HEADER_PATTERN, desc)
     if not params:
         logging.error("%s parsing error", hdl_wid_35.__name__)
         return False
 
-    params = dict(params)
-
     # Normalize parameters for comparison
     ttl = int(params.get('TTL'), 16)
     ctl = int(params.get('CTL'), 16)
@@ -428,6 +420,7 @@ def hdl_wid_35(desc):
     return False
 
 
+@WID_HANDLERS.handler
 def hdl_wid_36(desc):
     """
     Implements: SEND_UNSEGMENTED_DATA
@@ -438,20 +431,18 @@ def hdl_wid_36(desc):
     stack = get_stack()
 
     # This pattern is matching source and destination addresses
-    pattern = re.compile('(source\saddress|destination\saddress)\s+([0][xX][0-9a-fA-F]+)')
-    params = pattern.findall(desc)
+    params = mmi.parse_params(mmi.MESH_ADDRESS_PATTERN, desc)
     if not params:
         logging.error("%s parsing error", hdl_wid_36.__name__)
         return False
 
-    params = dict(params)
-
     btp.mesh_model_send(int(params.get('source address'), 16),
                         int(params.get('destination address'), 16),
                         'ff' * 2)
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_37(desc):
     """
     Implements: IUT_CONFIRM_ATTENTION_TIMER_STATE
@@ -470,6 +461,7 @@ def hdl_wid_37(desc):
     return False
 
 
+@WID_HANDLERS.handler
 def hdl_wid_38(desc):
     """
     Implements: ENTER_REPLAY_PROTECTION_SIZE
@@ -483,6 +475,7 @@ def hdl_wid_38(desc):
     return str(stack.mesh.crpl_size)
 
 
+@WID_HANDLERS.handler
 def hdl_wid_39(desc):
     """
     Implements: CONFIRM_TRANSPORT_SEGMENTDATA
@@ -493,14 +486,11 @@ def hdl_wid_39(desc):
     stack = get_stack()
 
     # This pattern is destination addresses
-    pattern = re.compile('(address)\s+\\:\s+([0][xX][0-9a-fA-F]+)')
-    params = pattern.findall(desc)
+    params = mmi.parse_params(mmi.MESH_DST_ADDRESS_PATTERN, desc)
     if not params:
         logging.error("%s parsing error", hdl_wid_39.__name__)
         return False
 
-    params = dict(params)
-
     if not stack.mesh.net_recv_ev_data.data:
         logging.error("No data received")
         return False
@@ -514,6 +504,7 @@ def hdl_wid_39(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_40(desc):
     """
     Implements: ASK_MODEL_SUPPORT
@@ -525,6 +516,7 @@ def hdl_wid_40(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_43(desc):
     """
     Implements: SEND_DATA_INVALID_KEY
@@ -536,6 +528,7 @@ def hdl_wid_43(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_44(desc):
     """
     Implements: SEND_SEGMENTED_DATA_VIRTUAL
@@ -547,20 +540,18 @@ def hdl_wid_44(desc):
     stack = get_stack()
 
     # This pattern is matching source and destination label addresses
-    pattern = re.compile('(source\saddress|\\(address)\s+([0][xX][0-9a-fA-F]+)')
-    params = pattern.findall(desc)
+    params = mmi.parse_params(mmi.MESH_LABEL_ADDRESS_PATTERN, desc)
     if not params:
         logging.error("%s parsing error", hdl_wid_44.__name__)
         return
 
-    params = dict(params)
-
     btp.mesh_model_send(int(params.get('source address'), 16),
                         int(params.get('(address'), 16),
                         'ff' * 16)
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_45(desc):
     """
     Implements: IUT_CLEAR_REPLAY_PROTECTION_CACHE
@@ -572,6 +563,7 @@ def hdl_wid_45(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_46(desc):
     """
     Implements: IUT_SEND_UNPROVISONED_BEACONS
@@ -590,6 +582,7 @@ def hdl_wid_46(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_81(desc):
     """
     Implements: IUT_ADVERTISE_UNPROVISIONED_STATE
@@ -603,6 +596,7 @@ def hdl_wid_81(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_85(desc):
     stack = get_stack()
     btp.gap_disconn()
@@ -610,6 +604,7 @@ def hdl_wid_85(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_90(desc):
     """
     Implements: IUT_SEND_SECURE_NETWORK_BEACON
@@ -625,6 +620,7 @@ def hdl_wid_90(desc):
         return False
 
 
+@WID_HANDLERS.handler
 def hdl_wid_94(desc):
     """
     Implements: IUT_SEND_SECURE_NETWORK_BEACON_WITH_FLAGS
@@ -636,6 +632,7 @@ def hdl_wid_94(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_103(desc):
     """
     Implements: CONFIRM_INVALID_DATA
@@ -662,6 +659,7 @@ def hdl_wid_103(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_201(desc):
     """
     Implements: IUT_GENERATE_SECURE_NETWORK_BEACON
@@ -677,6 +675,7 @@ def hdl_wid_201(desc):
         return False
 
 
+@WID_HANDLERS.handler
 def hdl_wid_202(desc):
     """
     Implements: IUT_GENERATE_UPDATE_IN_PROGRESS_SECURE_NETWORK_BEACON
@@ -692,6 +691,7 @@ def hdl_wid_202(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_203(desc):
     """
     Implements: IUT_ACCEPT_AND_SEND_IV_INDEX42_SECURE_NETWORK_BEACON
@@ -709,6 +709,7 @@ def hdl_wid_203(desc):
         return False
 
 
+@WID_HANDLERS.handler
 def hdl_wid_204(desc):
     """
     Implements: IUT_ACCEPT_MESH_MESSAGE_IN_PROGRESS_STATE
@@ -720,6 +721,7 @@ def hdl_wid_204(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_205(desc):
     """
     Implements: IUT_SEND_SEGMENTATION_MESH_MESSAGE_IN_PROGRESS_STATE
@@ -734,6 +736,7 @@ def hdl_wid_205(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_210(desc):
     """
     Implements: IUT_REMOVE_SECURITY_INFO
@@ -753,6 +756,7 @@ def hdl_wid_210(desc):
         return False
 
 
+@WID_HANDLERS.handler
 def hdl_wid_216(desc):
     """
     Implements: IUT_GENERATE_SECURE_NETWORK_BEACON_LESS96
@@ -769,6 +773,7 @@ def hdl_wid_216(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_217(desc):
     """
     Implements: IUT_GENERATE_SECURE_NETWORK_BEACON_MORE96_INDEX_42
@@ -785,6 +790,7 @@ def hdl_wid_217(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_218(desc):
     """
     Implements: IUT_GENERATE_SECURE_NETWORK_BEACON_WRONG_INDEX
@@ -800,6 +806,7 @@ def hdl_wid_218(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_219(desc):
     """
     Implements: IUT_GENERATE_SECURE_NETWORK_BEACON_WRONG_SUBNET
@@ -815,6 +822,7 @@ def hdl_wid_219(desc):
     return False
 
 
+@WID_HANDLERS.handler
 def hdl_wid_220(desc):
     """
     Implements: IUT_GENERATE_SECURE_NETWORK_BEACON_INVALID_INDEX
@@ -827,6 +835,7 @@ def hdl_wid_220(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_221(desc):
     """
     Implements: IUT_READY_FOR_UPDATE_IN_PROGRESS_SECURE_NETWORK_BEACON
@@ -843,6 +852,7 @@ def hdl_wid_221(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_222(desc):
     """
     Implements: IUT_GENERATE_NORMAL_STATE_NETWORK_BEACON
@@ -859,6 +869,7 @@ def hdl_wid_222(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_223(desc):
     """
     Implements: IUT_DEACTIVIATE_IV_UPDATE_TEST_MODE
@@ -873,6 +884,7 @@ def hdl_wid_223(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_262(desc):
     """
     Implements: KEY_REFRESH_READY_FOR_ROUND2
@@ -883,6 +895,7 @@ def hdl_wid_262(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_268(desc):
     """
     Implements: KEY_REFRESH_READY
@@ -893,6 +906,7 @@ def hdl_wid_268(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_274(desc):
     """
     Implements: KEY_REFRESH_WAIT_FOR_INVALID_MSG
@@ -904,6 +918,7 @@ def hdl_wid_274(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_285(desc):
     """
     Implements: KEY_REFRESH_READY_SKIP_PAHSE_2
@@ -915,6 +930,7 @@ def hdl_wid_285(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_303(desc):
     """
     Implements:
@@ -927,6 +943,7 @@ def hdl_wid_303(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_308(desc):
     """
     Implements:
@@ -939,6 +956,7 @@ def hdl_wid_308(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_312(desc):
     """
     Implements:
@@ -951,6 +969,7 @@ def hdl_wid_312(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_313(desc):
     """
     Implements:
@@ -963,6 +982,7 @@ def hdl_wid_313(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_314(desc):
     """
     Implements:
@@ -975,6 +995,7 @@ def hdl_wid_314(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_315(desc):
     """
     Implements:
@@ -986,6 +1007,7 @@ def hdl_wid_315(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_326(desc):
     """
     Implements:
@@ -998,6 +1020,7 @@ def hdl_wid_326(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_346(desc):
     """
     Implements: IUT_SEND_FRIEND_SUBSCRIPTION_LIST_ADD
@@ -1013,6 +1036,7 @@ def hdl_wid_346(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_347(desc):
     """
     Implements: IUT_SEND_FRIEND_SUBSCRIPTION_LIST_REMOVE
@@ -1034,46 +1058,57 @@ def hdl_wid_347(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_353(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_355(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_356(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_357(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_358(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_361(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_362(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_364(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_366(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_367(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_519(desc):
     """
     Implements: CONFIRM_DEVICE_RESET
@@ -1086,6 +1121,7 @@ def hdl_wid_519(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_520(desc):
     """
     Implements: NODE_IDENTITY_START_AD
@@ -1098,6 +1134,7 @@ def hdl_wid_520(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_521(desc):
     """
     Implements: NODE_IDENTITY_STOP_AD
@@ -1110,6 +1147,7 @@ def hdl_wid_521(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_600(desc):
     """
     Implements: CONFIGURE_FAULT_ARRAY
@@ -1126,6 +1164,7 @@ def hdl_wid_600(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_601(desc):
     """
     Implements: CONFIRM_HEALTH_CURRENT_STATUS
@@ -1135,8 +1174,7 @@ def hdl_wid_601(desc):
     stack = get_stack()
 
     # This pattern is matching fault array
-    pattern = re.compile('array\s=\s([0-9a-fA-F]+)')
-    params = pattern.findall(desc)
+    params = mmi.MESH_FAULT_ARRAY_PATTERN.findall(desc)
     if not params:
         logging.error("%s parsing error", hdl_wid_601.__name__)
         return False
@@ -1150,6 +1188,7 @@ def hdl_wid_601(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_603(desc):
     """
     Implements: CONFIRM_HEALTH_FAULT_STATUS_STATUS_1
@@ -1159,14 +1198,11 @@ def hdl_wid_603(desc):
     stack = get_stack()
 
     # Pattern looking for test ID
-    pattern = re.compile(r"(ID)\s+([0-9a-fA-F]+)", re.IGNORECASE)
-    found = pattern.findall(desc)
+    found = mmi.parse_params(mmi.MESH_HEALTH_PATTERN, desc)
     if not found:
         logging.error("%s Parsing error!", hdl_wid_603.__name__)
         return False
 
-    found = dict(found)
-
     # Fail if test ID does not match or IUT has faults
     if int(stack.mesh.health_test_id.data) != int(found.get('ID')) or \
             stack.mesh.health_registered_faults.data:
@@ -1174,6 +1210,7 @@ def hdl_wid_603(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_604(desc):
     """
     Implements: CONFIRM_HEALTH_FAULT_STATUS_STATUS_2
@@ -1184,20 +1221,18 @@ def hdl_wid_604(desc):
     stack = get_stack()
 
     # Pattern looking for fault array and test ID
-    pattern = re.compile(r"(array|ID)\s+([0-9a-fA-F]+)", re.IGNORECASE)
-    found = pattern.findall(desc)
+    found = mmi.parse_params(mmi.MESH_HEALTH_PATTERN, desc)
     if not found:
         logging.error("%s Parsing error!", hdl_wid_604.__name__)
         return False
 
-    found = dict(found)
-
     if int(stack.mesh.health_test_id.data) != int(found.get('ID')) or \
             stack.mesh.health_registered_faults.data != found.get('array'):
         return False
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_625(desc):
     """
     Implements: NETKEY_REDUCE_RESOURCES
@@ -1211,6 +1246,7 @@ def hdl_wid_625(desc):
     return True
 
 
+@WID_HANDLERS.handler
 def hdl_wid_652(desc):
     """
     Implements: CONFIRM_GENERIC
@@ -25,20 +25,31 @@ class ZTestCase(TestCase):
     """A Zephyr test case that uses QEMU or HW as DUT"""
 
     def __init__(self, *args, **kwargs):
-        """Refer to TestCase.__init__ for parameters and their documentation"""
+        """Refer to TestCase.__init__ for parameters and their documentation
+
+        cold_iut -- restart IUT for this test case even in warm IUT mode
+
+        """
+        cold_iut = kwargs.pop("cold_iut", False)
 
         super(ZTestCase, self).__init__(*args, ptsproject_name = "zephyr",**kwargs)
 
         self.stack = get_stack()
         self.zephyrctl = get_iut()
 
-        # first command is to start QEMU or HW
-        self.cmds.insert(0, TestFunc(self.zephyrctl.start))
-        self.cmds.insert(1, TestFunc(self.zephyrctl.wait_iut_ready_event))
+        if self.zephyrctl.warm:
+            # first command is to start or reset running QEMU or HW
+            self.cmds.insert(0, TestFunc(self.zephyrctl.warm_start, cold_iut))
+        else:
+            # first command is to start QEMU or HW
+            self.cmds.insert(0, TestFunc(self.zephyrctl.start))
+            self.cmds.insert(1, TestFunc(self.zephyrctl.wait_iut_ready_event))
 
         self.cmds.append(TestFuncCleanUp(self.stack.cleanup))
-        # last command is to stop QEMU or HW
-        self.cmds.append(TestFuncCleanUp(self.zephyrctl.stop))
+
+        if not self.zephyrctl.warm:
+            # last command is to stop QEMU or HW
+            self.cmds.append(TestFuncCleanUp(self.zephyrctl.stop))
 
 
 class ZTestCaseSlave(TestCase):
@@ -18,7 +18,6 @@
 import logging
 import binascii
 import struct
-import re
 import socket
 from threading import Timer, Event
 
@@ -29,6 +28,10 @@ from random import randint
 from collections import namedtuple
 from uuid import UUID
 from ptsprojects.stack import get_stack
+from ptsprojects import mmi
+
+logger = logging.getLogger(__name__)
+log = logger.debug
 
 #  get IUT global method from iutctl
 get_iut = None
@@ -49,6 +52,9 @@ VERIFY_VALUES = None
 
 CONTROLLER_INDEX = 0
 
+#  Services registered in IUT, see core_reset_iut
+REGISTERED_SVCS = set()
+
 CORE = {
     "gap_reg": (defs.BTP_SERVICE_ID_CORE, defs.CORE_REGISTER_SERVICE,
                 defs.BTP_INDEX_NONE, defs.BTP_SERVICE_ID_GAP),
@@ -248,12 +254,12 @@ def verify_description(description):
     description -- MMI description
 
     """
-    logging.debug("description=%r", description)
+    log("description=%r", description)
 
-    description = description.upper()
+    description = mmi.normalize(description)
 
     global VERIFY_VALUES
-    logging.debug("Verifying values: %r", VERIFY_VALUES)
+    log("Verifying values: %r", VERIFY_VALUES)
 
     if not VERIFY_VALUES:
         return True
@@ -262,15 +268,15 @@ def verify_description(description):
     assert isinstance(VERIFY_VALUES, list), "VERIFY_VALUES should be a list!"
 
     for value in VERIFY_VALUES:
-        logging.debug("Verifying: %r", value)
+        log("Verifying: %r", value)
 
         value = value.upper()
 
         if value not in description:
-            logging.debug("Verification failed, value not in description")
+            log("Verification failed, value not in description")
             return False
 
-    logging.debug("All verifications passed")
+    log("All verifications passed")
 
     VERIFY_VALUES = None
 
@@ -287,10 +293,10 @@ def verify_multiple_read_description(description):
     description -- MMI description
 
     """
-    logging.debug("description=%r", description)
+    log("description=%r", description)
 
     global VERIFY_VALUES
-    logging.debug("Verifying values: %r", VERIFY_VALUES)
+    log("Verifying values: %r", VERIFY_VALUES)
 
     if not VERIFY_VALUES:
         return True
@@ -299,13 +305,13 @@ def verify_multiple_read_description(description):
     assert isinstance(VERIFY_VALUES, list), "VERIFY_VALUES should be a list!"
 
     exp_mtp_read = "".join(VERIFY_VALUES)
-    got_mtp_read = "".join(re.findall(r"\b[0-9A-Fa-f]+\b", description))
+    got_mtp_read = "".join(mmi.parse_hex_values(description))
 
     if exp_mtp_read not in got_mtp_read:
-        logging.debug("Verification failed, value not in description")
+        log("Verification failed, value not in description")
         return False
 
-    logging.debug("Multiple read verifications passed")
+    log("Multiple read verifications passed")
 
     VERIFY_VALUES = None
 
@@ -354,73 +360,109 @@ def set_pts_addr(addr, addr_type):
 
 
 def core_reg_svc_gap():
-    logging.debug("%s", core_reg_svc_gap.__name__)
+    log("%s", core_reg_svc_gap.__name__)
+
+    # Bluetooth can be enabled only once, GAP stays registered in warm IUT
+    if defs.BTP_SERVICE_ID_GAP in REGISTERED_SVCS:
+        return
 
     iutctl = get_iut()
     iutctl.btp_socket.send(*CORE['gap_reg'])
 
     core_reg_svc_rsp_succ()
+    REGISTERED_SVCS.add(defs.BTP_SERVICE_ID_GAP)
 
 
 def core_unreg_svc_gap():
-    logging.debug("%s", core_unreg_svc_gap.__name__)
+    log("%s", core_unreg_svc_gap.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send(*CORE['gap_unreg'])
 
     core_unreg_svc_rsp_succ()
+    REGISTERED_SVCS.discard(defs.BTP_SERVICE_ID_GAP)
 
 
 def core_reg_svc_gatt():
-    logging.debug("%s", core_reg_svc_gatt.__name__)
+    log("%s", core_reg_svc_gatt.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send(*CORE['gatt_reg'])
 
     core_reg_svc_rsp_succ()
+    REGISTERED_SVCS.add(defs.BTP_SERVICE_ID_GATT)
 
 
 def core_unreg_svc_gatt():
-    logging.debug("%s", core_unreg_svc_gatt.__name__)
+    log("%s", core_unreg_svc_gatt.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send_wait_rsp(*CORE['gatt_unreg'])
+    REGISTERED_SVCS.discard(defs.BTP_SERVICE_ID_GATT)
 
 
 def core_reg_svc_l2cap():
-    logging.debug("%s", core_reg_svc_l2cap.__name__)
+    log("%s", core_reg_svc_l2cap.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send(*CORE['l2cap_reg'])
 
     core_reg_svc_rsp_succ()
+    REGISTERED_SVCS.add(defs.BTP_SERVICE_ID_L2CAP)
 
 
 def core_unreg_svc_l2cap():
-    logging.debug("%s", core_unreg_svc_l2cap.__name__)
+    log("%s", core_unreg_svc_l2cap.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send_wait_rsp(*CORE['l2cap_unreg'])
+    REGISTERED_SVCS.discard(defs.BTP_SERVICE_ID_L2CAP)
 
 
 def core_reg_svc_mesh():
-    logging.debug("%s", core_reg_svc_mesh.__name__)
+    log("%s", core_reg_svc_mesh.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send(*CORE['mesh_reg'])
 
     core_reg_svc_rsp_succ()
+    REGISTERED_SVCS.add(defs.BTP_SERVICE_ID_MESH)
 
 
 def core_unreg_svc_mesh():
-    logging.debug("%s", core_unreg_svc_mesh.__name__)
+    log("%s", core_unreg_svc_mesh.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send_wait_rsp(*CORE['mesh_unreg'])
+    REGISTERED_SVCS.discard(defs.BTP_SERVICE_ID_MESH)
+
+
+def core_reset_iut():
+    """Bring IUT back to its initial state without rebooting it
+
+    Used between test cases in warm IUT mode. GAP is reset and stays
+    registered, other services are unregistered to be registered again by the
+    next test case. Raises BTPError if IUT cannot be reset this way.
+
+    """
+    log("%s %r", core_reset_iut.__name__, REGISTERED_SVCS)
+
+    # Mesh can be initialized only once
+    if defs.BTP_SERVICE_ID_MESH in REGISTERED_SVCS:
+        raise BTPError("Mesh cannot be reset without IUT reboot")
+
+    if defs.BTP_SERVICE_ID_GAP in REGISTERED_SVCS:
+        gap_reset()
+
+    if defs.BTP_SERVICE_ID_GATT in REGISTERED_SVCS:
+        core_unreg_svc_gatt()
+
+    if defs.BTP_SERVICE_ID_L2CAP in REGISTERED_SVCS:
+        core_unreg_svc_l2cap()
 
 
 def core_reg_svc_rsp_succ():
-    logging.debug("%s", core_reg_svc_rsp_succ.__name__)
+    log("%s", core_reg_svc_rsp_succ.__name__)
     iutctl = get_iut()
 
     expected_frame = ((defs.BTP_SERVICE_ID_CORE,
@@ -431,18 +473,18 @@ def core_reg_svc_rsp_succ():
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
 
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
-    logging.debug("expected %r", expected_frame)
+    log("received %r %r", tuple_hdr, tuple_data)
+    log("expected %r", expected_frame)
 
     if (tuple_hdr, tuple_data) != expected_frame:
-        logging.error("frames mismatch")
+        logger.error("frames mismatch")
         raise BTPError("Unexpected response received!")
     else:
-        logging.debug("response is valid")
+        log("response is valid")
 
 
 def core_unreg_svc_rsp_succ():
-    logging.debug("%s", core_unreg_svc_rsp_succ.__name__)
+    log("%s", core_unreg_svc_rsp_succ.__name__)
     iutctl = get_iut()
 
     expected_frame = ((defs.BTP_SERVICE_ID_CORE,
@@ -453,18 +495,18 @@ def core_unreg_svc_rsp_succ():
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
 
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
-    logging.debug("expected %r", expected_frame)
+    log("received %r %r", tuple_hdr, tuple_data)
+    log("expected %r", expected_frame)
 
     if (tuple_hdr, tuple_data) != expected_frame:
-        logging.error("frames mismatch")
+        logger.error("frames mismatch")
         raise BTPError("Unexpected response received!")
     else:
-        logging.debug("response is valid")
+        log("response is valid")
 
 
 def __gap_current_settings_update(settings):
-    logging.debug("%s %r", __gap_current_settings_update.__name__, settings)
+    log("%s %r", __gap_current_settings_update.__name__, settings)
     if isinstance(settings, tuple):
         fmt = '<I'
         if len(settings[0]) != struct.calcsize(fmt):
@@ -495,7 +537,7 @@ def gap_wait_for_disconnection(timeout=30):
 
 
 def gap_adv_ind_on(ad=None, sd=None):
-    logging.debug("%s %r %r", gap_adv_ind_on.__name__, ad, sd)
+    log("%s %r %r", gap_adv_ind_on.__name__, ad, sd)
 
     stack = get_stack()
 
@@ -535,7 +577,7 @@ def gap_adv_ind_on(ad=None, sd=None):
 
 
 def gap_adv_off():
-    logging.debug("%s", gap_adv_off.__name__)
+    log("%s", gap_adv_off.__name__)
 
     stack = get_stack()
 
@@ -552,7 +594,7 @@ def gap_adv_off():
 
 
 def gap_conn(bd_addr=None, bd_addr_type=None):
-    logging.debug("%s %r %r", gap_conn.__name__, bd_addr, bd_addr_type)
+    log("%s %r %r", gap_conn.__name__, bd_addr, bd_addr_type)
     iutctl = get_iut()
 
     data_ba = bytearray()
@@ -573,10 +615,10 @@ def gap_rpa_conn(description):
     Arguments:
     description -- description provided in PTS MMI.
     """
-    logging.debug("%s %s", gap_conn.__name__, description)
+    log("%s %s", gap_conn.__name__, description)
     iutctl = get_iut()
 
-    bd_addr = re.search("[a-fA-F0-9]{12}", description).group(0)
+    bd_addr = mmi.parse_bd_addr(description)
     bd_addr_type = Addr.le_random
 
     data_ba = bytearray()
@@ -592,7 +634,7 @@ def gap_rpa_conn(description):
 
 
 def gap_disconn(bd_addr=None, bd_addr_type=None):
-    logging.debug("%s %r %r", gap_disconn.__name__, bd_addr, bd_addr_type)
+    log("%s %r %r", gap_disconn.__name__, bd_addr, bd_addr_type)
     iutctl = get_iut()
 
     stack = get_stack()
@@ -612,7 +654,7 @@ def gap_disconn(bd_addr=None, bd_addr_type=None):
 
 
 def verify_not_connected(description):
-    logging.debug("%s", verify_not_connected.__name__)
+    log("%s", verify_not_connected.__name__)
     stack = get_stack()
 
     gap_wait_for_connection(5)
@@ -623,7 +665,7 @@ def verify_not_connected(description):
 
 
 def gap_set_io_cap(io_cap):
-    logging.debug("%s %r", gap_set_io_cap.__name__, io_cap)
+    log("%s %r", gap_set_io_cap.__name__, io_cap)
     iutctl = get_iut()
 
     iutctl.btp_socket.send(*GAP['set_io_cap'], data=chr(io_cap))
@@ -632,7 +674,7 @@ def gap_set_io_cap(io_cap):
 
 
 def gap_pair(bd_addr=None, bd_addr_type=None):
-    logging.debug("%s %r %r", gap_pair.__name__, bd_addr, bd_addr_type)
+    log("%s %r %r", gap_pair.__name__, bd_addr, bd_addr_type)
     iutctl = get_iut()
 
     data_ba = bytearray()
@@ -648,7 +690,7 @@ def gap_pair(bd_addr=None, bd_addr_type=None):
 
 
 def gap_unpair(bd_addr=None, bd_addr_type=None):
-    logging.debug("%s %r %r", gap_unpair.__name__, bd_addr, bd_addr_type)
+    log("%s %r %r", gap_unpair.__name__, bd_addr, bd_addr_type)
     iutctl = get_iut()
 
     data_ba = bytearray()
@@ -678,7 +720,7 @@ def var_store_get_wrong_passkey(description):
 
 
 def gap_passkey_entry_rsp(bd_addr, bd_addr_type, passkey):
-    logging.debug("%s %r %r", gap_passkey_entry_rsp.__name__, bd_addr,
+    log("%s %r %r", gap_passkey_entry_rsp.__name__, bd_addr,
                   bd_addr_type)
     iutctl = get_iut()
 
@@ -700,7 +742,7 @@ def gap_passkey_entry_rsp(bd_addr, bd_addr_type, passkey):
 
 
 def gap_reset():
-    logging.debug("%s", gap_reset.__name__)
+    log("%s", gap_reset.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send(*GAP['reset'])
@@ -709,12 +751,12 @@ def gap_reset():
 
 
 def gap_passkey_entry_req_ev(bd_addr=None, bd_addr_type=None):
-    logging.debug("%s %r %r", gap_passkey_entry_req_ev.__name__, bd_addr,
+    log("%s %r %r", gap_passkey_entry_req_ev.__name__, bd_addr,
                   bd_addr_type)
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GAP,
                   defs.GAP_EV_PASSKEY_ENTRY_REQ)
@@ -741,7 +783,7 @@ def gap_passkey_entry_req_ev(bd_addr=None, bd_addr_type=None):
 
 
 def gap_set_conn():
-    logging.debug("%s", gap_set_conn.__name__)
+    log("%s", gap_set_conn.__name__)
 
     stack = get_stack()
 
@@ -758,7 +800,7 @@ def gap_set_conn():
 
 
 def gap_set_nonconn():
-    logging.debug("%s", gap_set_nonconn.__name__)
+    log("%s", gap_set_nonconn.__name__)
 
     stack = get_stack()
 
@@ -775,7 +817,7 @@ def gap_set_nonconn():
 
 
 def gap_set_nondiscov():
-    logging.debug("%s", gap_set_nondiscov.__name__)
+    log("%s", gap_set_nondiscov.__name__)
 
     stack = get_stack()
 
@@ -792,7 +834,7 @@ def gap_set_nondiscov():
 
 
 def gap_set_gendiscov():
-    logging.debug("%s", gap_set_gendiscov.__name__)
+    log("%s", gap_set_gendiscov.__name__)
 
     iutctl = get_iut()
 
@@ -803,7 +845,7 @@ def gap_set_gendiscov():
 
 
 def gap_set_limdiscov():
-    logging.debug("%s", gap_set_limdiscov.__name__)
+    log("%s", gap_set_limdiscov.__name__)
 
     iutctl = get_iut()
 
@@ -814,7 +856,7 @@ def gap_set_limdiscov():
 
 
 def gap_set_powered_on():
-    logging.debug("%s", gap_set_powered_on.__name__)
+    log("%s", gap_set_powered_on.__name__)
 
     iutctl = get_iut()
 
@@ -825,7 +867,7 @@ def gap_set_powered_on():
 
 
 def gap_set_powered_off():
-    logging.debug("%s", gap_set_powered_off.__name__)
+    log("%s", gap_set_powered_off.__name__)
 
     iutctl = get_iut()
 
@@ -845,7 +887,7 @@ def gap_start_discov(transport='le', type='active', mode='general'):
     mode: <general, limited, observe>
 
     """
-    logging.debug("%s", gap_start_discov.__name__)
+    log("%s", gap_start_discov.__name__)
 
     iutctl = get_iut()
 
@@ -876,7 +918,7 @@ def check_discov_results(addr_type=None, addr=None, discovered=True, eir=None):
     addr = pts_addr_get(addr)
     addr_type = pts_addr_type_get(addr_type)
 
-    logging.debug("%s %r %r %r %r", check_discov_results.__name__, addr_type,
+    log("%s %r %r %r %r", check_discov_results.__name__, addr_type,
                   addr, discovered, eir)
 
     found = False
@@ -885,7 +927,7 @@ def check_discov_results(addr_type=None, addr=None, discovered=True, eir=None):
     devices = stack.gap.found_devices.data
 
     for device in devices:
-        logging.debug("matching %r", device)
+        log("matching %r", device)
         if addr_type != device.addr_type:
             continue
         if addr != device.addr:
@@ -903,7 +945,7 @@ def check_discov_results(addr_type=None, addr=None, discovered=True, eir=None):
 
 
 def gap_stop_discov():
-    logging.debug("%s", gap_stop_discov.__name__)
+    log("%s", gap_stop_discov.__name__)
 
     iutctl = get_iut()
 
@@ -916,14 +958,14 @@ def gap_stop_discov():
 
 
 def gap_read_ctrl_info():
-    logging.debug("%s", gap_read_ctrl_info.__name__)
+    log("%s", gap_read_ctrl_info.__name__)
 
     iutctl = get_iut()
 
     iutctl.btp_socket.send(*GAP['read_ctrl_info'])
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GAP,
                   defs.GAP_READ_CONTROLLER_INFO)
@@ -944,17 +986,17 @@ def gap_read_ctrl_info():
         Addr.le_public
 
     stack.gap.iut_addr_set(_addr, addr_type)
-    logging.debug("IUT address %r", stack.gap.iut_addr_get_str())
+    log("IUT address %r", stack.gap.iut_addr_get_str())
 
     __gap_current_settings_update(_curr_set)
 
 
 def gap_identity_resolved_ev():
-    logging.debug("%s", gap_identity_resolved_ev.__name__)
+    log("%s", gap_identity_resolved_ev.__name__)
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GAP,
                   defs.GAP_EV_IDENTITY_RESOLVED)
@@ -977,12 +1019,12 @@ def gap_identity_resolved_ev():
 
 
 def gap_command_rsp_succ(op=None):
-    logging.debug("%s", gap_command_rsp_succ.__name__)
+    log("%s", gap_command_rsp_succ.__name__)
 
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GAP, op)
 
@@ -990,7 +1032,7 @@ def gap_command_rsp_succ(op=None):
 
 
 def gatts_add_svc(svc_type, uuid):
-    logging.debug("%s %r %r", gatts_add_svc.__name__, svc_type, uuid)
+    log("%s %r %r", gatts_add_svc.__name__, svc_type, uuid)
 
     iutctl = get_iut()
 
@@ -1007,7 +1049,7 @@ def gatts_add_svc(svc_type, uuid):
 
 
 def gatts_add_inc_svc(hdl):
-    logging.debug("%s %r", gatts_add_inc_svc.__name__, hdl)
+    log("%s %r", gatts_add_inc_svc.__name__, hdl)
 
     iutctl = get_iut()
 
@@ -1024,7 +1066,7 @@ def gatts_add_inc_svc(hdl):
 
 
 def gatts_add_char(hdl, prop, perm, uuid):
-    logging.debug("%s %r %r %r %r", gatts_add_char.__name__, hdl, prop, perm,
+    log("%s %r %r %r %r", gatts_add_char.__name__, hdl, prop, perm,
                   uuid)
 
     iutctl = get_iut()
@@ -1048,7 +1090,7 @@ def gatts_add_char(hdl, prop, perm, uuid):
 
 
 def gatts_set_val(hdl, val):
-    logging.debug("%s %r %r ", gatts_set_val.__name__, hdl, val)
+    log("%s %r %r ", gatts_set_val.__name__, hdl, val)
 
     iutctl = get_iut()
 
@@ -1070,7 +1112,7 @@ def gatts_set_val(hdl, val):
 
 
 def gatts_add_desc(hdl, perm, uuid):
-    logging.debug("%s %r %r %r", gatts_add_desc.__name__, hdl, perm, uuid)
+    log("%s %r %r %r", gatts_add_desc.__name__, hdl, perm, uuid)
 
     iutctl = get_iut()
 
@@ -1092,7 +1134,7 @@ def gatts_add_desc(hdl, perm, uuid):
 
 
 def gatts_start_server():
-    logging.debug("%s", gatts_start_server.__name__)
+    log("%s", gatts_start_server.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send(*GATTS['start_server'])
@@ -1101,7 +1143,7 @@ def gatts_start_server():
 
 
 def gatts_set_enc_key_size(hdl, enc_key_size):
-    logging.debug("%s %r %r", gatts_set_enc_key_size.__name__,
+    log("%s %r %r", gatts_set_enc_key_size.__name__,
                   hdl, enc_key_size)
 
     iutctl = get_iut()
@@ -1140,7 +1182,7 @@ def gatts_dec_attr_value_changed_ev_data(frame):
 
 
 def gatts_attr_value_changed_ev():
-    logging.debug("%s", gatts_attr_value_changed_ev.__name__)
+    log("%s", gatts_attr_value_changed_ev.__name__)
 
     iutctl = get_iut()
 
@@ -1150,7 +1192,7 @@ def gatts_attr_value_changed_ev():
                   defs.GATT_EV_ATTR_VALUE_CHANGED)
 
     (handle, data) = gatts_dec_attr_value_changed_ev_data(tuple_data[0])
-    logging.debug("%s %r %r", gatts_attr_value_changed_ev.__name__,
+    log("%s %r %r", gatts_attr_value_changed_ev.__name__,
                   handle, data)
 
     return handle, data
@@ -1160,16 +1202,16 @@ def gatts_verify_write_success(description):
     """
     This verifies if PTS initiated write operation succeeded
     """
-    logging.debug("%s", gatts_verify_write_success.__name__)
+    log("%s", gatts_verify_write_success.__name__)
 
     # If write is successful, Attribute Value Changed Event will be received
     try:
         (handle, value) = gatts_attr_value_changed_ev()
-        logging.debug("%s Handle %r. Value %r has been successfully written",
+        log("%s Handle %r. Value %r has been successfully written",
                       gatts_verify_write_success.__name__, handle, value)
         return True
     except:
-        logging.debug("%s PTS failed to write attribute value",
+        log("%s PTS failed to write attribute value",
                       gatts_verify_write_success.__name__)
         return False
 
@@ -1187,7 +1229,7 @@ def btp2uuid(uuid_len, uu):
 
 
 def dec_gatts_get_attrs_rp(data, data_len):
-    logging.debug("%s %r %r", dec_gatts_get_attrs_rp.__name__, data, data_len)
+    log("%s %r %r", dec_gatts_get_attrs_rp.__name__, data, data_len)
 
     hdr = '<B'
     hdr_len = struct.calcsize(hdr)
@@ -1216,14 +1258,14 @@ def dec_gatts_get_attrs_rp(data, data_len):
 
         attr_count = attr_count - 1
 
-        logging.debug("handle %r perm %r type_uuid %r", handle, permission,
+        log("handle %r perm %r type_uuid %r", handle, permission,
                       type_uuid)
 
     return attributes
 
 
 def gatts_get_attrs(start_handle=0x0001, end_handle=0xffff, type_uuid=None):
-    logging.debug("%s %r %r %r", gatts_get_attrs.__name__, start_handle,
+    log("%s %r %r %r", gatts_get_attrs.__name__, start_handle,
                   end_handle, type_uuid)
 
     iutctl = get_iut()
@@ -1252,7 +1294,7 @@ def gatts_get_attrs(start_handle=0x0001, end_handle=0xffff, type_uuid=None):
     iutctl.btp_socket.send(*GATTS['get_attrs'], data=data_ba)
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
                   defs.GATT_GET_ATTRIBUTES)
@@ -1261,7 +1303,7 @@ def gatts_get_attrs(start_handle=0x0001, end_handle=0xffff, type_uuid=None):
 
 
 def gatts_get_attr_val(handle):
-    logging.debug("%s %r", gatts_get_attr_val.__name__, handle)
+    log("%s %r", gatts_get_attr_val.__name__, handle)
 
     iutctl = get_iut()
 
@@ -1276,7 +1318,7 @@ def gatts_get_attr_val(handle):
     iutctl.btp_socket.send(*GATTS['get_attr_val'], data=data_ba)
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
                   defs.GATT_GET_ATTRIBUTE_VALUE)
@@ -1289,7 +1331,7 @@ def gatts_get_attr_val(handle):
 
 
 def gattc_exchange_mtu(bd_addr_type, bd_addr):
-    logging.debug("%s %r %r", gattc_exchange_mtu.__name__, bd_addr_type,
+    log("%s %r %r", gattc_exchange_mtu.__name__, bd_addr_type,
                   bd_addr)
     iutctl = get_iut()
 
@@ -1307,7 +1349,7 @@ def gattc_exchange_mtu(bd_addr_type, bd_addr):
 
 
 def gattc_disc_prim_uuid(bd_addr_type, bd_addr, uuid):
-    logging.debug("%s %r %r %r", gattc_disc_prim_uuid.__name__, bd_addr_type,
+    log("%s %r %r %r", gattc_disc_prim_uuid.__name__, bd_addr_type,
                   bd_addr, uuid)
     iutctl = get_iut()
 
@@ -1327,7 +1369,7 @@ def gattc_disc_prim_uuid(bd_addr_type, bd_addr, uuid):
 
 
 def gattc_find_included(bd_addr_type, bd_addr, start_hdl, stop_hdl):
-    logging.debug("%s %r %r %r %r", gattc_find_included.__name__,
+    log("%s %r %r %r %r", gattc_find_included.__name__,
                   bd_addr_type, bd_addr, start_hdl, stop_hdl)
     iutctl = get_iut()
 
@@ -1362,7 +1404,7 @@ def gattc_disc_all_chrc_find_attrs_rsp(exp_chars, store_attrs=False):
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r",
+    log("%s received %r %r",
                   gattc_disc_all_chrc_find_attrs_rsp.__name__, tuple_hdr,
                   tuple_data)
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
@@ -1379,12 +1421,12 @@ def gattc_disc_all_chrc_find_attrs_rsp(exp_chars, store_attrs=False):
                     (exp_char[2] and exp_char[2] != char[2]) or
                     (exp_char[3] and exp_char[3] != char_uuid)):
 
-                logging.debug("gatt char not matched = %r != %r", char,
+                log("gatt char not matched = %r != %r", char,
                               exp_char)
 
                 continue
 
-            logging.debug("gatt char matched = %r == %r", char, exp_char)
+            log("gatt char matched = %r == %r", char, exp_char)
 
             if store_attrs:
                 global GATT_CHARS
@@ -1395,7 +1437,7 @@ def gattc_disc_all_chrc_find_attrs_rsp(exp_chars, store_attrs=False):
 
 
 def gattc_disc_all_chrc(bd_addr_type, bd_addr, start_hdl, stop_hdl, svc=None):
-    logging.debug("%s %r %r %r %r %r", gattc_disc_all_chrc.__name__,
+    log("%s %r %r %r %r %r", gattc_disc_all_chrc.__name__,
                   bd_addr_type, bd_addr, start_hdl, stop_hdl, svc)
     iutctl = get_iut()
 
@@ -1416,7 +1458,7 @@ def gattc_disc_all_chrc(bd_addr_type, bd_addr, start_hdl, stop_hdl, svc=None):
                     start_hdl = s[0]
                     stop_hdl = s[1]
 
-                    logging.debug("Got requested service!")
+                    log("Got requested service!")
 
                     break
 
@@ -1441,7 +1483,7 @@ def gattc_disc_all_chrc(bd_addr_type, bd_addr, start_hdl, stop_hdl, svc=None):
 
 
 def gattc_disc_chrc_uuid(bd_addr_type, bd_addr, start_hdl, stop_hdl, uuid):
-    logging.debug("%s %r %r %r %r %r", gattc_disc_chrc_uuid.__name__,
+    log("%s %r %r %r %r %r", gattc_disc_chrc_uuid.__name__,
                   bd_addr_type, bd_addr, start_hdl, stop_hdl, uuid)
     iutctl = get_iut()
 
@@ -1476,7 +1518,7 @@ def gattc_disc_chrc_uuid(bd_addr_type, bd_addr, start_hdl, stop_hdl, uuid):
 
 
 def gattc_disc_all_desc(bd_addr_type, bd_addr, start_hdl, stop_hdl):
-    logging.debug("%s %r %r %r %r", gattc_disc_all_desc.__name__,
+    log("%s %r %r %r %r", gattc_disc_all_desc.__name__,
                   bd_addr_type, bd_addr, start_hdl, stop_hdl)
     iutctl = get_iut()
 
@@ -1503,7 +1545,7 @@ def gattc_disc_all_desc(bd_addr_type, bd_addr, start_hdl, stop_hdl):
 
 
 def gattc_read_char_val(bd_addr_type, bd_addr, char):
-    logging.debug("%s %r %r %r", gattc_read_char_val.__name__, bd_addr_type,
+    log("%s %r %r %r", gattc_read_char_val.__name__, bd_addr_type,
                   bd_addr, char)
 
     char_nb = char[1]
@@ -1518,7 +1560,7 @@ def gattc_read_char_val(bd_addr_type, bd_addr, char):
                 if char_nb != 0:
                     continue
 
-                logging.debug("Got requested char, val handle = %r!", c[1])
+                log("Got requested char, val handle = %r!", c[1])
 
                 gattc_read(bd_addr_type, bd_addr, c[1])
 
@@ -1526,7 +1568,7 @@ def gattc_read_char_val(bd_addr_type, bd_addr, char):
 
 
 def gattc_read(bd_addr_type, bd_addr, hdl):
-    logging.debug("%s %r %r %r", gattc_read.__name__, bd_addr_type, bd_addr,
+    log("%s %r %r %r", gattc_read.__name__, bd_addr_type, bd_addr,
                   hdl)
     iutctl = get_iut()
 
@@ -1547,7 +1589,7 @@ def gattc_read(bd_addr_type, bd_addr, hdl):
 
 
 def gattc_read_long(bd_addr_type, bd_addr, hdl, off, modif_off=None):
-    logging.debug("%s %r %r %r %r %r", gattc_read_long.__name__, bd_addr_type,
+    log("%s %r %r %r %r %r", gattc_read_long.__name__, bd_addr_type,
                   bd_addr, hdl, off, modif_off)
     iutctl = get_iut()
 
@@ -1575,7 +1617,7 @@ def gattc_read_long(bd_addr_type, bd_addr, hdl, off, modif_off=None):
 
 
 def gattc_read_multiple(bd_addr_type, bd_addr, *hdls):
-    logging.debug("%s %r %r %r", gattc_read_multiple.__name__, bd_addr_type,
+    log("%s %r %r %r", gattc_read_multiple.__name__, bd_addr_type,
                   bd_addr, hdls)
     iutctl = get_iut()
 
@@ -1599,7 +1641,7 @@ def gattc_read_multiple(bd_addr_type, bd_addr, *hdls):
 
 
 def gattc_write_without_rsp(bd_addr_type, bd_addr, hdl, val, val_mtp=None):
-    logging.debug("%s %r %r %r %r %r", gattc_write_without_rsp.__name__,
+    log("%s %r %r %r %r %r", gattc_write_without_rsp.__name__,
                   bd_addr_type, bd_addr, hdl, val, val_mtp)
     iutctl = get_iut()
 
@@ -1630,7 +1672,7 @@ def gattc_write_without_rsp(bd_addr_type, bd_addr, hdl, val, val_mtp=None):
 
 
 def gattc_signed_write(bd_addr_type, bd_addr, hdl, val, val_mtp=None):
-    logging.debug("%s %r %r %r %r %r", gattc_signed_write.__name__,
+    log("%s %r %r %r %r %r", gattc_signed_write.__name__,
                   bd_addr_type, bd_addr, hdl, val, val_mtp)
     iutctl = get_iut()
 
@@ -1661,7 +1703,7 @@ def gattc_signed_write(bd_addr_type, bd_addr, hdl, val, val_mtp=None):
 
 
 def gattc_write(bd_addr_type, bd_addr, hdl, val, val_mtp=None):
-    logging.debug("%s %r %r %r %r %r", gattc_write.__name__, bd_addr_type,
+    log("%s %r %r %r %r %r", gattc_write.__name__, bd_addr_type,
                   bd_addr, hdl, val, val_mtp)
     iutctl = get_iut()
 
@@ -1690,7 +1732,7 @@ def gattc_write(bd_addr_type, bd_addr, hdl, val, val_mtp=None):
 
 
 def gattc_write_long(bd_addr_type, bd_addr, hdl, off, val, length=None):
-    logging.debug("%s %r %r %r %r %r", gattc_write_long.__name__,
+    log("%s %r %r %r %r %r", gattc_write_long.__name__,
                   bd_addr_type, hdl, off, val, length)
     gap_wait_for_connection()
 
@@ -1723,7 +1765,7 @@ def gattc_write_long(bd_addr_type, bd_addr, hdl, off, val, length=None):
 
 
 def gattc_cfg_notify(bd_addr_type, bd_addr, enable, ccc_hdl):
-    logging.debug("%s %r %r, %r, %r", gattc_cfg_notify.__name__, bd_addr_type,
+    log("%s %r %r, %r, %r", gattc_cfg_notify.__name__, bd_addr_type,
                   bd_addr, enable, ccc_hdl)
     gap_wait_for_connection()
 
@@ -1744,7 +1786,7 @@ def gattc_cfg_notify(bd_addr_type, bd_addr, enable, ccc_hdl):
     iutctl.btp_socket.send(*GATTC['cfg_notify'], data=data_ba)
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r", gattc_cfg_notify.__name__,
+    log("%s received %r %r", gattc_cfg_notify.__name__,
                   tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
@@ -1752,7 +1794,7 @@ def gattc_cfg_notify(bd_addr_type, bd_addr, enable, ccc_hdl):
 
 
 def gattc_cfg_indicate(bd_addr_type, bd_addr, enable, ccc_hdl):
-    logging.debug("%s %r %r, %r, %r", gattc_cfg_indicate.__name__,
+    log("%s %r %r, %r, %r", gattc_cfg_indicate.__name__,
                   bd_addr_type, bd_addr, enable, ccc_hdl)
     gap_wait_for_connection()
 
@@ -1773,7 +1815,7 @@ def gattc_cfg_indicate(bd_addr_type, bd_addr, enable, ccc_hdl):
     iutctl.btp_socket.send(*GATTC['cfg_indicate'], data=data_ba)
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r", gattc_cfg_indicate.__name__,
+    log("%s received %r %r", gattc_cfg_indicate.__name__,
                   tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
@@ -1781,12 +1823,12 @@ def gattc_cfg_indicate(bd_addr_type, bd_addr, enable, ccc_hdl):
 
 
 def gattc_notification_ev(bd_addr, bd_addr_type, ev_type):
-    logging.debug("%s %r %r %r", gattc_notification_ev.__name__, bd_addr,
+    log("%s %r %r %r", gattc_notification_ev.__name__, bd_addr,
                   bd_addr_type, ev_type)
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
                   defs.GATT_EV_NOTIFICATION)
@@ -1803,12 +1845,12 @@ def gattc_notification_ev(bd_addr, bd_addr_type, ev_type):
 
 
 def gatt_command_rsp_succ():
-    logging.debug("%s", gatt_command_rsp_succ.__name__)
+    log("%s", gatt_command_rsp_succ.__name__)
 
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT)
 
@@ -1962,7 +2004,7 @@ def gattc_disc_prim_uuid_find_attrs_rsp(exp_svcs, store_attrs=False):
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r",
+    log("%s received %r %r",
                   gattc_disc_prim_uuid_find_attrs_rsp.__name__, tuple_hdr,
                   tuple_data)
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
@@ -1978,11 +2020,11 @@ def gattc_disc_prim_uuid_find_attrs_rsp(exp_svcs, store_attrs=False):
                     (exp_svc[1] and exp_svc[1] != svc[1]) or
                     (exp_svc[2] and exp_svc[2] != svc_uuid)):
 
-                logging.debug("gatt svc not matched = %r != %r", svc, exp_svc)
+                log("gatt svc not matched = %r != %r", svc, exp_svc)
 
                 continue
 
-            logging.debug("gatt svc matched = %r == %r", svc, exp_svc)
+            log("gatt svc matched = %r == %r", svc, exp_svc)
 
             if store_attrs:
                 global GATT_SVCS
@@ -1996,14 +2038,14 @@ def gattc_disc_prim_uuid_rsp(store_rsp=False):
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r", gattc_disc_prim_uuid_rsp.__name__,
+    log("%s received %r %r", gattc_disc_prim_uuid_rsp.__name__,
                   tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
                   defs.GATT_DISC_PRIM_UUID)
 
     svcs_tuple = gatt_dec_disc_rsp(tuple_data[0], "service")
-    logging.debug("%s %r", gattc_disc_prim_uuid_rsp.__name__, svcs_tuple)
+    log("%s %r", gattc_disc_prim_uuid_rsp.__name__, svcs_tuple)
 
     if store_rsp:
         global VERIFY_VALUES
@@ -2032,21 +2074,21 @@ def gattc_disc_prim_uuid_rsp(store_rsp=False):
             if uuid not in VERIFY_VALUES:
                 VERIFY_VALUES.append(uuid)
 
-        logging.debug("Set verify values to: %r", VERIFY_VALUES)
+        log("Set verify values to: %r", VERIFY_VALUES)
 
 
 def gattc_find_included_rsp(store_rsp=False):
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r", gattc_find_included_rsp.__name__,
+    log("%s received %r %r", gattc_find_included_rsp.__name__,
                   tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
                   defs.GATT_FIND_INCLUDED)
 
     incls_tuple = gatt_dec_disc_rsp(tuple_data[0], "include")
-    logging.debug("%s %r", gattc_find_included_rsp.__name__, incls_tuple)
+    log("%s %r", gattc_find_included_rsp.__name__, incls_tuple)
 
     if store_rsp:
         global VERIFY_VALUES
@@ -2065,21 +2107,21 @@ def gattc_find_included_rsp(store_rsp=False):
             VERIFY_VALUES.append(end_grp_handle)
             VERIFY_VALUES.append(uuid)
 
-        logging.debug("Set verify values to: %r", VERIFY_VALUES)
+        log("Set verify values to: %r", VERIFY_VALUES)
 
 
 def gattc_disc_all_chrc_rsp(store_rsp=False):
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r", gattc_disc_all_chrc_rsp.__name__,
+    log("%s received %r %r", gattc_disc_all_chrc_rsp.__name__,
                   tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
                   defs.GATT_DISC_ALL_CHRC)
 
     chrcs_tuple = gatt_dec_disc_rsp(tuple_data[0], "characteristic")
-    logging.debug("%s %r", gattc_disc_all_chrc_rsp.__name__, chrcs_tuple)
+    log("%s %r", gattc_disc_all_chrc_rsp.__name__, chrcs_tuple)
 
     if store_rsp:
         global VERIFY_VALUES
@@ -2090,21 +2132,21 @@ def gattc_disc_all_chrc_rsp(store_rsp=False):
             handle = "%04X" % (chrc[0],)
             VERIFY_VALUES.append(handle)
 
-        logging.debug("Set verify values to: %r", VERIFY_VALUES)
+        log("Set verify values to: %r", VERIFY_VALUES)
 
 
 def gattc_disc_chrc_uuid_rsp(store_rsp=False):
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r", gattc_disc_chrc_uuid_rsp.__name__,
+    log("%s received %r %r", gattc_disc_chrc_uuid_rsp.__name__,
                   tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
                   defs.GATT_DISC_CHRC_UUID)
 
     chrcs_tuple = gatt_dec_disc_rsp(tuple_data[0], "characteristic")
-    logging.debug("%s %r", gattc_disc_chrc_uuid_rsp.__name__, chrcs_tuple)
+    log("%s %r", gattc_disc_chrc_uuid_rsp.__name__, chrcs_tuple)
 
     if store_rsp:
         global VERIFY_VALUES
@@ -2123,21 +2165,21 @@ def gattc_disc_chrc_uuid_rsp(store_rsp=False):
             VERIFY_VALUES.append(handle)
             VERIFY_VALUES.append(uuid)
 
-        logging.debug("Set verify values to: %r", VERIFY_VALUES)
+        log("Set verify values to: %r", VERIFY_VALUES)
 
 
 def gattc_disc_all_desc_rsp(store_rsp=False):
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r", gattc_disc_all_desc_rsp.__name__,
+    log("%s received %r %r", gattc_disc_all_desc_rsp.__name__,
                   tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
                   defs.GATT_DISC_ALL_DESC)
 
     descs_tuple = gatt_dec_disc_rsp(tuple_data[0], "descriptor")
-    logging.debug("%s %r", gattc_disc_all_desc_rsp.__name__, descs_tuple)
+    log("%s %r", gattc_disc_all_desc_rsp.__name__, descs_tuple)
 
     if store_rsp:
         global VERIFY_VALUES
@@ -2150,7 +2192,7 @@ def gattc_disc_all_desc_rsp(store_rsp=False):
             VERIFY_VALUES.append(handle)
             VERIFY_VALUES.append(uuid)
 
-        logging.debug("Set verify values to: %r", VERIFY_VALUES)
+        log("Set verify values to: %r", VERIFY_VALUES)
 
 
 att_rsp_str = {0:   "No error",
@@ -2173,13 +2215,13 @@ def gattc_read_rsp(store_rsp=False, store_val=False, timeout=None):
         tuple_hdr, tuple_data = iutctl.btp_socket.read(timeout)
     else:
         tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r", gattc_read_rsp.__name__, tuple_hdr,
+    log("%s received %r %r", gattc_read_rsp.__name__, tuple_hdr,
                   tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT, defs.GATT_READ)
 
     rsp, value = gatt_dec_read_rsp(tuple_data[0])
-    logging.debug("%s %r %r", gattc_read_rsp.__name__, rsp, value)
+    log("%s %r %r", gattc_read_rsp.__name__, rsp, value)
 
     if store_rsp or store_val:
         global VERIFY_VALUES
@@ -2196,13 +2238,13 @@ def gattc_read_long_rsp(store_rsp=False, store_val=False):
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r", gattc_read_long_rsp.__name__, tuple_hdr,
+    log("%s received %r %r", gattc_read_long_rsp.__name__, tuple_hdr,
                   tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT, defs.GATT_READ_LONG)
 
     rsp, value = gatt_dec_read_rsp(tuple_data[0])
-    logging.debug("%s %r %r", gattc_read_long_rsp.__name__, rsp, value)
+    log("%s %r %r", gattc_read_long_rsp.__name__, rsp, value)
 
     if store_rsp or store_val:
         global VERIFY_VALUES
@@ -2219,14 +2261,14 @@ def gattc_read_multiple_rsp(store_val=False, store_rsp=False):
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r", gattc_read_multiple_rsp.__name__,
+    log("%s received %r %r", gattc_read_multiple_rsp.__name__,
                   tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
                   defs.GATT_READ_MULTIPLE)
 
     rsp, values = gatt_dec_read_rsp(tuple_data[0])
-    logging.debug("%s %r %r", gattc_read_multiple_rsp.__name__, rsp, values)
+    log("%s %r %r", gattc_read_multiple_rsp.__name__, rsp, values)
 
     if store_rsp or store_val:
         global VERIFY_VALUES
@@ -2246,13 +2288,13 @@ def gattc_write_rsp(store_rsp=False, timeout=None):
         tuple_hdr, tuple_data = iutctl.btp_socket.read(timeout)
     else:
         tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r", gattc_write_rsp.__name__, tuple_hdr,
+    log("%s received %r %r", gattc_write_rsp.__name__, tuple_hdr,
                   tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT, defs.GATT_WRITE)
 
     rsp = gatt_dec_write_rsp(tuple_data[0])
-    logging.debug("%s %r", gattc_write_rsp.__name__, rsp)
+    log("%s %r", gattc_write_rsp.__name__, rsp)
 
     if store_rsp:
         global VERIFY_VALUES
@@ -2264,14 +2306,14 @@ def gattc_write_long_rsp(store_rsp=False):
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("%s received %r %r", gattc_write_long_rsp.__name__,
+    log("%s received %r %r", gattc_write_long_rsp.__name__,
                   tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_GATT,
                   defs.GATT_WRITE_LONG)
 
     rsp = gatt_dec_write_rsp(tuple_data[0])
-    logging.debug("%s %r", gattc_write_long_rsp.__name__, rsp)
+    log("%s %r", gattc_write_long_rsp.__name__, rsp)
 
     if store_rsp:
         global VERIFY_VALUES
@@ -2280,18 +2322,18 @@ def gattc_write_long_rsp(store_rsp=False):
 
 
 def l2cap_command_rsp_succ(op=None):
-    logging.debug("%s", l2cap_command_rsp_succ.__name__)
+    log("%s", l2cap_command_rsp_succ.__name__)
 
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_L2CAP, op)
 
 
 def l2cap_conn(bd_addr, bd_addr_type, psm):
-    logging.debug("%s %r %r %r", l2cap_conn.__name__, bd_addr, bd_addr_type,
+    log("%s %r %r %r", l2cap_conn.__name__, bd_addr, bd_addr_type,
                   psm)
     iutctl = get_iut()
     gap_wait_for_connection()
@@ -2323,12 +2365,12 @@ l2cap_result_str = {0:  "Connection successful",
 
 
 def l2cap_conn_rsp():
-    logging.debug("%s", l2cap_conn_rsp.__name__)
+    log("%s", l2cap_conn_rsp.__name__)
 
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_L2CAP, defs.L2CAP_CONNECT)
 
@@ -2337,11 +2379,11 @@ def l2cap_conn_rsp():
     global L2CAP_CHAN
     L2CAP_CHAN.append(chan_id)
 
-    logging.debug("new L2CAP channel: id %r", chan_id)
+    log("new L2CAP channel: id %r", chan_id)
 
 
 def l2cap_disconn(chan_id):
-    logging.debug("%s %r", l2cap_disconn.__name__, chan_id)
+    log("%s %r", l2cap_disconn.__name__, chan_id)
 
     iutctl = get_iut()
 
@@ -2362,7 +2404,7 @@ def l2cap_disconn(chan_id):
 
 
 def l2cap_send_data(chan_id, val, val_mtp=None):
-    logging.debug("%s %r %r %r", l2cap_send_data.__name__, chan_id, val,
+    log("%s %r %r %r", l2cap_send_data.__name__, chan_id, val,
                   val_mtp)
 
     iutctl = get_iut()
@@ -2383,7 +2425,7 @@ def l2cap_send_data(chan_id, val, val_mtp=None):
 
 
 def l2cap_listen(psm, transport):
-    logging.debug("%s %r %r", l2cap_le_listen.__name__, psm, transport)
+    log("%s %r %r", l2cap_le_listen.__name__, psm, transport)
 
     iutctl = get_iut()
 
@@ -2403,19 +2445,19 @@ def l2cap_le_listen(psm):
 
 
 def l2cap_connected_ev():
-    logging.debug("%s", l2cap_connected_ev.__name__)
+    log("%s", l2cap_connected_ev.__name__)
 
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_L2CAP,
                   defs.L2CAP_EV_CONNECTED)
 
     chan_id, psm, bd_addr_type, bd_addr = struct.unpack_from('<BHB6s',
                                                              tuple_data[0])
-    logging.debug("New L2CAP connection ID:%r on PSM:%r, Addr %r Type %r",
+    log("New L2CAP connection ID:%r on PSM:%r, Addr %r Type %r",
                   chan_id, psm, bd_addr, bd_addr_type)
 
     global L2CAP_CHAN
@@ -2426,12 +2468,12 @@ def l2cap_connected_ev():
 
 
 def l2cap_disconnected_ev(exp_chan_id, store=False):
-    logging.debug("%s %r", l2cap_disconnected_ev.__name__, exp_chan_id)
+    log("%s %r", l2cap_disconnected_ev.__name__, exp_chan_id)
 
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_L2CAP,
                   defs.L2CAP_EV_DISCONNECTED)
@@ -2442,7 +2484,7 @@ def l2cap_disconnected_ev(exp_chan_id, store=False):
     global L2CAP_CHAN
     L2CAP_CHAN.remove(chan_id)
 
-    logging.debug("L2CAP channel disconnected: id %r", chan_id)
+    log("L2CAP channel disconnected: id %r", chan_id)
 
     if chan_id != exp_chan_id:
         raise BTPError("Error in L2CAP disconnected event data")
@@ -2454,12 +2496,12 @@ def l2cap_disconnected_ev(exp_chan_id, store=False):
 
 
 def l2cap_data_rcv_ev(chan_id=None, store=False):
-    logging.debug("%s %r %r", l2cap_data_rcv_ev.__name__, chan_id, store)
+    log("%s %r %r", l2cap_data_rcv_ev.__name__, chan_id, store)
 
     iutctl = get_iut()
 
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
-    logging.debug("received %r %r", tuple_hdr, tuple_data)
+    log("received %r %r", tuple_hdr, tuple_data)
 
     btp_hdr_check(tuple_hdr, defs.BTP_SERVICE_ID_L2CAP,
                   defs.L2CAP_EV_DATA_RECEIVED)
@@ -2481,7 +2523,7 @@ def l2cap_data_rcv_ev(chan_id=None, store=False):
 
 
 def gap_new_settings_ev_(gap, data, data_len):
-    logging.debug("%s %r", gap_new_settings_ev_.__name__, data)
+    log("%s %r", gap_new_settings_ev_.__name__, data)
 
     data_fmt = '<I'
 
@@ -2491,7 +2533,7 @@ def gap_new_settings_ev_(gap, data, data_len):
 
 
 def gap_device_found_ev_(gap, data, data_len):
-    logging.debug("%s %r", gap_device_found_ev_.__name__, data)
+    log("%s %r", gap_device_found_ev_.__name__, data)
 
     fmt = '<B6sBBH'
     if len(data) < struct.calcsize(fmt):
@@ -2505,7 +2547,7 @@ def gap_device_found_ev_(gap, data, data_len):
 
     addr = binascii.hexlify(addr[::-1]).lower()
 
-    logging.debug("found %r type %r eir %r", addr, addr_type, eir)
+    log("found %r type %r eir %r", addr, addr_type, eir)
 
     stack = get_stack()
     stack.gap.found_devices.data.append(LeAdv(addr_type, addr, rssi, flags,
@@ -2513,7 +2555,7 @@ def gap_device_found_ev_(gap, data, data_len):
 
 
 def gap_connected_ev_(gap, data, data_len):
-    logging.debug("%s %r", gap_connected_ev_.__name__, data)
+    log("%s %r", gap_connected_ev_.__name__, data)
 
     hdr_fmt = '<B6s'
     hdr_len = struct.calcsize(hdr_fmt)
@@ -2527,20 +2569,20 @@ def gap_connected_ev_(gap, data, data_len):
 
 
 def gap_disconnected_ev_(gap, data, data_len):
-    logging.debug("%s %r", gap_disconnected_ev_.__name__, data)
+    log("%s %r", gap_disconnected_ev_.__name__, data)
 
     gap.connected.data = None
 
 
 def gap_passkey_disp_ev_(gap, data, data_len):
-    logging.debug("%s %r", gap_passkey_disp_ev_.__name__, data)
+    log("%s %r", gap_passkey_disp_ev_.__name__, data)
 
     fmt = '<B6sI'
 
     addr_type, addr, passkey = struct.unpack(fmt, data)
     addr = binascii.hexlify(addr[::-1])
 
-    logging.debug("passkey = %r", passkey)
+    log("passkey = %r", passkey)
 
     gap.passkey.data = passkey
 
@@ -2555,7 +2597,7 @@ GAP_EV = {
 
 
 def mesh_config_prov():
-    logging.debug("%s", mesh_config_prov.__name__)
+    log("%s", mesh_config_prov.__name__)
 
     iutctl = get_iut()
 
@@ -2575,7 +2617,7 @@ def mesh_config_prov():
 
 
 def mesh_prov_node():
-    logging.debug("%s", mesh_config_prov.__name__)
+    log("%s", mesh_config_prov.__name__)
 
     stack = get_stack()
 
@@ -2593,7 +2635,7 @@ def mesh_prov_node():
 
 
 def mesh_init():
-    logging.debug("%s", mesh_init.__name__)
+    log("%s", mesh_init.__name__)
 
     iutctl = get_iut()
 
@@ -2607,7 +2649,7 @@ def mesh_init():
 
 
 def mesh_reset():
-    logging.debug("%s", mesh_reset.__name__)
+    log("%s", mesh_reset.__name__)
 
     iutctl = get_iut()
 
@@ -2620,7 +2662,7 @@ def mesh_reset():
 
 
 def mesh_input_number(number):
-    logging.debug("%s %r", mesh_input_number.__name__, number)
+    log("%s %r", mesh_input_number.__name__, number)
 
     iutctl = get_iut()
 
@@ -2633,7 +2675,7 @@ def mesh_input_number(number):
 
 
 def mesh_input_string(string):
-    logging.debug("%s %s", mesh_input_string.__name__, string)
+    log("%s %s", mesh_input_string.__name__, string)
 
     iutctl = get_iut()
 
@@ -2643,7 +2685,7 @@ def mesh_input_string(string):
 
 
 def mesh_iv_update_test_mode(enable):
-    logging.debug("%s", mesh_iv_update_test_mode.__name__)
+    log("%s", mesh_iv_update_test_mode.__name__)
 
     iutctl = get_iut()
 
@@ -2659,7 +2701,7 @@ def mesh_iv_update_test_mode(enable):
 
 
 def mesh_iv_update_toggle():
-    logging.debug("%s", mesh_iv_update_toggle.__name__)
+    log("%s", mesh_iv_update_toggle.__name__)
 
     iutctl = get_iut()
 
@@ -2667,11 +2709,11 @@ def mesh_iv_update_toggle():
     tuple_hdr, tuple_data = iutctl.btp_socket.read()
 
     if tuple_hdr.op == defs.BTP_STATUS:
-        logging.info("IV Update in progress")
+        logger.info("IV Update in progress")
 
 
 def mesh_net_send(ttl, src, dst, payload):
-    logging.debug("%s %r %r %r %r", mesh_net_send.__name__, ttl, src, dst,
+    log("%s %r %r %r %r", mesh_net_send.__name__, ttl, src, dst,
                   payload)
 
     if ttl is None:
@@ -2699,7 +2741,7 @@ def mesh_net_send(ttl, src, dst, payload):
 
 
 def mesh_health_generate_faults():
-    logging.debug("%s", mesh_health_generate_faults.__name__)
+    log("%s", mesh_health_generate_faults.__name__)
 
     iutctl = get_iut()
     (rsp,) = iutctl.btp_socket.send_wait_rsp(*MESH['health_generate_faults'])
@@ -2720,14 +2762,14 @@ def mesh_health_generate_faults():
 
 
 def mesh_health_clear_faults():
-    logging.debug("%s", mesh_health_clear_faults.__name__)
+    log("%s", mesh_health_clear_faults.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send_wait_rsp(*MESH['mesh_clear_faults'])
 
 
 def mesh_lpn(enable):
-    logging.debug("%s %r", mesh_lpn.__name__, enable)
+    log("%s %r", mesh_lpn.__name__, enable)
 
     if enable:
         enable = 0x01
@@ -2741,14 +2783,14 @@ def mesh_lpn(enable):
 
 
 def mesh_lpn_poll():
-    logging.debug("%s", mesh_lpn_poll.__name__)
+    log("%s", mesh_lpn_poll.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send_wait_rsp(*MESH['lpn_poll'])
 
 
 def mesh_model_send(src, dst, payload):
-    logging.debug("%s %r %r %r", mesh_model_send.__name__, src, dst, payload)
+    log("%s %r %r %r", mesh_model_send.__name__, src, dst, payload)
 
     if isinstance(src, str):
         src = int(src, 16)
@@ -2770,7 +2812,7 @@ def mesh_model_send(src, dst, payload):
 
 
 def mesh_lpn_subscribe(address):
-    logging.debug("%s %r", mesh_lpn_subscribe.__name__, address)
+    log("%s %r", mesh_lpn_subscribe.__name__, address)
 
     if isinstance(address, str):
         address = int(address, 16)
@@ -2782,7 +2824,7 @@ def mesh_lpn_subscribe(address):
 
 
 def mesh_lpn_unsubscribe(address):
-    logging.debug("%s %r", mesh_lpn_unsubscribe.__name__, address)
+    log("%s %r", mesh_lpn_unsubscribe.__name__, address)
 
     if isinstance(address, str):
         address = int(address, 16)
@@ -2794,21 +2836,21 @@ def mesh_lpn_unsubscribe(address):
 
 
 def mesh_rpl_clear():
-    logging.debug("%s", mesh_rpl_clear.__name__)
+    log("%s", mesh_rpl_clear.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send_wait_rsp(*MESH['rpl_clear'])
 
 
 def mesh_proxy_identity():
-    logging.debug("%s", mesh_proxy_identity.__name__)
+    log("%s", mesh_proxy_identity.__name__)
 
     iutctl = get_iut()
     iutctl.btp_socket.send_wait_rsp(*MESH['proxy_identity'])
 
 
 def mesh_out_number_action_ev(mesh, data, data_len):
-    logging.debug("%s %r", mesh_out_number_action_ev.__name__, data)
+    log("%s %r", mesh_out_number_action_ev.__name__, data)
 
     action, number = struct.unpack_from('<HI', data)
 
@@ -2817,7 +2859,7 @@ def mesh_out_number_action_ev(mesh, data, data_len):
 
 
 def mesh_out_string_action_ev(mesh, data, data_len):
-    logging.debug("%s %r", mesh_out_string_action_ev.__name__, data)
+    log("%s %r", mesh_out_string_action_ev.__name__, data)
 
     hdr_fmt = '<B'
     hdr_len = struct.calcsize(hdr_fmt)
@@ -2829,13 +2871,13 @@ def mesh_out_string_action_ev(mesh, data, data_len):
 
 
 def mesh_in_action_ev(mesh, data, data_len):
-    logging.debug("%s %r", mesh_in_action_ev.__name__, data)
+    log("%s %r", mesh_in_action_ev.__name__, data)
 
     action, size = struct.unpack('<HB', data)
 
 
 def mesh_provisioned_ev(mesh, data, data_len):
-    logging.debug("%s %r", mesh_provisioned_ev.__name__, data)
+    log("%s %r", mesh_provisioned_ev.__name__, data)
     stack = get_stack()
 
     mesh.is_provisioned.data = True
@@ -2845,7 +2887,7 @@ def mesh_provisioned_ev(mesh, data, data_len):
 
 
 def mesh_prov_link_open_ev(mesh, data, data_len):
-    logging.debug("%s %r", mesh_prov_link_open_ev.__name__, data)
+    log("%s %r", mesh_prov_link_open_ev.__name__, data)
 
     (bearer,) = struct.unpack('<B', data)
 
@@ -2853,7 +2895,7 @@ def mesh_prov_link_open_ev(mesh, data, data_len):
 
 
 def mesh_prov_link_closed_ev(mesh, data, data_len):
-    logging.debug("%s %r", mesh_prov_link_closed_ev.__name__, data)
+    log("%s %r", mesh_prov_link_closed_ev.__name__, data)
 
     (bearer,) = struct.unpack('<B', data)
 
@@ -2878,7 +2920,7 @@ def mesh_net_rcv_ev(mesh, data, data_len):
     if not stack.mesh.net_recv_ev_store.data:
         return
 
-    logging.debug("%s %r %r", mesh_net_rcv_ev.__name__, data, data_len)
+    log("%s %r %r", mesh_net_rcv_ev.__name__, data, data_len)
 
     hdr_fmt = '<BBHHB'
     hdr_len = struct.calcsize(hdr_fmt)
@@ -2893,7 +2935,7 @@ def mesh_net_rcv_ev(mesh, data, data_len):
 def mesh_invalid_bearer_ev(mesh, data, data_len):
     stack = get_stack()
 
-    logging.debug("%s %r %r", mesh_invalid_bearer_ev.__name__, data, data_len)
+    log("%s %r %r", mesh_invalid_bearer_ev.__name__, data, data_len)
 
     hdr_fmt = '<B'
     hdr_len = struct.calcsize(hdr_fmt)
@@ -2904,7 +2946,7 @@ def mesh_invalid_bearer_ev(mesh, data, data_len):
 
 
 def mesh_incomp_timer_exp_ev(mesh, data, data_len):
-    logging.debug("%s", mesh_incomp_timer_exp_ev.__name__)
+    log("%s", mesh_incomp_timer_exp_ev.__name__)
 
     stack = get_stack()
 
@@ -2925,11 +2967,11 @@ MESH_EV = {
 
 
 def event_handler(hdr, data):
-    logging.debug("%s %r %r", event_handler.__name__, hdr, data)
+    log("%s %r %r", event_handler.__name__, hdr, data)
 
     stack = get_stack()
     if not stack:
-        logging.info("Stack not initialized")
+        logger.info("Stack not initialized")
         return False
 
     if hdr.svc_id == defs.BTP_SERVICE_ID_MESH:
@@ -2944,7 +2986,7 @@ def event_handler(hdr, data):
             return True
 
     # TODO: Raise BTP error instead of logging
-    logging.error("Unhandled event! svc_id %s op %s", hdr.svc_id, hdr.op)
+    logger.error("Unhandled event! svc_id %s op %s", hdr.svc_id, hdr.op)
     return False
 
 
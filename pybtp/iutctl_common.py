@@ -18,13 +18,15 @@ import logging
 import socket
 import binascii
 import threading
-import Queue
+import time
+from collections import deque
 
 import defs
 from types import BTPError
 from parser import enc_frame, dec_hdr, dec_data, HDR_LEN
 
-log = logging.debug
+logger = logging.getLogger(__name__)
+log = logger.debug
 
 # BTP communication transport: unix domain socket file name
 BTP_ADDRESS = "/tmp/bt-stack-tester"
@@ -37,20 +39,63 @@ def set_event_handler(event_handler):
 
     EVENT_HANDLER = event_handler
 
+# Deadlines of the running test cases: owner -> time after which BTP reads
+# stop waiting for frames, see set_read_deadline
+READ_DEADLINES = {}
+READ_DEADLINES_LOCK = threading.Lock()
+
+def set_read_deadline(owner, deadline):
+    """Limit BTP reads to the time the running test case is given to finish
+
+    Instances of a test case, e.g. LT2 slave, run at the same time and share
+    the IUT, hence each sets its own deadline. Reads wait till the latest
+    one, so that an instance does not cut reads of another one short.
+
+    owner -- test case setting the deadline
+    deadline -- time.time() based deadline, None removes deadline of owner"""
+    with READ_DEADLINES_LOCK:
+        if deadline is None:
+            READ_DEADLINES.pop(owner, None)
+        else:
+            READ_DEADLINES[owner] = deadline
+
+def get_read_deadline():
+    """Returns latest deadline set by set_read_deadline, None if not set"""
+    with READ_DEADLINES_LOCK:
+        if not READ_DEADLINES:
+            return None
+
+        return max(READ_DEADLINES.itervalues())
+
+# Size of the BTP socket receive buffer, grows if a frame does not fit
+RX_BUF_SIZE = 4096
+
 class BTPSocket(object):
 
-    def __init__(self):
+    def __init__(self, address=BTP_ADDRESS):
+        """address - unix domain socket file name to listen on"""
+        self.address = address
         self.sock = None
         self.conn = None
         self.addr = None
 
+        # Received data not yet split into frames is kept in _rx_buf between
+        # _rx_start and _rx_end
+        self._rx_buf = bytearray(RX_BUF_SIZE)
+        self._rx_start = 0
+        self._rx_end = 0
+        self._rx_frames = deque()
+
+        # timeout currently set on conn, to avoid setting it for every read
+        self._conn_timeout = None
+
     def open(self):
         """Open BTP socket for IUT"""
-        if os.path.exists(BTP_ADDRESS):
-            os.remove(BTP_ADDRESS)
+        if os.path.exists(self.address):
+            os.remove(self.address)
 
         self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        self.sock.bind(BTP_ADDRESS)
+        self.sock.bind(self.address)
 
         # queue only one connection
         self.sock.listen(1)
@@ -64,59 +109,113 @@ class BTPSocket(object):
         self.conn, self.addr = self.sock.accept()
         self.sock.settimeout(None)
 
-    def read(self, timeout=20.0):
-        """Read BTP data from socket
+        self._rx_start = 0
+        self._rx_end = 0
+        self._rx_frames.clear()
+        self._conn_timeout = None
 
-        timeout - read timeout in seconds"""
-        toread_hdr_len = HDR_LEN
-        hdr = bytearray(toread_hdr_len)
-        hdr_memview = memoryview(hdr)
-        self.conn.settimeout(timeout)
+    def _recv(self, timeout):
+        """Receive all available data into receive buffer
+
+        Blocks up to timeout seconds till any data is available.
+
+        """
+        if self._conn_timeout != timeout:
+            self.conn.settimeout(timeout)
+            self._conn_timeout = timeout
+
+        # Make room for new data, moving not yet split data to the beginning
+        if self._rx_end == len(self._rx_buf):
+            pending = self._rx_end - self._rx_start
+            if pending == len(self._rx_buf):
+                self._rx_buf.extend(bytearray(len(self._rx_buf)))
+            else:
+                self._rx_buf[:pending] = \
+                    self._rx_buf[self._rx_start:self._rx_end]
+                self._rx_start = 0
+                self._rx_end = pending
+
+        rx_memview = memoryview(self._rx_buf)[self._rx_end:]
+        nbytes = self.conn.recv_into(rx_memview)
+        if not nbytes:
+            raise socket.error("BTP connection closed")
+
+        self._rx_end += nbytes
+
+    def _split_frames(self):
+        """Split complete frames from receive buffer to frames queue"""
+        rx_memview = memoryview(self._rx_buf)
+
+        while self._rx_end - self._rx_start >= HDR_LEN:
+            tuple_hdr = dec_hdr(rx_memview[self._rx_start:])
+            frame_end = self._rx_start + HDR_LEN + tuple_hdr.data_len
+
+            if frame_end > self._rx_end:
+                break
+
+            tuple_data = dec_data(
+                rx_memview[self._rx_start + HDR_LEN:frame_end])
+            log("Received: hdr: %r data: %r", tuple_hdr, tuple_data)
+
+            self._rx_frames.append((tuple_hdr, tuple_data))
+            self._rx_start = frame_end
+
+        if self._rx_start == self._rx_end:
+            self._rx_start = 0
+            self._rx_end = 0
+
+    def read_frames(self, timeout=20.0):
+        """Read all BTP frames available on socket
+
+        Waits up to timeout seconds for at least one complete frame, returns
+        list of (header, data) tuples. Frames are received in as few socket
+        reads as possible, so bursts of events cost a single read.
 
-        # Gather frame header
-        while toread_hdr_len:
-            nbytes = self.conn.recv_into(hdr_memview, toread_hdr_len)
-            hdr_memview = hdr_memview[nbytes:]
-            toread_hdr_len -= nbytes
+        timeout - read timeout in seconds
 
-        tuple_hdr = dec_hdr(hdr)
-        toread_data_len = tuple_hdr.data_len
+        Raises socket.timeout if no complete frame was received in time."""
+        deadline = time.time() + timeout
+        remaining = timeout
 
-        logging.debug("Received: hdr: %r %r", tuple_hdr, hdr)
+        while not self._rx_frames:
+            if remaining <= 0:
+                raise socket.timeout
 
-        data = bytearray(toread_data_len)
-        data_memview = memoryview(data)
+            self._recv(remaining)
+            self._split_frames()
 
-        # Gather optional frame data
-        while toread_data_len:
-            nbytes = self.conn.recv_into(data_memview, toread_data_len)
-            data_memview = data_memview[nbytes:]
-            toread_data_len -= nbytes
+            # only a part of frame was received, wait for the rest
+            remaining = deadline - time.time()
 
-        tuple_data = dec_data(data)
-        log("Received data: %r, %r", tuple_data, data)
-        self.conn.settimeout(None)
+        frames = list(self._rx_frames)
+        self._rx_frames.clear()
 
-        return tuple_hdr, tuple_data
+        return frames
+
+    def read(self, timeout=20.0):
+        """Read BTP frame from socket
+
+        timeout - read timeout in seconds"""
+        if not self._rx_frames:
+            self._rx_frames.extend(self.read_frames(timeout))
+
+        return self._rx_frames.popleft()
 
     def send(self, svc_id, op, ctrl_index, data):
         """Send BTP formated data over socket"""
-        logging.debug("%s, %r %r %r %r",
-                      self.send.__name__, svc_id, op, ctrl_index, data)
-
         if isinstance(data, int):
             data = str(data)
             if len(data) == 1:
                 data = "0%s" % data
                 data = binascii.unhexlify(data)
 
-        hex_data = binascii.hexlify(data)
-        logging.debug("btpclient command: send %d %d %d %s",
-                      svc_id, op, ctrl_index, hex_data)
-
         bin = enc_frame(svc_id, op, ctrl_index, data)
 
-        logging.debug("sending frame %r", bin)
+        # avoid hexlifying every frame when debug logs are disabled
+        if logger.isEnabledFor(logging.DEBUG):
+            log("btpclient command: send %d %d %d %s", svc_id, op,
+                ctrl_index, binascii.hexlify(data))
+
         self.conn.send(bin)
 
     def close(self):
@@ -129,10 +228,13 @@ class BTPSocket(object):
 
 
 class BTPWorker(BTPSocket):
-    def __init__(self):
-        super(BTPWorker, self).__init__()
+    def __init__(self, address=BTP_ADDRESS):
+        super(BTPWorker, self).__init__(address)
 
-        self._rx_queue = Queue.Queue()
+        # Frames received from IUT that were not consumed by event handler,
+        # guarded by _rx_cond so that readers block instead of polling.
+        self._rx_queue = deque()
+        self._rx_cond = threading.Condition()
         self._running = threading.Event()
 
         self._rx_worker = threading.Thread(target=self._rx_task)
@@ -142,8 +244,15 @@ class BTPWorker(BTPSocket):
     def _rx_task(self):
         while self._running.is_set():
             try:
-                data = super(BTPWorker, self).read(timeout=1.0)
+                frames = self.read_frames(timeout=1.0)
+            except socket.timeout:
+                continue
+            except socket.error as error:
+                log("%s stopped: %s", self._rx_task.__name__, error)
+                break
 
+            rx_frames = []
+            for data in frames:
                 hdr = data[0]
                 if hdr.op >= 0x80:
                     # Do not put handled events on RX queue
@@ -151,35 +260,58 @@ class BTPWorker(BTPSocket):
                     if ret is True:
                         continue
 
-                self._rx_queue.put(data)
-            except socket.timeout:
-                pass
-
-    @staticmethod
-    def _read_timeout(flag):
-        flag.clear()
+                rx_frames.append(data)
 
-    def read(self, timeout=20.0):
-        logging.debug("%s", self.read.__name__)
+            if rx_frames:
+                with self._rx_cond:
+                    self._rx_queue.extend(rx_frames)
+                    self._rx_cond.notify_all()
 
-        flag = threading.Event()
-        flag.set()
+    def _pop_rx_frame(self, svc_id=None, op=None):
+        """Remove and return the oldest queued frame matching the filter
 
-        t = threading.Timer(timeout, self._read_timeout, [flag])
-        t.start()
+        Must be called with _rx_cond held. Returns None if there is no
+        matching frame, frames that do not match are left in the queue.
 
-        while flag.is_set():
-            if self._rx_queue.empty():
+        """
+        for data in self._rx_queue:
+            hdr = data[0]
+            if svc_id is not None and hdr.svc_id != svc_id:
+                continue
+            if op is not None and hdr.op != op:
                 continue
 
-            t.cancel()
+            self._rx_queue.remove(data)
+            return data
+
+        return None
 
-            data = self._rx_queue.get()
-            self._rx_queue.task_done()
+    def read(self, timeout=20.0, svc_id=None, op=None):
+        """Wait for BTP frame received from IUT
 
-            return data
+        timeout - read timeout in seconds, shortened to read deadline if set
+        svc_id - if set, wait only for frame with this service ID
+        op - if set, wait only for frame with this opcode
+
+        Raises socket.timeout if no matching frame arrived within timeout."""
+        log("%s svc_id=%r op=%r", self.read.__name__, svc_id, op)
 
-        raise socket.timeout
+        deadline = time.time() + timeout
+        read_deadline = get_read_deadline()
+        if read_deadline is not None:
+            deadline = min(deadline, read_deadline)
+
+        with self._rx_cond:
+            while True:
+                data = self._pop_rx_frame(svc_id, op)
+                if data is not None:
+                    return data
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise socket.timeout
+
+                self._rx_cond.wait(remaining)
 
     def send_wait_rsp(self, svc_id, op, ctrl_index, data, cb=None, user_data=None):
         super(BTPWorker, self).send(svc_id, op, ctrl_index, data)
@@ -205,16 +337,11 @@ class BTPWorker(BTPSocket):
                 return tuple_data
 
     def _reset_rx_queue(self):
-        while not self._rx_queue.empty():
-            try:
-                self._rx_queue.get_nowait()
-            except Queue.Empty:
-                continue
-
-            self._rx_queue.task_done()
+        with self._rx_cond:
+            self._rx_queue.clear()
 
     def accept(self, timeout=10.0):
-        logging.debug("%s", self.accept.__name__)
+        log("%s", self.accept.__name__)
 
         super(BTPWorker, self).accept(timeout)
 
@@ -16,9 +16,12 @@
 import struct
 import defs
 from collections import namedtuple
-import logging
 
-HDR_LEN = 5
+# BTP header: Service ID, Opcode, Controller Index, Data Length
+HDR_STRUCT = struct.Struct("<BBBH")
+HDR_LEN = HDR_STRUCT.size
+
+Header = namedtuple('Header', 'svc_id op ctrl_index data_len')
 
 
 # Service frames parsers
@@ -50,33 +53,27 @@ def dec_hdr(bin):
     | Service ID | Opcode | Controller Index | Data Length |
     +------------+--------+------------------+-------------+
 
-    """
-    logging.debug("%s, %r", dec_hdr.__name__, bin)
-
-    Header = namedtuple('Header', 'svc_id op ctrl_index data_len')
-
-    hdr = Header._make(struct.unpack("<BBBH", bin))
+    bin -- buffer starting with the header, it is not copied
 
-    return hdr
+    """
+    return Header._make(HDR_STRUCT.unpack_from(bin))
 
 
 def dec_data(bin):
-    logging.debug("%s, %r", dec_data.__name__, bin)
+    """Decode BTP frame data
+
+    Returns one element tuple with data as string. Data that is already a
+    string is not copied.
 
-    data_len = len(bin)
-    data = struct.unpack('<%ds' % data_len, bin)
+    """
+    if isinstance(bin, memoryview):
+        return (bin.tobytes(),)
 
-    return data
+    return (str(bin),)
 
 
 def enc_frame(svc_id, op, ctrl_index, data):
-    logging.debug("%s, %r %r %r %r",
-                  enc_frame.__name__, svc_id, op, ctrl_index, data)
-
-    str_data = str(bytearray(data))
-    int_len = len(str_data)
-    hex_len = struct.pack('h', int_len)
-    bin = struct.pack('<BBB2s%ds' % int_len, svc_id, op, ctrl_index, hex_len,
-                      str_data)
+    if not isinstance(data, str):
+        data = str(bytearray(data))
 
-    return bin
+    return HDR_STRUCT.pack(svc_id, op, ctrl_index, len(data)) + data
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+#
+# auto-pts - The Bluetooth PTS Automation Framework
+#
+# Copyright (c) 2018, Intel Corporation.
+#
+# This program is free software; you can redistribute it and/or modify it
+# under the terms and conditions of the GNU General Public License,
+# version 2, as published by the Free Software Foundation.
+#
+# This program is distributed in the hope it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+
+"""Micro-benchmark of BTP frame codec.
+
+Measures encoding and decoding of a frame sized like MESH_EV_NET_RECV event
+and compares it with the codec that created header type and struct formats
+for every frame.
+
+"""
+
+import sys
+import os
+import struct
+import socket
+import timeit
+import logging
+from collections import namedtuple
+
+# to be able to find pybtp module
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pybtp import defs
+from pybtp.parser import enc_frame, dec_hdr, dec_data
+from pybtp.iutctl_common import BTPSocket
+
+ITERATIONS = 100000
+BURST_LEN = 50
+
+# ttl, ctl, src, dst, payload_len, payload
+PAYLOAD = struct.pack("<BBHHB", 7, 0, 0x0001, 0x0b0c, 16) + "\xaa" * 16
+FRAME = enc_frame(defs.BTP_SERVICE_ID_MESH, defs.MESH_EV_NET_RECV,
+                  0, PAYLOAD)
+
+
+def old_dec_hdr(bin):
+    logging.debug("%s, %r", old_dec_hdr.__name__, bin)
+
+    Header = namedtuple('Header', 'svc_id op ctrl_index data_len')
+
+    return Header._make(struct.unpack("<BBBH", bin))
+
+
+def old_dec_data(bin):
+    logging.debug("%s, %r", old_dec_data.__name__, bin)
+
+    return struct.unpack('<%ds' % len(bin), bin)
+
+
+def old_enc_frame(svc_id, op, ctrl_index, data):
+    logging.debug("%s, %r %r %r %r",
+                  old_enc_frame.__name__, svc_id, op, ctrl_index, data)
+
+    str_data = str(bytearray(data))
+    int_len = len(str_data)
+    hex_len = struct.pack('h', int_len)
+
+    return struct.pack('<BBB2s%ds' % int_len, svc_id, op, ctrl_index,
+                       hex_len, str_data)
+
+
+def bench(name, func):
+    seconds = timeit.timeit(func, number=ITERATIONS)
+    print "%-28s %8.2f us/frame" % (name, seconds / ITERATIONS * 1e6)
+
+
+def bench_socket_read():
+    """Benchmark BTPSocket.read over a socket pair"""
+    btp_socket = BTPSocket()
+    btp_socket.conn, peer = socket.socketpair()
+
+    iterations = ITERATIONS / 10
+
+    def read():
+        peer.sendall(FRAME)
+        btp_socket.read()
+
+    seconds = timeit.timeit(read, number=iterations)
+    print "%-28s %8.2f us/frame" % ("BTPSocket.read",
+                                    seconds / iterations * 1e6)
+
+    # burst of events, e.g. GAP_EV_DEVICE_FOUND during discovery
+    burst = FRAME * BURST_LEN
+
+    def read_burst():
+        peer.sendall(burst)
+        frames = 0
+        while frames < BURST_LEN:
+            frames += len(btp_socket.read_frames())
+
+    seconds = timeit.timeit(read_burst, number=iterations / BURST_LEN)
+    print "%-28s %8.2f us/frame" % ("BTPSocket.read_frames burst",
+                                    seconds / iterations * 1e6)
+
+    peer.close()
+    btp_socket.conn.close()
+
+
+def main():
+    # BTPSocket passes memoryview slices of its receive buffer
+    frame = memoryview(bytearray(FRAME))
+    hdr = frame[:5]
+    data = frame[5:]
+
+    assert dec_hdr(hdr) == old_dec_hdr(hdr)
+    assert dec_data(data) == old_dec_data(data)
+    assert enc_frame(3, 0x82, 0, PAYLOAD) == \
+        old_enc_frame(3, 0x82, 0, PAYLOAD)
+
+    bench("dec_hdr (previous)", lambda: old_dec_hdr(hdr))
+    bench("dec_hdr", lambda: dec_hdr(hdr))
+    bench("dec_data (previous)", lambda: old_dec_data(data))
+    bench("dec_data", lambda: dec_data(data))
+    bench("enc_frame (previous)", lambda: old_enc_frame(3, 0x82, 0, PAYLOAD))
+    bench("enc_frame", lambda: enc_frame(3, 0x82, 0, PAYLOAD))
+    bench_socket_read()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,11 +15,12 @@
 # more details.
 #
 
-"""Script to test MMI description parser, MmiParser.
+"""Script to test MMI description parser, MmiParser, and the description
+parsing helpers of ptsprojects.mmi.
 
 The purpose of this script is to keep all types of MMI descriptions that need
-parsing in one place. This enables doing regression testing of MmiParser in
-case a new description parsing is added.
+parsing in one place. This enables doing regression testing of MmiParser and
+the helpers in case a new description parsing is added.
 
 """
 
@@ -31,6 +32,7 @@ sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from ptsprojects.testcase import MmiParser
+from ptsprojects import mmi
 
 descriptions = [
 
@@ -143,3 +145,89 @@ for item in descriptions:
     assert args == MMI.args, \
         "Error parsing description found=%r, expected=%r" % (MMI.args, args)
     print "OK"
+
+# (helper, description, expected result) of ptsprojects.mmi helpers
+helper_descriptions = [
+
+# project_name: GATT
+# wid: 17
+("parse_service_uuids",
+ """Please confirm IUT have following primary services UUID= '1800'O Service = '1800'O, '1801'O Service = '1801'O, '0A0B'O Service = '0A0B'O. Click Yes if IUT have it, otherwise click No.""",
+ ["0x1800", "0x1801", "0xa0b"]),
+
+# project_name: GATT
+# wid: 52
+(lambda desc: mmi.parse_hex_params(mmi.HANDLE_VALUE_PATTERN, desc),
+ """Please confirm IUT Handle='cd'O characteristic value='1122'O in random selected adopted database. Click Yes if it matches the IUT, othwise click No.""",
+ {"Handle": 0xcd, "value": 0x1122}),
+
+# project_name: GAP
+# wid: 161
+("parse_handles",
+ """Please provide the handle 0x00A2 of a characteristic with the signed write property.""",
+ [0x00A2]),
+
+("parse_bd_addr",
+ """Please initiate a connection over LE to PTS using address 001BDC08E4F3.""",
+ "001BDC08E4F3"),
+
+("parse_bd_addr", """Please initiate a connection over LE.""", None),
+
+("parse_hex_values",
+ """Please confirm IUT received merged value = '0102'O '0304'O in random selected adopted database.""",
+ ["0102", "0304"]),
+
+# project_name: MESH
+# wid: 18
+(lambda desc: mmi.parse_params(mmi.MESH_NET_HEADER_PATTERN, desc),
+ """Please confirm the following network packet was received: TTL: [0x03] CTL: [0x00] SRC: [0x0001] DST: [0x0002] TransportPDU: [0x0102]""",
+ {"TTL": "0x03", "CTL": "0x00", "SRC": "0x0001", "DST": "0x0002",
+  "TransportPDU": "0x0102"}),
+
+# project_name: MESH
+# wid: 23
+(lambda desc: mmi.parse_hex_params(mmi.MESH_ADDRESS_PATTERN, desc),
+ """Please send a segmented message encrypted with an application key with source address 0x0001 and destination address 0x00C4""",
+ {"source address": 0x0001, "destination address": 0x00C4}),
+
+# project_name: MESH
+# wid: 39
+(lambda desc: mmi.parse_params(mmi.MESH_DST_ADDRESS_PATTERN, desc),
+ """Please confirm you can decrypt the transport packet with destination address : 0x0002""",
+ {"address": "0x0002"}),
+
+# project_name: MESH
+# wid: 44
+(lambda desc: mmi.parse_params(mmi.MESH_LABEL_ADDRESS_PATTERN, desc),
+ """Please send a segmented message encrypted with an application key with source address 0x0001 and destination label 0073E7E4D8B9440FAF8415DF4C56C0E1 (address 0x8B9A)""",
+ {"source address": "0x0001", "(address": "0x8B9A"}),
+
+# project_name: MESH
+# wid: 604
+(lambda desc: mmi.parse_params(mmi.MESH_HEALTH_PATTERN, desc),
+ """Please confirm the test ID 0 and the registered fault array 01.""",
+ {"ID": "0", "array": "01"}),
+]
+
+print "\nInitiating helper parsing"
+
+for helper, description, expected in helper_descriptions:
+    if isinstance(helper, str):
+        helper = getattr(mmi, helper)
+
+    print "\nParsing: %r\nExpecting: %r" % (description, expected)
+    result = helper(description)
+    print "Got:", 5 * " ", result
+    assert expected == result, \
+        "Error parsing description found=%r, expected=%r" % (result, expected)
+    print "OK"
+
+print "\nNormalizing"
+
+description = descriptions[0][0]
+normalized = mmi.normalize(description)
+assert normalized == description.upper()
+assert mmi.normalize(description) is normalized, "description upper-cased again"
+assert mmi.contains(description, "prepare WRITE request")
+assert not mmi.contains(description, "read request")
+print "OK"
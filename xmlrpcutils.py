@@ -0,0 +1,123 @@
+#
+# auto-pts - The Bluetooth PTS Automation Framework
+#
+# Copyright (c) 2018, Intel Corporation.
+#
+# This program is free software; you can redistribute it and/or modify it
+# under the terms and conditions of the GNU General Public License,
+# version 2, as published by the Free Software Foundation.
+#
+# This program is distributed in the hope it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+
+"""XML-RPC over persistent HTTP connections
+
+Used both by auto-pts client and server, so that calls and callbacks do not
+open a new TCP connection each.
+
+"""
+
+import socket
+import logging
+import httplib
+import threading
+import xmlrpclib
+import SocketServer
+from SimpleXMLRPCServer import SimpleXMLRPCServer, SimpleXMLRPCRequestHandler
+
+from config import KEEPALIVE_TIMEOUT
+
+log = logging.debug
+
+
+class KeepAliveHTTPConnection(httplib.HTTPConnection):
+    """HTTP connection sending requests without Nagle delay"""
+
+    def connect(self):
+        httplib.HTTPConnection.connect(self)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class KeepAliveTransport(xmlrpclib.Transport):
+    """XML-RPC transport reusing HTTP connection between calls
+
+    Each thread has its own connection, so calls made at the same time from
+    different threads do not interleave.
+
+    """
+    def __init__(self, timeout=None, use_datetime=0):
+        """Constructor
+
+        timeout -- socket timeout in seconds, None blocks
+
+        """
+        xmlrpclib.Transport.__init__(self, use_datetime)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def make_connection(self, host):
+        connection = getattr(self._local, "connection", None)
+        if connection and connection[0] == host:
+            return connection[1]
+
+        chost, self._extra_headers, x509 = self.get_host_info(host)
+        self._local.connection = \
+            host, KeepAliveHTTPConnection(chost, timeout=self.timeout)
+
+        return self._local.connection[1]
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection:
+            self._local.connection = None
+            connection[1].close()
+
+
+class KeepAliveRequestHandler(SimpleXMLRPCRequestHandler):
+    """XML-RPC request handler keeping HTTP/1.1 connection open
+
+    Connection is closed once idle for KEEPALIVE_TIMEOUT seconds.
+
+    """
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+    disable_nagle_algorithm = True
+
+    def log_error(self, format, *args):
+        # idle connections time out, do not print it on console
+        log("%s: %s", self.address_string(), format % args)
+
+
+class KeepAliveXMLRPCServer(SocketServer.ThreadingMixIn, SimpleXMLRPCServer):
+    """XML-RPC server serving persistent connections
+
+    Each connection is served in its own thread, but calls are dispatched one
+    at a time, as by SimpleXMLRPCServer.
+
+    """
+    daemon_threads = True
+
+    def __init__(self, addr, requestHandler=KeepAliveRequestHandler,
+                 concurrent_methods=(), **kwargs):
+        """Constructor
+
+        concurrent_methods -- names of thread safe methods dispatched at the
+                              same time as other calls, e.g. methods waiting
+                              for a result of another call
+
+        """
+        SimpleXMLRPCServer.__init__(self, addr, requestHandler, **kwargs)
+
+        self.concurrent_methods = set(concurrent_methods)
+
+        self._dispatch_lock = threading.Lock()
+
+    def _dispatch(self, method, params):
+        if method in self.concurrent_methods:
+            return SimpleXMLRPCServer._dispatch(self, method, params)
+
+        with self._dispatch_lock:
+            return SimpleXMLRPCServer._dispatch(self, method, params)